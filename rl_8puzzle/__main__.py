@@ -1,4 +1,4 @@
-from rl_8puzzle.runner import main
+from rl_8puzzle.runner import cli
 
 if __name__ == "__main__":
-    main()
+    cli()
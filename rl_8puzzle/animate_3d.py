@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Iterable, Iterator, List, Tuple, Dict
 
 import numpy as np
 import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+from matplotlib.colors import to_rgb
+from mpl_toolkits.mplot3d import Axes3D, proj3d  # noqa: F401
 from PIL import Image
 
-from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE, ACTIONS
-from rl_8puzzle.train_q_learning import train, save_q
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.gif_writer import StreamingGifWriter
+from rl_8puzzle.policy import greedy_states
+from rl_8puzzle.q_table import convert_pickle
+from rl_8puzzle.solution_cache import SolutionCache, actions_from_states, prune_stale
+from rl_8puzzle.train_q_learning import LEGACY_Q_PATH, Q_PATH, load_q, plan, save_q
 import imageio.v2 as imageio
 
 State = Tuple[int, ...]
@@ -18,43 +26,54 @@ State = Tuple[int, ...]
 # ---------- Q-table helpers ----------
 
 
-def load_or_train_q(path: str | Path = "rl_8puzzle/q_table.pkl"):
-    import pickle
-
+def load_or_train_q(path: str | Path = Q_PATH):
     path = Path(path)
+    if not path.exists() and path.suffix == ".bin" and Path(LEGACY_Q_PATH).exists():
+        print(f"[animate] Converting legacy {LEGACY_Q_PATH} to {path}")
+        convert_pickle(LEGACY_Q_PATH, path)
+        Q = load_q(path)
+        print(f"[animate] Pruned {prune_stale(Q)} cached solutions of older Q-tables")
+        return Q
+
     if path.exists():
         print(f"[animate] Loading existing Q-table from {path}")
-        with path.open("rb") as f:
-            return pickle.load(f)
-
-    print("[animate] Q-table not found, training a smaller one for demo…")
-    Q = train(
-        num_episodes=20000,
-        max_steps=80,
-        scramble_moves=20,
-    )
+        return load_q(path)
+
+    print("[animate] Q-table not found, planning an optimal one…")
+    Q = plan(backend="ranked" if path.suffix == ".bin" else "dict")
     save_q(Q, path)
     print(f"[animate] Saved Q-table to {path}")
+    print(f"[animate] Pruned {prune_stale(Q)} cached solutions of older Q-tables")
     return Q
 
 
 def greedy_trajectory(env: EightPuzzleEnv, Q, max_steps: int = 80) -> List[State]:
-    """Generate a trajectory of states using the greedy policy from Q."""
-    state = env.state
-    path = [state]
+    """Generate a trajectory of states using the greedy policy from Q (see `greedy_states`)."""
+    return greedy_states(env, Q, max_steps)
 
-    for _ in range(max_steps):
-        qs = [Q.get((state, a), 0.0) for a in ACTIONS]
-        best_idx = int(np.argmax(qs))
-        action = ACTIONS[best_idx]
 
-        state, _, done, _ = env.step(action)
-        path.append(state)
+def cached_trajectory(
+    env: EightPuzzleEnv, Q, cache: SolutionCache | None = None, max_steps: int = 80
+) -> List[State]:
+    """
+    `greedy_trajectory` through a SolutionCache: a cached start state is
+    replayed from its stored moves instead of being solved again.
+    """
+    if cache is None:
+        return greedy_trajectory(env, Q, max_steps=max_steps)
 
-        if done:
-            break
+    start = env.state
+    moves = cache.get(start)
+    if moves is None:
+        states = greedy_trajectory(env, Q, max_steps=max_steps)
+        cache.put(start, actions_from_states(states))
+        return states
 
-    return path
+    states = [start]
+    for action in moves:
+        state, _, _, _ = env.step(action)
+        states.append(state)
+    return states
 
 
 # ---------- geometric helpers ----------
@@ -77,44 +96,60 @@ def state_to_xy_dict(state: State) -> Dict[int, Tuple[float, float]]:
     return pos
 
 
-def build_interpolated_frames(states: List[State], substeps: int = 8):
+def state_positions(state: State) -> np.ndarray:
     """
-    Given a list of discrete states [s0, s1, ..., sT], build a list of
-    'frames'. Each frame is a list of (tile, x, y) positions, with
-    smooth linear interpolation between moves.
+    Tile positions of a 3x3 board as a (num_tiles, 2) float array.
 
-    substeps: number of interpolation slices per move.
+    Row i holds the (x, y) of tile i + 1, in the same coordinates as
+    `state_to_xy_dict`.
     """
-    frames: List[List[Tuple[int, float, float]]] = []
+    cells = np.argsort(np.asarray(state))[1:]  # cell index of tiles 1..8
+    row, col = np.divmod(cells, 3)
+    return np.stack([col, 2 - row], axis=1).astype(float)
 
-    if not states:
-        return frames
 
-    # Start with exact initial positions
-    pos0 = state_to_xy_dict(states[0])
-    tiles = sorted(pos0.keys())
-    initial_frame = [(tile, *pos0[tile]) for tile in tiles]
-    frames.append(initial_frame)
+def count_interpolated_frames(num_states: int, substeps: int = 8) -> int:
+    """Number of frames `iter_interpolated_frames` yields for `num_states` states."""
+    return 0 if num_states == 0 else 1 + (num_states - 1) * substeps
 
-    for i in range(len(states) - 1):
-        pos_start = state_to_xy_dict(states[i])
-        pos_end = state_to_xy_dict(states[i + 1])
 
-        tiles = sorted(pos_start.keys())
-
-        # substeps frames, excluding t=0 (already added), including t=1 at the end
-        for k in range(1, substeps + 1):
-            t = k / substeps
-            frame: List[Tuple[int, float, float]] = []
-            for tile in tiles:
-                x0, y0 = pos_start[tile]
-                x1, y1 = pos_end[tile]
-                x = (1.0 - t) * x0 + t * x1
-                y = (1.0 - t) * y0 + t * y1
-                frame.append((tile, x, y))
-            frames.append(frame)
+def iter_interpolated_frames(states: Iterable[State], substeps: int = 8) -> Iterator[np.ndarray]:
+    """
+    Lazily yield the frames of a trajectory [s0, s1, ..., sT], one move
+    at a time. Each frame is a fresh (num_tiles, 2) array of tile
+    positions (row i = tile i + 1) with the moving tile interpolated
+    linearly: the initial frame, then `substeps` frames per move ending
+    exactly on the next state.
+    """
+    states = iter(states)
+    first = next(states, None)
+    if first is None:
+        return
+
+    pos = state_positions(first)
+    yield pos.copy()
+
+    for state in states:
+        nxt = state_positions(state)
+        moving = np.flatnonzero((nxt != pos).any(axis=1))
+        # (substeps, num_moving, 2), excluding t=0 and including t=1
+        path = np.linspace(pos[moving], nxt[moving], substeps + 1)[1:]
+        for step in path:
+            frame = pos.copy()
+            frame[moving] = step
+            yield frame
+        pos = nxt
+
+
+def build_interpolated_frames(states: List[State], substeps: int = 8) -> List[np.ndarray]:
+    """
+    Given a list of discrete states [s0, s1, ..., sT], build the full list
+    of frames from `iter_interpolated_frames`. Prefer the iterator for
+    long trajectories; this keeps every frame in memory.
 
-    return frames
+    substeps: number of interpolation slices per move.
+    """
+    return list(iter_interpolated_frames(states, substeps=substeps))
 
 
 # ---------- 3D drawing helpers ----------
@@ -135,109 +170,416 @@ def setup_axes(ax: Axes3D):
 
 from matplotlib import patheffects  # put this with your other imports at the top
 
+TILE_DX = TILE_DY = 0.9
+TILE_DZ = 0.4
+LABEL_Z = TILE_DZ + 0.35  # float well above the cube
+
+# Distinct color per tile
+TILE_COLORS = [
+    "#e41a1c",
+    "#377eb8",
+    "#4daf4a",
+    "#984ea3",
+    "#ff7f00",
+    "#ffff33",
+    "#a65628",
+    "#f781bf",
+]
+
+# Text outline style: white text with black stroke
+TEXT_EFFECTS = [
+    patheffects.Stroke(linewidth=3, foreground="black"),
+    patheffects.Normal(),
+]
+
+# Faces of the unit cube in the order Axes3D.bar3d emits them, so translated
+# copies line up with the per-face shading bar3d computed.
+_CUBOID = np.array(
+    [
+        ((0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)),  # -z
+        ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)),  # +z
+        ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)),  # -y
+        ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0)),  # +y
+        ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)),  # -x
+        ((1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)),  # +x
+    ],
+    dtype=float,
+) * (TILE_DX, TILE_DY, TILE_DZ)
+
+
+def draw_tile(ax: Axes3D, tile: int, x: float, y: float, color: str | None = None):
+    """Draw one tile cube and its label; returns (cube, label) artists."""
+    if color is None:
+        color = TILE_COLORS[(tile - 1) % len(TILE_COLORS)]
+
+    # Draw 3D cube
+    cube = ax.bar3d(
+        x + 0.05,
+        y + 0.05,
+        0.0,
+        TILE_DX,
+        TILE_DY,
+        TILE_DZ,
+        shade=True,
+        alpha=0.95,
+        color=color,
+        edgecolor="black",
+    )
 
-def draw_frame(ax: Axes3D, frame: List[Tuple[int, float, float]]):
+    # BIG, high-contrast number clearly above the cube
+    label = ax.text(
+        x + 0.5,
+        y + 0.5,
+        LABEL_Z,
+        str(tile),
+        ha="center",
+        va="center",
+        fontsize=26,  # much larger font
+        weight="bold",
+        color="white",  # white text
+        path_effects=TEXT_EFFECTS,  # black outline
+        zorder=10,
+    )
+    return cube, label
+
+
+def draw_frame(ax: Axes3D, frame: np.ndarray):
     # Clear axis and reset view
     ax.cla()
     setup_axes(ax)
 
-    dx = dy = 0.9
-    dz = 0.4
-
-    # Distinct color per tile
-    colors = [
-        "#e41a1c",
-        "#377eb8",
-        "#4daf4a",
-        "#984ea3",
-        "#ff7f00",
-        "#ffff33",
-        "#a65628",
-        "#f781bf",
-    ]
-
-    # Text outline style: white text with black stroke
-    text_effects = [
-        patheffects.Stroke(linewidth=3, foreground="black"),
-        patheffects.Normal(),
-    ]
-
-    for tile, x, y in frame:
-        color = colors[(tile - 1) % len(colors)]
-
-        # Draw 3D cube
-        ax.bar3d(
-            x + 0.05,
-            y + 0.05,
-            0.0,
-            dx,
-            dy,
-            dz,
-            shade=True,
-            alpha=0.95,
-            color=color,
-            edgecolor="black",
-        )
-
-        # BIG, high-contrast number clearly above the cube
-        ax.text(
-            x + 0.5,
-            y + 0.5,
-            dz + 0.35,  # float well above the cube
-            str(tile),
-            ha="center",
-            va="center",
-            fontsize=26,  # much larger font
-            weight="bold",
-            color="white",  # white text
-            path_effects=text_effects,  # black outline
-            zorder=10,
-        )
+    for tile, (x, y) in enumerate(frame, start=1):
+        draw_tile(ax, tile, x, y)
 
 
 # ---------- Manual GIF creation (no FuncAnimation) ----------
 
 
+class FrameRenderer:
+    """
+    One Matplotlib figure that turns frames into RGB arrays.
+
+    With counter=False the title has no "Frame i/N" suffix, so frames that
+    show the same board render to identical images (what the GIF writer
+    needs to merge repeats and crop to the changed region).
+    """
+
+    def __init__(self, counter: bool = True) -> None:
+        self.counter = counter
+        self.fig = plt.figure(figsize=(6, 6))
+        self.ax: Axes3D = self.fig.add_subplot(111, projection="3d")
+        setup_axes(self.ax)
+        self.ax.set_title("8-Puzzle RL Solution (3D Sliding Animation)")
+
+    def _title(self, index: int, total: int) -> str:
+        if self.counter:
+            return f"8-Puzzle RL Solution – Frame {index + 1}/{total}"
+        return "8-Puzzle RL Solution"
+
+    def render(self, frame, index: int, total: int) -> np.ndarray:
+        draw_frame(self.ax, frame)
+        self.ax.set_title(self._title(index, total))
+
+        self.fig.canvas.draw()
+        buf = np.asarray(self.fig.canvas.buffer_rgba())  # (h, w, 4)
+        return np.ascontiguousarray(buf[..., :3])
+
+    def close(self) -> None:
+        plt.close(self.fig)
+
+
+class RetainedFrameRenderer(FrameRenderer):
+    """
+    FrameRenderer that keeps its artists between frames.
+
+    The cubes and labels are created on the first frame; after that only
+    tiles whose position changed get new vertices, so a frame costs one
+    canvas draw instead of rebuilding every bar3d and text artist.
+    """
+
+    def __init__(self, counter: bool = True) -> None:
+        super().__init__(counter)
+        self._artists: List[tuple] = []
+        self._positions: np.ndarray | None = None
+
+    def _place(self, frame: np.ndarray) -> None:
+        if self._positions is None:
+            self._artists = [
+                draw_tile(self.ax, tile, x, y) for tile, (x, y) in enumerate(frame, start=1)
+            ]
+            self._positions = np.array(frame, dtype=float)
+            return
+        for i in np.flatnonzero((frame != self._positions).any(axis=1)):
+            x, y = frame[i]
+            cube, label = self._artists[i]
+            cube.set_verts(_CUBOID + (x + 0.05, y + 0.05, 0.0))
+            label.set_position_3d((x + 0.5, y + 0.5, LABEL_Z))
+            self._positions[i] = frame[i]
+
+    def render(self, frame, index: int, total: int) -> np.ndarray:
+        self._place(frame)
+        self.ax.set_title(self._title(index, total))
+
+        self.fig.canvas.draw()
+        buf = np.asarray(self.fig.canvas.buffer_rgba())  # (h, w, 4)
+        return np.ascontiguousarray(buf[..., :3])
+
+
+class SpriteFrameRenderer(FrameRenderer):
+    """
+    2.5D renderer that composites pre-rendered sprites with NumPy.
+
+    At startup Matplotlib draws the empty axes once as the background,
+    one white cube per board cell (its shading, edges and perspective at
+    that cell) and one label per tile, each on a transparent canvas.
+    A frame is then the background with the cubes alpha-blended far to
+    near at the projected position of each tile, tinted with the tile
+    color, and the labels on top. A moving tile uses the cube sprite of
+    its nearest cell. The title is static (no frame counter), whatever
+    `counter` says.
+    """
+
+    def __init__(self, counter: bool = True) -> None:
+        super().__init__(counter)
+        ax, fig = self.ax, self.fig
+        ax.set_title("8-Puzzle RL Solution")
+        self.background = self._grab()[..., :3].copy()
+        self._proj = ax.get_proj()
+
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+        ax.set_title("")
+        ax.set_axis_off()
+
+        # cubes[cy * 3 + cx]: white cube drawn at cell (cx, cy)
+        self._cubes = []
+        for cy in range(3):
+            for cx in range(3):
+                cube, label = draw_tile(ax, 0, cx, cy, color="white")
+                label.remove()
+                self._cubes.append(self._sprite(self._anchors([(cx, cy)], 0.0)[0]))
+                cube.remove()
+
+        self._labels = []
+        for tile in range(1, 9):
+            cube, label = draw_tile(ax, tile, 1, 1)
+            cube.remove()
+            self._labels.append(self._sprite(self._anchors([(1, 1)], LABEL_Z)[0]))
+            label.remove()
+
+        # Tint: white cube shading times tile color.
+        self._tinted = [
+            [
+                (premul * np.asarray(to_rgb(TILE_COLORS[(tile - 1) % len(TILE_COLORS)]), np.float32), inv_alpha, offset)
+                for premul, inv_alpha, offset in self._cubes
+            ]
+            for tile in range(1, 9)
+        ]
+
+        elev, azim = np.radians(ax.elev), np.radians(ax.azim)
+        self._eye = np.array([np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim)])
+
+    def _grab(self) -> np.ndarray:
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba())
+
+    def _anchors(self, xy, z) -> np.ndarray:
+        """Pixel (row, col) of the tile centers at positions `xy` and height(s) z."""
+        xy = np.asarray(xy, dtype=float) + 0.5
+        z = np.broadcast_to(np.asarray(z, dtype=float), len(xy))
+        xs, ys, _ = proj3d.proj_transform(xy[:, 0], xy[:, 1], z, self._proj)
+        disp = self.ax.transData.transform(np.column_stack([xs, ys]))
+        return np.column_stack([self.background.shape[0] - disp[:, 1], disp[:, 0]])
+
+    def _sprite(self, anchor: np.ndarray):
+        """
+        Crop the current transparent canvas to (premultiplied rgb in 0..255,
+        1 - alpha, top-left minus anchor).
+        """
+        rgba = self._grab().astype(np.float32)
+        rows, cols = np.nonzero(rgba[..., 3])
+        r0, r1, c0, c1 = rows.min(), rows.max() + 1, cols.min(), cols.max() + 1
+        crop = rgba[r0:r1, c0:c1]
+        alpha = crop[..., 3:] / 255.0
+        return crop[..., :3] * alpha, 1.0 - alpha, np.array([r0, c0]) - anchor
+
+    @staticmethod
+    def _blend(out: np.ndarray, sprite, anchor: np.ndarray) -> None:
+        """Alpha-blend `sprite` into the uint8 image `out` in place."""
+        premul, inv_alpha, offset = sprite
+        r0, c0 = np.rint(anchor + offset).astype(int)
+        h, w = inv_alpha.shape[:2]
+        # Clip to the canvas.
+        sr0, sc0 = max(0, -r0), max(0, -c0)
+        sr1, sc1 = min(h, out.shape[0] - r0), min(w, out.shape[1] - c0)
+        if sr0 >= sr1 or sc0 >= sc1:
+            return
+        target = out[r0 + sr0 : r0 + sr1, c0 + sc0 : c0 + sc1]
+        region = target * inv_alpha[sr0:sr1, sc0:sc1]
+        region += premul[sr0:sr1, sc0:sc1]
+        region += 0.5
+        target[...] = region
+
+    def render(self, frame, index: int, total: int) -> np.ndarray:
+        frame = np.asarray(frame, dtype=float)
+        out = self.background.copy()
+        cells = np.clip(np.rint(frame), 0, 2).astype(int)
+        n = len(frame)
+        # One projection for the cube bases and the label points.
+        anchors = self._anchors(np.concatenate([frame, frame]), np.repeat([0.0, LABEL_Z], n))
+        cube_anchors, label_anchors = anchors[:n], anchors[n:]
+
+        for i in np.argsort(frame @ self._eye, kind="stable"):  # far to near
+            cx, cy = cells[i]
+            self._blend(out, self._tinted[i][cy * 3 + cx], cube_anchors[i])
+        for i in range(n):
+            self._blend(out, self._labels[i], label_anchors[i])
+        return out
+
+
+RENDER_BACKENDS = {
+    "redraw": FrameRenderer,
+    "retained": RetainedFrameRenderer,
+    "sprite": SpriteFrameRenderer,
+}
+
+_render_worker: Dict[str, FrameRenderer] = {}
+
+
+def _init_render_worker(backend: str = "retained", counter: bool = True) -> None:
+    plt.switch_backend("Agg")
+    _render_worker["renderer"] = RENDER_BACKENDS[backend](counter)
+
+
+def _render_chunk(frames: list, start: int, total: int) -> List[Tuple[Tuple[int, ...], bytes]]:
+    """Render frames [start, start + len(frames)) to raw RGB buffers."""
+    renderer = _render_worker["renderer"]
+    out = []
+    for i, frame in enumerate(frames):
+        rgb = renderer.render(frame, start + i, total)
+        out.append((rgb.shape, rgb.tobytes()))
+    return out
+
+
+def _render_parallel(
+    frames: Iterable,
+    total: int,
+    workers: int,
+    chunk_size: int,
+    backend: str = "retained",
+    counter: bool = True,
+) -> Iterator[np.ndarray]:
+    """
+    Render frame chunks on a process pool (one figure per worker) and yield
+    the RGB frames back in order. At most 2 chunks per worker are in
+    flight, so memory stays bounded however many frames there are.
+    """
+    frames = iter(frames)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_render_worker, initargs=(backend, counter)
+    ) as pool:
+        pending: deque = deque()
+        start = 0
+        while chunk := list(itertools.islice(frames, chunk_size)):
+            pending.append(pool.submit(_render_chunk, chunk, start, total))
+            start += len(chunk)
+            if len(pending) >= 2 * workers:
+                for shape, data in pending.popleft().result():
+                    yield np.frombuffer(data, dtype=np.uint8).reshape(shape)
+        while pending:
+            for shape, data in pending.popleft().result():
+                yield np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+
+def _render_frames(
+    frames: Iterable, total: int, workers: int, chunk_size: int, backend: str, counter: bool = True
+) -> Iterator[np.ndarray]:
+    """Yield the RGB image of every frame, in order, with the chosen backend."""
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend {backend!r}; choose from {sorted(RENDER_BACKENDS)}")
+    if workers > 1:
+        yield from _render_parallel(frames, total, workers, chunk_size, backend, counter)
+        return
+    renderer = RENDER_BACKENDS[backend](counter)
+    try:
+        for i, frame in enumerate(frames):
+            yield renderer.render(frame, i, total)
+    finally:
+        renderer.close()
+
+
 def animate_frames_to_mp4(
-    frames: List[List[Tuple[int, float, float]]],
+    frames,
     save_path: str | Path = "rl_8puzzle/solution_3d.mp4",
     fps: int = 8,
+    workers: int = 1,
+    chunk_size: int = 8,
+    backend: str = "retained",
+    total: int | None = None,
 ):
     """
     Render each frame with Matplotlib and save as an MP4 video using imageio-ffmpeg.
     This is more robust than GIF on some Windows setups.
+
+    workers > 1 renders chunks of `chunk_size` frames in parallel processes,
+    each with its own figure; the video writer still receives them in order.
+    backend picks the renderer from RENDER_BACKENDS: "retained" moves
+    existing artists, "redraw" rebuilds the scene every frame, "sprite"
+    composites pre-rendered tile sprites in NumPy (fastest, approximate).
+
+    `frames` may be any iterable, e.g. `iter_interpolated_frames(...)`;
+    frames are rendered and written as they arrive. Pass `total` (see
+    `count_interpolated_frames`) when `frames` has no len().
     """
     save_path = Path(save_path)
     save_path.parent.mkdir(parents=True, exist_ok=True)
-
-    fig = plt.figure(figsize=(6, 6))
-    ax: Axes3D = fig.add_subplot(111, projection="3d")
-    setup_axes(ax)
-    ax.set_title("8-Puzzle RL Solution (3D Sliding Animation)")
+    if total is None:
+        total = len(frames)
 
     print(f"[animate] Saving MP4 video to {save_path} at {fps} fps …")
     writer = imageio.get_writer(save_path, fps=fps)
 
     try:
-        for i, frame in enumerate(frames):
-            draw_frame(ax, frame)
-            ax.set_title(f"8-Puzzle RL Solution – Frame {i + 1}/{len(frames)}")
-
-            fig.canvas.draw()
-            buf = np.asarray(fig.canvas.buffer_rgba())  # (h, w, 4)
-
+        for rgb in _render_frames(frames, total, workers, chunk_size, backend):
             # imageio expects uint8 array
-            writer.append_data(buf)
+            writer.append_data(rgb)
 
         print("[animate] MP4 saved.")
     finally:
         writer.close()
-        plt.close(fig)
+
+
+def animate_frames_to_gif(
+    frames,
+    save_path: str | Path = "rl_8puzzle/solution_3d.gif",
+    fps: int = 8,
+    workers: int = 1,
+    chunk_size: int = 8,
+    backend: str = "retained",
+    total: int | None = None,
+):
+    """
+    Same as `animate_frames_to_mp4`, but encodes a GIF incrementally with
+    StreamingGifWriter: one shared palette, identical consecutive frames
+    merged into one longer frame, nothing buffered beyond the current frame.
+    Frames are drawn without the "Frame i/N" counter so that repeats really
+    are identical, so `total` is optional even for plain iterators.
+    """
+    save_path = Path(save_path)
+    if total is None:
+        total = len(frames) if hasattr(frames, "__len__") else 0
+
+    print(f"[animate] Saving GIF to {save_path} at {fps} fps …")
+    with StreamingGifWriter(save_path, fps=fps) as writer:
+        for rgb in _render_frames(frames, total, workers, chunk_size, backend, counter=False):
+            writer.append_data(rgb)
+    print(f"[animate] GIF saved ({writer.frames_out} of {writer.frames_in} frames kept).")
 
 
 def main():
     # 1) load / train Q
     Q = load_or_train_q()
+    cache = SolutionCache.for_q(Q)
 
     # 2) repeatedly scramble until we get a decently long solution
     env = EightPuzzleEnv(scramble_moves=40)
@@ -245,7 +587,7 @@ def main():
 
     for attempt in range(20):
         start_state = env.reset()
-        states = greedy_trajectory(env, Q)
+        states = cached_trajectory(env, Q, cache)
         moves = len(states) - 1
         if moves >= min_moves:
             break
@@ -254,15 +596,17 @@ def main():
     print("[animate] Goal state:", GOAL_STATE)
     print(f"[animate] Trajectory length (moves): {moves}")
 
-    # 3) build smooth interpolated frames
-    frames = build_interpolated_frames(states, substeps=10)
-    print(f"[animate] Number of frames (with interpolation): {len(frames)}")
+    # 3) stream smooth interpolated frames
+    substeps = 10
+    total = count_interpolated_frames(len(states), substeps)
+    print(f"[animate] Number of frames (with interpolation): {total}")
 
     # 4) render to MP4 (slower FPS so motion is obvious)
     animate_frames_to_mp4(
-        frames,
+        iter_interpolated_frames(states, substeps=substeps),
         save_path="rl_8puzzle/solution_3d.mp4",
         fps=6,  # 6 frames per second
+        total=total,
     )
 
 
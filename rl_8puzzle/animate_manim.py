@@ -5,7 +5,8 @@ from typing import Tuple, List
 
 from manim import Scene, Square, Text, VGroup, DOWN, UP
 
-from rl_8puzzle.env import EightPuzzleEnv, ACTIONS
+from rl_8puzzle.env import EightPuzzleEnv
+from rl_8puzzle.policy import greedy_states
 from rl_8puzzle.train_q_learning import load_q  # we will create this helper
 
 
@@ -13,17 +14,7 @@ State = Tuple[int, ...]
 
 
 def greedy_trajectory(env: EightPuzzleEnv, Q, max_steps: int = 80) -> List[State]:
-    state = env.state
-    path = [state]
-    for _ in range(max_steps):
-        qs = [Q.get((state, a), 0.0) for a in ACTIONS]
-        best_idx = max(range(len(ACTIONS)), key=lambda i: qs[i])
-        action = ACTIONS[best_idx]
-        state, _, done, _ = env.step(action)
-        path.append(state)
-        if done:
-            break
-    return path
+    return greedy_states(env, Q, max_steps)
 
 
 class PuzzleManim(Scene):
@@ -0,0 +1,187 @@
+"""
+Solve many 8-puzzle start states with the greedy policy, streaming JSONL.
+
+    python -m rl_8puzzle.batch --starts starts.jsonl --out results.jsonl --workers 8
+    python -m rl_8puzzle.batch --random 10000 --scramble 40 --workers 8
+
+Each input line is a JSON list of 9 ints (or {"start": [...]}). Each output
+line is {"start", "moves", "trajectory", "success", "latency_us"}, written in
+input order while the job runs. Starts that are not a solvable 3x3 board
+get a {"start", "success": false, "error"} record instead.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from rl_8puzzle.env import EightPuzzleEnv
+from rl_8puzzle.policy import CompiledPolicy
+from rl_8puzzle.solvers import is_solvable
+from rl_8puzzle.train_q_learning import Q_PATH, load_q
+
+State = Tuple[int, ...]
+Result = Dict[str, Any]
+
+_policy: Dict[str, Any] = {}
+
+
+def _init_worker(q_path: str, max_steps: int) -> None:
+    """Load and compile the policy once per worker process."""
+    _policy["policy"] = CompiledPolicy.from_q(load_q(q_path))
+    _policy["max_steps"] = max_steps
+
+
+def _start_error(start: Any) -> str | None:
+    """Why `start` cannot be solved, or None for a solvable 3x3 board."""
+    if not isinstance(start, (list, tuple)) or len(start) != 9:
+        return "start must be a list of 9 ints"
+    try:
+        is_permutation = sorted(start) == list(range(9))
+    except TypeError:
+        is_permutation = False
+    if not is_permutation:
+        return "start must be a permutation of 0..8"
+    if not is_solvable(tuple(start), 3):
+        return "start is unsolvable (odd parity)"
+    return None
+
+
+def _solve_chunk(starts: List[State]) -> List[Result]:
+    policy, max_steps = _policy["policy"], _policy["max_steps"]
+    results = []
+    for start in starts:
+        error = _start_error(start)
+        if error is not None:
+            results.append({"start": start, "success": False, "error": error})
+            continue
+        t0 = time.perf_counter()
+        solution = policy.solve(tuple(start), max_steps=max_steps)
+        latency = time.perf_counter() - t0
+        results.append(
+            {
+                "start": list(start),
+                "moves": solution.actions,
+                "trajectory": [list(s) for s in solution.states],
+                "success": solution.solved,
+                "latency_us": round(latency * 1e6, 1),
+            }
+        )
+    return results
+
+
+def _chunks(starts: Iterable[State], size: int) -> Iterator[List[State]]:
+    it = iter(starts)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def solve_many(
+    starts: Iterable[State],
+    workers: int = 1,
+    q_path: str | Path = Q_PATH,
+    max_steps: int = 100,
+    chunk_size: int = 256,
+) -> Iterator[Result]:
+    """
+    Solve every start state, yielding results lazily in input order.
+
+    With workers > 1 the boards are spread across a process pool in chunks.
+    At most a few chunks per worker are in flight at a time, so memory stays
+    flat however long the input iterator is.
+    """
+    if workers <= 1:
+        _init_worker(str(q_path), max_steps)
+        for chunk in _chunks(starts, chunk_size):
+            yield from _solve_chunk(chunk)
+        return
+
+    max_in_flight = 4 * workers
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(q_path), max_steps),
+    ) as pool:
+        pending: deque = deque()
+        for chunk in _chunks(starts, chunk_size):
+            pending.append(pool.submit(_solve_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _read_starts(path: str | Path) -> Iterator[Any]:
+    """
+    Start states from a JSONL file. Valid boards come back as tuples;
+    anything else is passed through as-is so `_solve_chunk` can write an
+    error record for it instead of failing the whole job.
+    """
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+                continue
+            if isinstance(data, dict):
+                data = data.get("start")
+            yield tuple(data) if _start_error(data) is None else data
+
+
+def _random_starts(count: int, scramble_moves: int) -> Iterator[State]:
+    env = EightPuzzleEnv(scramble_moves=scramble_moves)
+    for _ in range(count):
+        yield env.reset()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch-solve 8-puzzle start states.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--starts", help="JSONL file of start states")
+    source.add_argument("--random", type=int, help="solve N random scrambles")
+    parser.add_argument("--scramble", type=int, default=40)
+    parser.add_argument("--out", help="output JSONL file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--q-path", default=Q_PATH)
+    parser.add_argument("--max-steps", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.starts:
+        starts = _read_starts(args.starts)
+    else:
+        starts = _random_starts(args.random, args.scramble)
+
+    out = Path(args.out).open("w", encoding="utf-8") if args.out else sys.stdout
+    solved = total = 0
+    t0 = time.perf_counter()
+    try:
+        for result in solve_many(
+            starts, workers=args.workers, q_path=args.q_path, max_steps=args.max_steps
+        ):
+            out.write(json.dumps(result) + "\n")
+            total += 1
+            solved += result["success"]
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    seconds = time.perf_counter() - t0
+    print(
+        f"[batch] {solved}/{total} solved in {seconds:.2f}s "
+        f"({total / max(seconds, 1e-9):.0f} boards/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Small performance benchmarks for the project.
+
+Usage:
+    python -m rl_8puzzle.benchmark q-tables --episodes 5000
+    python -m rl_8puzzle.benchmark vec-env --num-envs 4096 --size 4
+    python -m rl_8puzzle.benchmark parallel --episodes 20000 --workers 1 2 4 8
+    python -m rl_8puzzle.benchmark heuristics --boards 5 --scramble 200
+    python -m rl_8puzzle.benchmark render --moves 20 --substeps 10 --workers 1 4 --backends redraw retained sprite
+    python -m rl_8puzzle.benchmark replay --episodes 10000 --target 0.95
+    python -m rl_8puzzle.benchmark curriculum --episodes 20000 --target 0.9
+    python -m rl_8puzzle.benchmark dyna --planning-steps 10 --target 0.9
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from rl_8puzzle.curriculum import CurriculumScheduler
+from rl_8puzzle.env import EightPuzzleEnv
+from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+from rl_8puzzle.pattern_db import PDB_DIR, PatternDatabase
+from rl_8puzzle.q_table import RankedQTable
+from rl_8puzzle.solvers import IDAStarSolver, ManhattanLinearConflict
+from rl_8puzzle.train_q_learning import greedy_success_rate, train, train_dyna, train_parallel
+from rl_8puzzle.vec_env import VecNPuzzleEnv
+
+
+def _dict_q_nbytes(Q) -> int:
+    """Approximate deep size of a dict Q-table (dict + keys + states + floats)."""
+    seen = set()
+    total = sys.getsizeof(Q)
+    for key, value in Q.items():
+        state, _ = key
+        for obj in (key, state, value):
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def bench_q_tables(num_episodes: int = 5000, scramble_moves: int = 30) -> None:
+    """Compare memory and updates/sec of the dict and ranked Q-table backends."""
+    print(f"[bench] Q-learning, {num_episodes} episodes, scramble={scramble_moves}")
+    print(f"{'backend':>8} | {'updates':>9} | {'seconds':>8} | {'updates/s':>10} | {'table MB':>9}")
+
+    for backend in ("dict", "ranked"):
+        stats: dict = {}
+        Q = train(
+            num_episodes=num_episodes,
+            scramble_moves=scramble_moves,
+            backend=backend,
+            stats=stats,
+        )
+        nbytes = Q.nbytes if isinstance(Q, RankedQTable) else _dict_q_nbytes(Q)
+        print(
+            f"{backend:>8} | {stats['updates']:>9} | {stats['seconds']:>8.2f} | "
+            f"{stats['updates'] / stats['seconds']:>10.0f} | {nbytes / 1e6:>9.1f}"
+        )
+
+
+def bench_vec_env(
+    num_envs: int = 4096, size: int = 3, num_steps: int = 500, scramble_moves: int = 30
+) -> None:
+    """Random-policy env steps/sec of VecNPuzzleEnv."""
+    env = VecNPuzzleEnv(num_envs, size=size, scramble_moves=scramble_moves, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, size=(num_steps, num_envs))
+
+    t0 = time.perf_counter()
+    finished = 0
+    for t in range(num_steps):
+        _, _, dones, _ = env.step(actions[t])
+        finished += int(dones.sum())
+    seconds = time.perf_counter() - t0
+
+    steps = num_steps * num_envs
+    print(
+        f"[bench] VecNPuzzleEnv size={size} B={num_envs}: {steps} steps in "
+        f"{seconds:.2f}s -> {steps / seconds / 1e6:.2f}M steps/s "
+        f"({finished} episodes finished)"
+    )
+
+
+def bench_parallel(num_episodes: int = 20_000, workers=None, sync_interval: int = 500) -> None:
+    """
+    Episodes/sec of train_parallel for several worker counts, with the
+    greedy solve rate on 1000 fixed scramble-30 boards as a quality check.
+    """
+    if not workers:
+        cpus = os.cpu_count() or 1
+        workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    random.seed(0)
+    env = EightPuzzleEnv(scramble_moves=30, use_table=True)
+    eval_ranks = np.array([env.reset_rank() for _ in range(1000)])
+
+    print(
+        f"[bench] train_parallel, {num_episodes} episodes, sync every {sync_interval}, "
+        f"{os.cpu_count()} CPUs"
+    )
+    print(f"{'workers':>7} | {'seconds':>8} | {'episodes/s':>10} | {'speedup':>7} | {'solved':>6}")
+    base = None
+    for w in workers:
+        stats: dict = {}
+        Q = train_parallel(
+            num_episodes=num_episodes, num_workers=w, sync_interval=sync_interval, stats=stats
+        )
+        rate = stats["episodes"] / stats["seconds"]
+        base = base or rate
+        print(
+            f"{w:>7} | {stats['seconds']:>8.2f} | {rate:>10.0f} | {rate / base:>6.2f}x | "
+            f"{greedy_success_rate(Q, eval_ranks):>6.1%}"
+        )
+
+
+def bench_heuristics(
+    num_boards: int = 5, scramble_moves: int = 200, pdb_dir: str = str(PDB_DIR), seed: int = 0
+) -> None:
+    """IDA* expansions and time with Manhattan, Manhattan + LC and the 4x4 pattern DB."""
+    random.seed(seed)
+    env = NPuzzleEnv(size=4, scramble_moves=scramble_moves)
+    boards = [env.reset() for _ in range(num_boards)]
+    heuristics = {
+        "manhattan": ManhattanLinearConflict(4, linear_conflict=False),
+        "md+lc": ManhattanLinearConflict(4),
+        "pdb": PatternDatabase(pdb_dir),
+    }
+
+    print(f"[bench] IDA* on {num_boards} 4x4 boards, scramble={scramble_moves}")
+    print(f"{'heuristic':>10} | {'expanded':>10} | {'seconds':>8}")
+    for name, heuristic in heuristics.items():
+        solver = IDAStarSolver(4, heuristic=heuristic)
+        expanded = 0
+        t0 = time.perf_counter()
+        for board in boards:
+            solver.solve(board)
+            expanded += solver.nodes_expanded
+        print(f"{name:>10} | {expanded:>10} | {time.perf_counter() - t0:>8.2f}")
+
+
+def _random_walk(num_moves: int, seed: int = 0):
+    """A trajectory of `num_moves` real (non-wall) moves, for render benchmarks."""
+    random.seed(seed)
+    env = EightPuzzleEnv(scramble_moves=0)
+    states = [env.state]
+    while len(states) <= num_moves:
+        state, _, _, _ = env.step(random.choice((0, 1, 2, 3)))
+        if state != states[-1]:
+            states.append(state)
+    return states
+
+
+def bench_render(
+    num_moves: int = 20, substeps: int = 10, workers=(1,), backends=("redraw", "retained", "sprite")
+) -> None:
+    """Frames/sec of the MP4 pipeline for each render backend and worker count."""
+    from rl_8puzzle.animate_3d import animate_frames_to_mp4, build_interpolated_frames
+
+    frames = build_interpolated_frames(_random_walk(num_moves), substeps=substeps)
+    print(f"[bench] render {len(frames)} frames ({num_moves} moves x {substeps} substeps)")
+    print(f"{'backend':>9} | {'workers':>7} | {'seconds':>8} | {'frames/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            for w in workers:
+                t0 = time.perf_counter()
+                animate_frames_to_mp4(
+                    frames, save_path=Path(tmp) / f"bench_{backend}_{w}.mp4", workers=w, backend=backend
+                )
+                seconds = time.perf_counter() - t0
+                print(f"{backend:>9} | {w:>7} | {seconds:>8.2f} | {len(frames) / seconds:>8.1f}")
+
+
+def _time_to_target(curve, target: float):
+    """First (episodes, seconds) point of a train() curve at or above `target`."""
+    for point in curve:
+        if point["success_rate"] >= target:
+            return point["episodes"], point["seconds"]
+    return None
+
+
+def bench_replay(
+    num_episodes: int = 10_000, target: float = 0.95, replay_batch: int = 32, seed: int = 0
+) -> None:
+    """Episodes and seconds until the rolling success rate reaches `target`."""
+    print(
+        f"[bench] ranked Q-learning, {num_episodes} episodes, target success {target:.0%} "
+        f"(rolling 500 episodes), replay_batch={replay_batch}"
+    )
+    print(f"{'replay':>11} | {'episodes':>8} | {'seconds':>8} | {'final':>6} | {'total s':>8}")
+    for replay in (None, "uniform", "prioritized"):
+        random.seed(seed)
+        stats: dict = {}
+        train(
+            num_episodes=num_episodes,
+            backend="ranked",
+            replay=replay,
+            replay_batch=replay_batch,
+            stats=stats,
+        )
+        hit = _time_to_target(stats["curve"], target)
+        episodes, seconds = (f"{hit[0]:>8}", f"{hit[1]:>8.2f}") if hit else (f"{'-':>8}", f"{'-':>8}")
+        print(
+            f"{replay or 'none':>11} | {episodes} | {seconds} | "
+            f"{stats['curve'][-1]['success_rate']:>6.1%} | {stats['seconds']:>8.2f}"
+        )
+
+
+def bench_curriculum(
+    num_episodes: int = 20_000,
+    target: float = 0.9,
+    scramble_moves: int = 30,
+    window: int = 100,
+    eval_boards: int = 1000,
+    seed: int = 0,
+) -> None:
+    """
+    Fixed scramble depth vs CurriculumScheduler: episodes and seconds until
+    the greedy policy solves `target` of a fixed set of boards scrambled
+    `scramble_moves` deep (checked every 500 episodes).
+    """
+    random.seed(seed)
+    env = EightPuzzleEnv(scramble_moves=scramble_moves, use_table=True)
+    eval_ranks = np.array([env.reset_rank() for _ in range(eval_boards)])
+    print(
+        f"[bench] ranked Q-learning, {num_episodes} episodes, target: greedy solves "
+        f"{target:.0%} of {eval_boards} boards at scramble {scramble_moves}"
+    )
+    print(f"{'schedule':>10} | {'episodes':>8} | {'seconds':>8} | {'final':>6} | {'total s':>8}")
+    schedules = {
+        "fixed": None,
+        "curriculum": CurriculumScheduler(max_depth=scramble_moves, window=window, seed=seed),
+    }
+    for name, curriculum in schedules.items():
+        random.seed(seed)
+        stats: dict = {}
+        train(
+            num_episodes=num_episodes,
+            scramble_moves=scramble_moves,
+            backend="ranked",
+            curriculum=curriculum,
+            eval_ranks=eval_ranks,
+            stats=stats,
+        )
+        hit = next(
+            ((p["episodes"], p["seconds"]) for p in stats["curve"] if p["eval_success"] >= target), None
+        )
+        episodes, seconds = (f"{hit[0]:>8}", f"{hit[1]:>8.2f}") if hit else (f"{'-':>8}", f"{'-':>8}")
+        print(
+            f"{name:>10} | {episodes} | {seconds} | "
+            f"{stats['curve'][-1]['eval_success']:>6.1%} | {stats['seconds']:>8.2f}"
+        )
+
+
+def bench_dyna(
+    planning_steps: int = 10,
+    target: float = 0.9,
+    max_episodes: int = 30_000,
+    eval_boards: int = 1000,
+    seed: int = 0,
+) -> None:
+    """
+    Q-learning vs Dyna-Q vs prioritized sweeping: real episodes, real steps
+    and CPU time until the greedy policy solves `target` of a fixed set of
+    boards (checked every 50 episodes; evaluation time not counted).
+    """
+    random.seed(seed)
+    env = EightPuzzleEnv(scramble_moves=30, use_table=True)
+    eval_ranks = np.array([env.reset_rank() for _ in range(eval_boards)])
+    print(
+        f"[bench] target: greedy solves {target:.0%} of {eval_boards} boards at scramble 30, "
+        f"{planning_steps} planning steps per real step"
+    )
+    print(
+        f"{'mode':>10} | {'episodes':>8} | {'real steps':>10} | {'backups':>9} | "
+        f"{'cpu s':>6} | {'final':>6}"
+    )
+    modes = (("q-learning", 0, False), ("dyna", planning_steps, False), ("sweeping", planning_steps, True))
+    for name, steps, sweeping in modes:
+        random.seed(seed)
+        stats: dict = {}
+        train_dyna(
+            num_episodes=max_episodes,
+            planning_steps=steps,
+            sweeping=sweeping,
+            eval_ranks=eval_ranks,
+            target=target,
+            stats=stats,
+        )
+        print(
+            f"{name:>10} | {stats['episodes']:>8} | {stats['real_steps']:>10} | "
+            f"{stats['backups']:>9} | {stats['cpu_seconds']:>6.2f} | "
+            f"{stats['curve'][-1]['eval_success']:>6.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("q-tables", help="dict vs ranked Q-table backends")
+    p.add_argument("--episodes", type=int, default=5000)
+    p.add_argument("--scramble", type=int, default=30)
+
+    p = sub.add_parser("vec-env", help="VecNPuzzleEnv steps/sec")
+    p.add_argument("--num-envs", type=int, default=4096)
+    p.add_argument("--size", type=int, default=3)
+    p.add_argument("--steps", type=int, default=500)
+
+    p = sub.add_parser("parallel", help="train_parallel scaling")
+    p.add_argument("--episodes", type=int, default=20_000)
+    p.add_argument("--workers", type=int, nargs="*")
+    p.add_argument("--sync-interval", type=int, default=500)
+
+    p = sub.add_parser("heuristics", help="IDA* heuristics on 4x4 boards")
+    p.add_argument("--boards", type=int, default=5)
+    p.add_argument("--scramble", type=int, default=200)
+    p.add_argument("--pdb-dir", default=str(PDB_DIR))
+
+    p = sub.add_parser("render", help="MP4 rendering frames/sec")
+    p.add_argument("--moves", type=int, default=20)
+    p.add_argument("--substeps", type=int, default=10)
+    p.add_argument("--workers", type=int, nargs="*", default=[1])
+    p.add_argument("--backends", nargs="*", default=["redraw", "retained", "sprite"])
+
+    p = sub.add_parser("replay", help="tabular experience replay: time to target success")
+    p.add_argument("--episodes", type=int, default=10_000)
+    p.add_argument("--target", type=float, default=0.95)
+    p.add_argument("--replay-batch", type=int, default=32)
+
+    p = sub.add_parser("curriculum", help="fixed vs adaptive scramble depth: time to target")
+    p.add_argument("--episodes", type=int, default=20_000)
+    p.add_argument("--target", type=float, default=0.9)
+    p.add_argument("--scramble", type=int, default=30)
+    p.add_argument("--window", type=int, default=100)
+
+    p = sub.add_parser("dyna", help="Dyna-Q / prioritized sweeping: real episodes to target")
+    p.add_argument("--planning-steps", type=int, default=10)
+    p.add_argument("--target", type=float, default=0.9)
+    p.add_argument("--max-episodes", type=int, default=30_000)
+
+    args = parser.parse_args()
+    if args.bench == "q-tables":
+        bench_q_tables(num_episodes=args.episodes, scramble_moves=args.scramble)
+    elif args.bench == "vec-env":
+        bench_vec_env(num_envs=args.num_envs, size=args.size, num_steps=args.steps)
+    elif args.bench == "parallel":
+        bench_parallel(
+            num_episodes=args.episodes, workers=args.workers, sync_interval=args.sync_interval
+        )
+    elif args.bench == "heuristics":
+        bench_heuristics(
+            num_boards=args.boards, scramble_moves=args.scramble, pdb_dir=args.pdb_dir
+        )
+    elif args.bench == "render":
+        bench_render(
+            num_moves=args.moves,
+            substeps=args.substeps,
+            workers=args.workers,
+            backends=args.backends,
+        )
+    elif args.bench == "replay":
+        bench_replay(
+            num_episodes=args.episodes, target=args.target, replay_batch=args.replay_batch
+        )
+    elif args.bench == "curriculum":
+        bench_curriculum(
+            num_episodes=args.episodes,
+            target=args.target,
+            scramble_moves=args.scramble,
+            window=args.window,
+        )
+    elif args.bench == "dyna":
+        bench_dyna(
+            planning_steps=args.planning_steps, target=args.target, max_episodes=args.max_episodes
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import random
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+
+State = Tuple[int, ...]
+
+# Board cell i lives in bits [4*i, 4*i + 4); 4x4 boards fill exactly 64 bits.
+BITS_PER_TILE = 4
+TILE_MASK = 0xF
+MAX_SIZE = 4
+
+
+def pack_state(state: State) -> int:
+    """Pack a tuple board into one integer, 4 bits per cell."""
+    packed = 0
+    for i, tile in enumerate(state):
+        packed |= tile << (BITS_PER_TILE * i)
+    return packed
+
+
+def pack_boards(boards: np.ndarray) -> np.ndarray:
+    """Vectorized `pack_state` over the last axis of a uint8 board array -> uint64."""
+    cells = boards.shape[-1]
+    if cells > 64 // BITS_PER_TILE:
+        raise ValueError(f"Packed boards support size <= {MAX_SIZE}, got {cells} cells")
+    shifts = np.arange(cells, dtype=np.uint64) * np.uint64(BITS_PER_TILE)
+    return np.bitwise_or.reduce(boards.astype(np.uint64) << shifts, axis=-1)
+
+
+def unpack_state(packed: int, size: int) -> State:
+    """Inverse of `pack_state`."""
+    return tuple(
+        (packed >> (BITS_PER_TILE * i)) & TILE_MASK for i in range(size * size)
+    )
+
+
+def blank_of(packed: int, size: int) -> int:
+    """Cell index of the blank (the only zero nibble)."""
+    for i in range(size * size):
+        if not (packed >> (BITS_PER_TILE * i)) & TILE_MASK:
+            return i
+    raise ValueError("Packed board has no blank")
+
+
+@lru_cache(maxsize=None)
+def _neighbors(size: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Blank target cell per (cell, action); invalid moves point at the cell itself."""
+    table = []
+    for idx in range(size * size):
+        r, c = divmod(idx, size)
+        row = []
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r_new, c_new = r + dr, c + dc
+            if 0 <= r_new < size and 0 <= c_new < size:
+                row.append(r_new * size + c_new)
+            else:
+                row.append(idx)
+        table.append(tuple(row))
+    return tuple(table)
+
+
+def move_packed(packed: int, blank: int, action: int, size: int) -> Tuple[int, int]:
+    """
+    Slide the blank in a packed board.
+
+    Returns (packed, blank) after the move; invalid moves are no-ops.
+    """
+    target = _neighbors(size)[blank][action]
+    if target == blank:
+        return packed, blank
+    shift = BITS_PER_TILE * target
+    tile = (packed >> shift) & TILE_MASK
+    # The blank's nibble is zero, so two XORs move the tile across.
+    return packed ^ (tile << shift) ^ (tile << (BITS_PER_TILE * blank)), target
+
+
+class PackedNPuzzleEnv(NPuzzleEnv):
+    """
+    NPuzzleEnv variant whose states are packed integers (see `pack_state`).
+
+    Hashing, equality and storage of a state cost the same as a plain int.
+    The blank position is tracked separately in `self.blank` so moves are
+    pure shift/mask operations. Supports sizes up to 4x4 (64 bits).
+    """
+
+    def __init__(self, size: int = 4, scramble_moves: int = 30):
+        if size > MAX_SIZE:
+            raise ValueError(f"Packed boards support size <= {MAX_SIZE}, got {size}")
+        super().__init__(size=size, scramble_moves=scramble_moves)
+        self.goal_packed: int = pack_state(self.goal_state)
+        self.goal_blank: int = size * size - 1
+        self.state: int = self.goal_packed
+        self.blank: int = self.goal_blank
+
+    def set_state(self, state: State) -> int:
+        """Load a tuple board; returns its packed form."""
+        self.state = pack_state(state)
+        self.blank = state.index(0)
+        return self.state
+
+    def reset(self) -> int:
+        """Scramble goal state by random legal moves."""
+        packed, blank = self.goal_packed, self.goal_blank
+        for _ in range(self.scramble_moves):
+            packed, blank = move_packed(packed, blank, random.choice(self.ACTIONS), self.size)
+        self.state, self.blank = packed, blank
+        return packed
+
+    def step(self, action: int):
+        if action not in self.ACTIONS:
+            raise ValueError(f"Invalid action: {action}")
+        self.state, self.blank = move_packed(self.state, self.blank, action, self.size)
+        done = self.state == self.goal_packed
+        reward = 20.0 if done else -1.0
+        info: Dict[str, Any] = {}
+        return self.state, reward, done, info
+
+    def render(self) -> None:
+        n = self.size
+        s = unpack_state(self.state, n)
+        for r in range(n):
+            row = s[r * n : (r + 1) * n]
+            print(" ".join("_" if x == 0 else str(x) for x in row))
+        print()
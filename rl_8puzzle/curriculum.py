@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Tuple
+
+import numpy as np
+
+
+class CurriculumScheduler:
+    """
+    Scramble-depth curriculum driven by rolling success rates.
+
+    Results are kept per start depth in windows of the last `window`
+    episodes. Once `window` episodes have finished at the current depth
+    since it was last changed, the depth goes up by `step` if their
+    success rate is at least `promote`, or down by `step` if it is below
+    `demote`. `sample()` returns the depth for the next episode: the
+    current one, or with probability `review` a uniformly drawn easier
+    depth so solved boards are not forgotten. Batched trainers can use
+    `depth` directly and `record` whole arrays of results.
+    """
+
+    def __init__(
+        self,
+        min_depth: int = 1,
+        max_depth: int = 30,
+        start_depth: int | None = None,
+        window: int = 200,
+        promote: float = 0.8,
+        demote: float = 0.3,
+        step: int = 1,
+        review: float = 0.2,
+        seed: int | None = None,
+    ) -> None:
+        if not 1 <= min_depth <= max_depth:
+            raise ValueError(f"Bad depth range [{min_depth}, {max_depth}]")
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.depth = min(max(start_depth or min_depth, min_depth), max_depth)
+        self.window = window
+        self.promote = promote
+        self.demote = demote
+        self.step = step
+        self.review = review
+        self.rng = np.random.default_rng(seed)
+
+        self.episodes = 0
+        self.changes: List[Tuple[int, int]] = []  # (episodes so far, new depth)
+        self._results: Dict[int, Deque[bool]] = defaultdict(lambda: deque(maxlen=window))
+        self._fresh = 0  # results at the current depth since the last change
+
+    def sample(self) -> int:
+        if self.depth > self.min_depth and self.rng.random() < self.review:
+            return int(self.rng.integers(self.min_depth, self.depth))
+        return self.depth
+
+    def success_rate(self, depth: int | None = None) -> float:
+        results = self._results.get(self.depth if depth is None else depth)
+        return sum(results) / len(results) if results else 0.0
+
+    def record(self, depth, solved) -> bool:
+        """Record finished episodes (scalars or arrays); True if the depth changed."""
+        for d, s in zip(np.atleast_1d(depth).tolist(), np.atleast_1d(solved).tolist()):
+            self._results[d].append(bool(s))
+            self.episodes += 1
+            if d == self.depth:
+                self._fresh += 1
+        return self._update()
+
+    def _update(self) -> bool:
+        if self._fresh < self.window:
+            return False
+        rate = self.success_rate()
+        if rate >= self.promote and self.depth < self.max_depth:
+            depth = min(self.depth + self.step, self.max_depth)
+        elif rate < self.demote and self.depth > self.min_depth:
+            depth = max(self.depth - self.step, self.min_depth)
+        else:
+            return False
+        self.depth = depth
+        self._fresh = 0
+        self.changes.append((self.episodes, depth))
+        return True
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import random
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from rl_8puzzle.transitions import bfs_distances, load_transition_table
+
+INDEX_PATH = Path(__file__).with_name("depth_index.npz")
+
+
+class DepthIndex:
+    """
+    Every reachable 8-puzzle state grouped by optimal solution length.
+
+    `order` lists all ranks sorted by depth and `offsets[d]` is where depth d
+    starts, so "all states with depth >= k" is the suffix order[offsets[k]:]
+    and a uniform sample from it is one random index.
+    """
+
+    def __init__(self, order: np.ndarray, offsets: np.ndarray, depths: np.ndarray) -> None:
+        self.order = order
+        self.offsets = offsets
+        self.depths = depths
+
+    @property
+    def max_depth(self) -> int:
+        return len(self.offsets) - 2
+
+    @classmethod
+    def build(cls) -> "DepthIndex":
+        depths = bfs_distances(load_transition_table()).astype(np.int8)
+        order = np.argsort(depths, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(depths[order], np.arange(int(depths.max()) + 2))
+        return cls(order, offsets.astype(np.int64), depths)
+
+    def save(self, path: str | Path = INDEX_PATH) -> None:
+        """Write via a temp file and rename, so concurrent readers never see a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, order=self.order, offsets=self.offsets, depths=self.depths)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path = INDEX_PATH) -> "DepthIndex":
+        with np.load(path) as data:
+            return cls(data["order"], data["offsets"], data["depths"])
+
+    def depth(self, rank: int) -> int:
+        return int(self.depths[rank])
+
+    def count(self, min_depth: int) -> int:
+        """Number of states whose optimal solution needs >= min_depth moves."""
+        min_depth = max(0, min(min_depth, self.max_depth + 1))
+        return len(self.order) - int(self.offsets[min_depth])
+
+    def sample(
+        self,
+        min_depth: int,
+        exclude: Callable[[np.ndarray], np.ndarray] | None = None,
+        rng: random.Random | None = None,
+        quick_tries: int = 8,
+    ) -> int | None:
+        """
+        Uniform random rank with depth >= min_depth among the ranks not
+        excluded. `exclude` maps an array of ranks to a bool mask of ranks
+        to skip (e.g. UsedStartStore.contains_ranks). A few random draws
+        are tried first; if all are excluded, the whole suffix is masked
+        and the draw is made from what is left, so None means that no
+        qualifying rank exists at all.
+        """
+        rng = rng or random
+        start = int(self.offsets[max(0, min(min_depth, self.max_depth + 1))])
+        candidates = self.order[start:]
+        if not len(candidates):
+            return None
+        if exclude is None:
+            return int(candidates[rng.randrange(len(candidates))])
+
+        draws = candidates[[rng.randrange(len(candidates)) for _ in range(quick_tries)]]
+        free = draws[~exclude(draws)]
+        if len(free):
+            return int(free[0])
+        free = candidates[~exclude(candidates)]
+        return int(free[rng.randrange(len(free))]) if len(free) else None
+
+
+def load_depth_index(path: str | Path = INDEX_PATH) -> DepthIndex:
+    """Load the persisted index, building and saving it on first use."""
+    path = Path(path)
+    if path.exists():
+        return DepthIndex.load(path)
+    index = DepthIndex.build()
+    index.save(path)
+    return index
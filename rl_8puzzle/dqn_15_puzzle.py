@@ -1,13 +1,32 @@
-import random
-from collections import deque
-from typing import Tuple
+"""
+DQN for the N x N sliding puzzle (15-puzzle by default).
+
+    python -m rl_8puzzle.dqn_15_puzzle --steps 2000000 --num-envs 256 --threads 4
+
+Experience comes from a VecNPuzzleEnv stepped in batches, goes into a
+NumPy ring ReplayBuffer, and trains DQNTiles against a periodically
+synced target network. Progress (success rate, loss, samples/sec) is
+printed and kept as a learning curve; checkpoints go to DQN_PATH.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 
-from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+from rl_8puzzle.curriculum import CurriculumScheduler
+from rl_8puzzle.replay import Batch, PrioritizedReplayBuffer, ReplayBuffer
+from rl_8puzzle.vec_env import VecNPuzzleEnv
+
+DQN_PATH = "rl_8puzzle/dqn_15_puzzle.pt"
 
 
 class DQNTiles(nn.Module):
@@ -39,3 +58,320 @@ class DQNTiles(nn.Module):
         # flatten
         emb = emb.view(emb.size(0), -1)
         return self.net(emb)
+
+
+def linear_schedule(step: int, start: float, end: float, duration: int) -> float:
+    frac = min(step / max(duration, 1), 1.0)
+    return start + (end - start) * frac
+
+
+def model_config(model: DQNTiles) -> Dict[str, int]:
+    return {
+        "board_size": model.board_size,
+        "embed_dim": model.embedding.embedding_dim,
+        "hidden_dim": model.net[0].out_features,
+    }
+
+
+def save_checkpoint(
+    path: str | Path,
+    model: DQNTiles,
+    target: DQNTiles,
+    optimizer: optim.Optimizer,
+    progress: Dict[str, Any],
+) -> None:
+    """Write model, target, optimizer and training progress atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    torch.save(
+        {
+            "config": model_config(model),
+            "model": model.state_dict(),
+            "target": target.state_dict(),
+            "optimizer": optimizer.state_dict(),
+            "progress": progress,
+        },
+        tmp,
+    )
+    tmp.replace(path)
+
+
+def load_dqn(path: str | Path = DQN_PATH) -> DQNTiles:
+    """Rebuild the trained online network from a checkpoint, in eval mode."""
+    checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+    model = DQNTiles(**checkpoint["config"])
+    model.load_state_dict(checkpoint["model"])
+    return model.eval()
+
+
+def _td_loss(
+    model: DQNTiles, target: DQNTiles, batch: Batch, gamma: float
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Huber TD loss against the target network; also returns the TD errors."""
+    obs = torch.from_numpy(batch["obs"])
+    next_obs = torch.from_numpy(batch["next_obs"])
+    actions = torch.from_numpy(batch["actions"]).long()
+    rewards = torch.from_numpy(batch["rewards"])
+    not_done = torch.from_numpy(~batch["dones"]).float()
+
+    q = model(obs).gather(1, actions[:, None]).squeeze(1)
+    with torch.no_grad():
+        next_q = target(next_obs).max(dim=1).values
+        td_target = rewards + gamma * not_done * next_q
+    td_errors = td_target - q
+    losses = F.smooth_l1_loss(q, td_target, reduction="none")
+    if "weights" in batch:  # prioritized replay importance weights
+        losses = losses * torch.from_numpy(batch["weights"])
+    return losses.mean(), td_errors.detach()
+
+
+def train_dqn(
+    size: int = 4,
+    total_steps: int = 2_000_000,
+    num_envs: int = 256,
+    scramble_moves: int = 15,
+    max_episode_steps: int = 60,
+    buffer_size: int = 1_000_000,
+    batch_size: int = 512,
+    learning_starts: int = 20_000,
+    updates_per_step: int = 1,
+    gamma: float = 0.99,
+    lr: float = 5e-4,
+    target_update: int = 1_000,
+    epsilon_start: float = 1.0,
+    epsilon_end: float = 0.05,
+    epsilon_decay_steps: int = 500_000,
+    prioritized: bool = False,
+    per_alpha: float = 0.6,
+    per_beta_start: float = 0.4,
+    curriculum: CurriculumScheduler | None = None,
+    num_threads: int | None = None,
+    log_interval: int = 50_000,
+    checkpoint_path: str | Path | None = DQN_PATH,
+    checkpoint_interval: int = 250_000,
+    resume: bool = False,
+    seed: int | None = None,
+    stats: Dict[str, Any] | None = None,
+) -> DQNTiles:
+    """
+    Train DQNTiles on batched N x N puzzles.
+
+    Every iteration steps all `num_envs` boards once with one ε-greedy
+    forward pass, stores the `num_envs` transitions in the replay buffer
+    and then runs `updates_per_step` gradient steps on `batch_size`
+    samples. The target network is synced every `target_update` gradient
+    steps. Episodes end at the goal or after `max_episode_steps` moves
+    (time-limit cuts still bootstrap, since the state is not terminal).
+
+    prioritized=True samples from a PrioritizedReplayBuffer (sum tree),
+    weights the loss by its importance weights with beta annealed from
+    `per_beta_start` to 1, and feeds the new TD errors back as priorities.
+
+    With a CurriculumScheduler, new episodes start at its current depth
+    instead of `scramble_moves`, and every finished episode (solved or
+    timed out) is recorded with the depth it started from.
+
+    total_steps counts environment transitions. With resume=True an
+    existing checkpoint's weights, optimizer and step count are restored
+    (the replay buffer is not saved and refills from scratch).
+    num_threads, if given, is applied with torch.set_num_threads, which
+    affects the whole process; by default torch's setting is left alone.
+    stats receives steps / episodes / seconds / samples_per_sec / curve.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)  # process-wide, so only on request
+    if seed is not None:
+        torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+
+    model = DQNTiles(board_size=size)
+    target = DQNTiles(board_size=size)
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    progress: Dict[str, Any] = {"steps": 0, "episodes": 0, "updates": 0, "curve": []}
+
+    if resume and checkpoint_path is not None and Path(checkpoint_path).exists():
+        checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
+        model.load_state_dict(checkpoint["model"])
+        target.load_state_dict(checkpoint["target"])
+        optimizer.load_state_dict(checkpoint["optimizer"])
+        progress = checkpoint["progress"]
+        print(f"[dqn] Resumed from {checkpoint_path} at step {progress['steps']}")
+    else:
+        target.load_state_dict(model.state_dict())
+    target.eval()
+
+    env = VecNPuzzleEnv(num_envs, size=size, scramble_moves=scramble_moves, seed=seed)
+    if curriculum is not None:
+        env.set_scramble_moves(curriculum.depth)
+    if prioritized:
+        buffer: ReplayBuffer = PrioritizedReplayBuffer(
+            buffer_size, size * size, alpha=per_alpha, beta=per_beta_start, seed=seed
+        )
+    else:
+        buffer = ReplayBuffer(buffer_size, size * size, seed=seed)
+    curve: List[Dict[str, float]] = progress["curve"]
+
+    obs = env.reset()
+    episode_steps = np.zeros(num_envs, dtype=np.int64)
+    start_depth = np.full(num_envs, env.scramble_moves)
+    solved = finished = 0
+    losses: List[float] = []
+    t0 = t_log = time.perf_counter()
+    steps_at_log = progress["steps"]
+    samples = samples_at_log = 0
+    next_log = steps_at_log + log_interval
+    next_checkpoint = progress["steps"] + checkpoint_interval
+
+    while progress["steps"] < total_steps:
+        epsilon = linear_schedule(progress["steps"], epsilon_start, epsilon_end, epsilon_decay_steps)
+        with torch.no_grad():
+            actions = model(torch.from_numpy(obs)).argmax(dim=1).numpy().astype(np.uint8)
+        explore = rng.random(num_envs) < epsilon
+        actions[explore] = rng.integers(0, 4, size=int(explore.sum()))
+
+        next_obs, rewards, dones, info = env.step(actions)
+        stored_next = next_obs
+        if dones.any():
+            # Auto-reset replaced those rows; store the real terminal boards.
+            stored_next = next_obs.copy()
+            stored_next[info["final_index"]] = info["final_boards"]
+        buffer.add_batch(obs, actions, rewards, stored_next, dones)
+
+        episode_steps += 1
+        episode_steps[dones] = 0
+        timed_out = np.flatnonzero(episode_steps >= max_episode_steps)
+        if len(timed_out):
+            env.reset_boards(timed_out)
+            next_obs[timed_out] = env.boards[timed_out]
+            episode_steps[timed_out] = 0
+        num_solved = int(dones.sum())
+        if curriculum is not None and (num_solved or len(timed_out)):
+            ended = np.concatenate([np.flatnonzero(dones), timed_out])
+            curriculum.record(start_depth[ended], np.arange(len(ended)) < num_solved)
+            start_depth[ended] = env.scramble_moves  # already restarted at this depth
+            env.set_scramble_moves(curriculum.depth)
+        solved += num_solved
+        finished += num_solved + len(timed_out)
+        progress["episodes"] += num_solved + len(timed_out)
+        obs = next_obs
+        progress["steps"] += num_envs
+
+        if len(buffer) >= learning_starts:
+            if prioritized:
+                buffer.beta = linear_schedule(progress["steps"], per_beta_start, 1.0, total_steps)
+            for _ in range(updates_per_step):
+                batch = buffer.sample(batch_size)
+                loss, td_errors = _td_loss(model, target, batch, gamma)
+                if prioritized:
+                    buffer.update_priorities(batch["indices"], td_errors.numpy())
+                optimizer.zero_grad(set_to_none=True)
+                loss.backward()
+                nn.utils.clip_grad_norm_(model.parameters(), 10.0)
+                optimizer.step()
+                losses.append(loss.item())
+                samples += batch_size
+                progress["updates"] += 1
+                if progress["updates"] % target_update == 0:
+                    target.load_state_dict(model.state_dict())
+
+        if progress["steps"] >= next_log or progress["steps"] >= total_steps:
+            now = time.perf_counter()
+            seconds = max(now - t_log, 1e-9)
+            point = {
+                "steps": progress["steps"],
+                "episodes": progress["episodes"],
+                "success_rate": solved / max(finished, 1),
+                "epsilon": epsilon,
+                "scramble": env.scramble_moves,
+                "loss": float(np.mean(losses)) if losses else float("nan"),
+                "env_steps_per_sec": (progress["steps"] - steps_at_log) / seconds,
+                "samples_per_sec": (samples - samples_at_log) / seconds,
+            }
+            curve.append(point)
+            print(
+                f"[dqn] step {point['steps']:>9} | episodes {point['episodes']:>7} | "
+                f"success {point['success_rate']:6.1%} | eps {epsilon:.3f} | "
+                f"loss {point['loss']:.4f} | {point['env_steps_per_sec']:.0f} env steps/s | "
+                f"{point['samples_per_sec']:.0f} samples/s"
+            )
+            solved = finished = 0
+            losses.clear()
+            t_log, steps_at_log, samples_at_log = now, progress["steps"], samples
+            next_log += log_interval
+
+        if checkpoint_path is not None and progress["steps"] >= next_checkpoint:
+            save_checkpoint(checkpoint_path, model, target, optimizer, progress)
+            next_checkpoint += checkpoint_interval
+
+    seconds = time.perf_counter() - t0
+    if checkpoint_path is not None:
+        save_checkpoint(checkpoint_path, model, target, optimizer, progress)
+        print(f"[dqn] Saved checkpoint to {checkpoint_path}")
+    if stats is not None:
+        stats.update(
+            steps=progress["steps"],
+            episodes=progress["episodes"],
+            seconds=seconds,
+            samples_per_sec=samples / max(seconds, 1e-9),
+            curve=curve,
+        )
+    return model.eval()
+
+
+def write_curve(curve: List[Dict[str, float]], path: str | Path) -> None:
+    """Save the learning curve as CSV (one row per log interval)."""
+    if not curve:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(curve[0]))
+        writer.writeheader()
+        writer.writerows(curve)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train a DQN on the N x N sliding puzzle.")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=2_000_000, help="environment transitions")
+    parser.add_argument("--num-envs", type=int, default=256)
+    parser.add_argument("--scramble", type=int, default=15)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--prioritized", action="store_true", help="prioritized replay")
+    parser.add_argument(
+        "--curriculum", action="store_true", help="grow the scramble depth from 1 up to --scramble"
+    )
+    parser.add_argument("--threads", type=int, help="torch CPU threads (default: torch's own setting)")
+    parser.add_argument("--checkpoint", default=DQN_PATH)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--curve", help="write the learning curve to this CSV file")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    stats: Dict[str, Any] = {}
+    train_dqn(
+        size=args.size,
+        total_steps=args.steps,
+        num_envs=args.num_envs,
+        scramble_moves=args.scramble,
+        batch_size=args.batch_size,
+        prioritized=args.prioritized,
+        curriculum=CurriculumScheduler(max_depth=args.scramble) if args.curriculum else None,
+        num_threads=args.threads,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+        seed=args.seed,
+        stats=stats,
+    )
+    print(
+        f"[dqn] {stats['steps']} steps, {stats['episodes']} episodes in "
+        f"{stats['seconds']:.1f}s ({stats['samples_per_sec']:.0f} samples/s)"
+    )
+    if args.curve:
+        write_curve(stats["curve"], args.curve)
+        print(f"[dqn] Learning curve written to {args.curve}")
+
+
+if __name__ == "__main__":
+    main()
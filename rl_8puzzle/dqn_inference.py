@@ -0,0 +1,310 @@
+"""
+Batched solving with a trained DQNTiles model.
+
+    python -m rl_8puzzle.dqn_inference --boards 10000 --scramble 30
+    python -m rl_8puzzle.dqn_inference --mode beam --beam-width 16 --quantize --torchscript
+
+All boards of a batch are rolled out together: one forward pass per step
+covers every board still unsolved, and each board drops out of the batch
+as soon as it reaches the goal.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from rl_8puzzle.bitboard import pack_boards
+from rl_8puzzle.dqn_15_puzzle import DQN_PATH, DQNTiles, load_dqn
+from rl_8puzzle.vec_env import VecNPuzzleEnv, move_boards, neighbor_table
+
+# Action that undoes each action: up <-> down, left <-> right
+REVERSE = np.array([1, 0, 3, 2])
+
+
+class Rollout(NamedTuple):
+    actions: List[List[int]]  # per board, empty if already solved
+    solved: np.ndarray  # (B,) bool
+    lengths: np.ndarray  # (B,) moves taken (max_steps if unsolved)
+    latency: np.ndarray  # (B,) seconds from batch start until the board finished
+    seconds: float
+
+
+class InferenceEngine:
+    """
+    DQNTiles wrapper for batched greedy and beam-search rollouts.
+
+    Forward passes run under torch.inference_mode in chunks of at most
+    `batch_size` boards. num_threads, if given, is applied with
+    torch.set_num_threads, which affects the whole process. quantize=True applies dynamic int8 quantization
+    to the Linear layers; torchscript=True traces the (possibly
+    quantized) model, which can then be saved with `save_torchscript`.
+    Moves that would hit the wall, and moves that undo the previous
+    move, are masked out before the argmax.
+    """
+
+    def __init__(
+        self,
+        model: DQNTiles,
+        batch_size: int = 8192,
+        torchscript: bool = False,
+        quantize: bool = False,
+        num_threads: int | None = None,
+    ) -> None:
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)  # process-wide, so only on request
+        self.size = model.board_size
+        self.batch_size = batch_size
+        self.neighbors = neighbor_table(self.size)
+        self.goal = np.array(list(range(1, self.size * self.size)) + [0], dtype=np.uint8)
+
+        model = model.eval()
+        if quantize:
+            from torch.ao.quantization import quantize_dynamic
+
+            with warnings.catch_warnings():
+                warnings.filterwarnings(
+                    "ignore", message="torch.ao.quantization is deprecated", category=DeprecationWarning
+                )
+                warnings.filterwarnings(
+                    "ignore", message="torch.quantize_per_tensor", category=UserWarning
+                )
+                model = quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        if torchscript:
+            example = torch.from_numpy(np.tile(self.goal, (2, 1)))
+            with torch.inference_mode(), warnings.catch_warnings():
+                warnings.filterwarnings(
+                    "ignore", message=r"`torch\.jit\.trace(_method)?` is deprecated", category=FutureWarning
+                )
+                model = torch.jit.trace(model, example)
+        self.model = model
+        self.scripted = torchscript
+
+    @classmethod
+    def from_checkpoint(cls, path: str | Path = DQN_PATH, **kwargs: Any) -> "InferenceEngine":
+        return cls(load_dqn(path), **kwargs)
+
+    def save_torchscript(self, path: str | Path) -> None:
+        if not self.scripted:
+            raise ValueError("Engine was built without torchscript=True")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.model.save(str(path))
+
+    def q_values(self, boards: np.ndarray) -> np.ndarray:
+        """(N, n*n) uint8 boards -> (N, 4) float32 Q-values."""
+        out = np.empty((len(boards), 4), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(boards), self.batch_size):
+                chunk = torch.from_numpy(np.ascontiguousarray(boards[start : start + self.batch_size]))
+                out[start : start + len(chunk)] = self.model(chunk).numpy()
+        return out
+
+    def _masked_q(self, boards: np.ndarray, blanks: np.ndarray, prev: np.ndarray) -> np.ndarray:
+        q = self.q_values(boards)
+        invalid = self.neighbors[blanks] == blanks[:, None]
+        has_prev = np.flatnonzero(prev >= 0)
+        invalid[has_prev, REVERSE[prev[has_prev]]] = True
+        q[invalid] = -np.inf
+        return q
+
+    def _start(self, boards: np.ndarray):
+        boards = np.array(boards, dtype=np.uint8, copy=True)
+        blanks = np.argmin(boards, axis=1).astype(np.intp)
+        solved = (boards == self.goal).all(axis=1)
+        return boards, blanks, solved
+
+    def greedy(self, boards: np.ndarray, max_steps: int = 200) -> Rollout:
+        """Follow argmax Q on every board at once."""
+        boards, blanks, solved = self._start(boards)
+        num = len(boards)
+        history = np.full((num, max_steps), -1, dtype=np.int8)
+        lengths = np.zeros(num, dtype=np.int64)
+        latency = np.zeros(num)
+        prev = np.full(num, -1, dtype=np.int64)
+        active = np.flatnonzero(~solved)
+
+        t0 = time.perf_counter()
+        for step in range(max_steps):
+            if not len(active):
+                break
+            sub_boards, sub_blanks = boards[active], blanks[active]
+            actions = self._masked_q(sub_boards, sub_blanks, prev[active]).argmax(axis=1)
+            move_boards(sub_boards, sub_blanks, actions, self.neighbors)
+            boards[active], blanks[active] = sub_boards, sub_blanks
+            history[active, step] = actions
+            prev[active] = actions
+
+            done = (sub_boards == self.goal).all(axis=1)
+            finished = active[done]
+            solved[finished] = True
+            lengths[finished] = step + 1
+            latency[finished] = time.perf_counter() - t0
+            active = active[~done]
+
+        seconds = time.perf_counter() - t0
+        lengths[active] = max_steps
+        latency[active] = seconds
+        return Rollout(_action_lists(history, lengths), solved, lengths, latency, seconds)
+
+    def beam(self, boards: np.ndarray, beam_width: int = 8, max_steps: int = 200) -> Rollout:
+        """
+        Beam search per board: every step expands the `beam_width` best
+        partial paths of all unsolved boards into their children, scores
+        all children in one forward pass by max_a Q(child, a), drops
+        duplicate boards (packed-state keys) and keeps the best
+        `beam_width` per board. A board stops at the first child that is
+        the goal.
+        """
+        starts, start_blanks, solved = self._start(boards)
+        num, cells, width = len(starts), starts.shape[1], beam_width
+        history = np.full((num, max_steps), -1, dtype=np.int8)
+        lengths = np.zeros(num, dtype=np.int64)
+        latency = np.zeros(num)
+
+        beam_boards = np.repeat(starts[:, None], width, axis=1)  # (B, W, cells)
+        beam_blanks = np.repeat(start_blanks[:, None], width, axis=1)
+        beam_prev = np.full((num, width), -1, dtype=np.int64)
+        beam_alive = np.zeros((num, width), dtype=bool)
+        beam_alive[:, 0] = True
+        beam_hist = np.full((num, width, max_steps), -1, dtype=np.int8)
+        active = np.flatnonzero(~solved)
+        child_actions = np.tile(np.arange(4), width)  # (W*4,)
+
+        t0 = time.perf_counter()
+        for step in range(max_steps):
+            if not len(active):
+                break
+            a_num = len(active)
+            # Children of every beam entry: (A, W*4, cells)
+            kids = np.repeat(beam_boards[active], 4, axis=1).reshape(-1, cells)
+            kid_blanks = np.repeat(beam_blanks[active], 4, axis=1).reshape(-1)
+            parents_blank = kid_blanks.copy()
+            acts = np.tile(child_actions, a_num)
+            move_boards(kids, kid_blanks, acts, self.neighbors)
+            kids = kids.reshape(a_num, width * 4, cells)
+            kid_blanks = kid_blanks.reshape(a_num, width * 4)
+
+            parent_prev = np.repeat(beam_prev[active], 4, axis=1)
+            valid = (
+                np.repeat(beam_alive[active], 4, axis=1)
+                & (kid_blanks != parents_blank.reshape(a_num, width * 4))
+                & ((parent_prev < 0) | (REVERSE[np.maximum(parent_prev, 0)] != child_actions))
+            )
+
+            is_goal = valid & (kids == self.goal).all(axis=2)
+            hit_rows = np.flatnonzero(is_goal.any(axis=1))
+            if len(hit_rows):
+                kid = is_goal[hit_rows].argmax(axis=1)
+                finished = active[hit_rows]
+                history[finished, :step] = beam_hist[finished, kid // 4, :step]
+                history[finished, step] = kid % 4
+                solved[finished] = True
+                lengths[finished] = step + 1
+                latency[finished] = time.perf_counter() - t0
+
+            keep = np.ones(a_num, dtype=bool)
+            keep[hit_rows] = False
+            rows = np.flatnonzero(keep & valid.any(axis=1))
+            latency[active[keep & ~valid.any(axis=1)]] = time.perf_counter() - t0  # no moves left
+            active = active[rows]
+            if not len(rows):
+                continue
+            kids, kid_blanks, valid = kids[rows], kid_blanks[rows], valid[rows]
+            a_num = len(rows)
+
+            score = np.full((a_num, width * 4), -np.inf, dtype=np.float32)
+            score[valid] = self.q_values(kids[valid]).max(axis=1)
+
+            # Drop duplicate boards within a board's children, keeping the best copy.
+            keys = pack_boards(kids)
+            order = np.lexsort((-score, keys), axis=-1)
+            sorted_keys = np.take_along_axis(keys, order, axis=1)
+            dup = np.zeros_like(valid)
+            np.put_along_axis(dup, order[:, 1:], sorted_keys[:, 1:] == sorted_keys[:, :-1], axis=1)
+            score[dup] = -np.inf
+
+            best = np.argsort(-score, axis=1, kind="stable")[:, :width]  # (A, W)
+            parent = best // 4
+            beam_boards[active] = np.take_along_axis(kids, best[..., None], axis=1)
+            beam_blanks[active] = np.take_along_axis(kid_blanks, best, axis=1)
+            beam_prev[active] = best % 4
+            beam_alive[active] = np.isfinite(np.take_along_axis(score, best, axis=1))
+            hist = np.take_along_axis(beam_hist[active], parent[..., None], axis=1)
+            hist[..., step] = best % 4
+            beam_hist[active] = hist
+
+        seconds = time.perf_counter() - t0
+        lengths[~solved] = max_steps
+        latency[active] = seconds
+        return Rollout(_action_lists(history, np.where(solved, lengths, 0)), solved, lengths, latency, seconds)
+
+
+def _action_lists(history: np.ndarray, lengths: np.ndarray) -> List[List[int]]:
+    return [row[:n].tolist() for row, n in zip(history, lengths)]
+
+
+def report(rollout: Rollout) -> Dict[str, float]:
+    """Solve rate, boards/sec, mean solution length and p50/p99 latency (ms)."""
+    num = len(rollout.solved)
+    lengths = rollout.lengths[rollout.solved]
+    return {
+        "boards": num,
+        "solved": float(rollout.solved.mean()) if num else 0.0,
+        "boards_per_sec": num / max(rollout.seconds, 1e-9),
+        "mean_moves": float(lengths.mean()) if len(lengths) else float("nan"),
+        "p50_ms": float(np.percentile(rollout.latency, 50) * 1e3) if num else 0.0,
+        "p99_ms": float(np.percentile(rollout.latency, 99) * 1e3) if num else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batched DQN rollouts on random boards.")
+    parser.add_argument("--checkpoint", default=DQN_PATH)
+    parser.add_argument("--boards", type=int, default=10_000)
+    parser.add_argument("--scramble", type=int, default=30)
+    parser.add_argument("--mode", choices=("greedy", "beam"), default="greedy")
+    parser.add_argument("--beam-width", type=int, default=8)
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=8192)
+    parser.add_argument("--torchscript", action="store_true")
+    parser.add_argument("--save-torchscript", help="also write the traced model here")
+    parser.add_argument("--quantize", action="store_true", help="dynamic int8 Linear layers")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = InferenceEngine.from_checkpoint(
+        args.checkpoint,
+        batch_size=args.batch_size,
+        torchscript=args.torchscript or bool(args.save_torchscript),
+        quantize=args.quantize,
+        num_threads=args.threads,
+    )
+    if args.save_torchscript:
+        engine.save_torchscript(args.save_torchscript)
+        print(f"[infer] TorchScript model written to {args.save_torchscript}")
+
+    env = VecNPuzzleEnv(1, size=engine.size, scramble_moves=args.scramble, seed=args.seed)
+    boards, _ = env.scramble(args.boards)
+
+    if args.mode == "beam":
+        rollout = engine.beam(boards, beam_width=args.beam_width, max_steps=args.max_steps)
+    else:
+        rollout = engine.greedy(boards, max_steps=args.max_steps)
+    stats = report(rollout)
+    print(
+        f"[infer] {args.mode}: solved {stats['solved']:.1%} of {stats['boards']} boards "
+        f"({stats['mean_moves']:.1f} moves avg) in {rollout.seconds:.2f}s | "
+        f"{stats['boards_per_sec']:.0f} boards/s | "
+        f"latency p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
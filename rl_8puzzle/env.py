@@ -1,6 +1,8 @@
 import random
 from typing import Tuple, Dict, Any
 
+from rl_8puzzle.ranking import rank_state, unrank_state
+
 GOAL_STATE: Tuple[int, ...] = (
     1,
     2,
@@ -16,6 +18,8 @@ GOAL_STATE: Tuple[int, ...] = (
 # Actions: 0=up, 1=down, 2=left, 3=right
 ACTIONS = (0, 1, 2, 3)
 
+GOAL_RANK: int = rank_state(GOAL_STATE)
+
 
 class EightPuzzleEnv:
     """
@@ -24,11 +28,36 @@ class EightPuzzleEnv:
     State: 9-tuple of ints 0..8 (0 = blank) in row-major order.
     Step reward: -1 for each move, +20 when reaching GOAL_STATE.
     Episodes start from a scrambled but solvable configuration.
+
+    With use_table=True the environment runs in the rank domain on the
+    precomputed transition table (see `transitions.py`): `step_rank` and
+    `reset_rank` are plain array lookups, while `step` / `reset` / `state`
+    still hand out 9-tuples for existing callers.
     """
 
-    def __init__(self, scramble_moves: int = 30) -> None:
+    def __init__(self, scramble_moves: int = 30, use_table: bool = False) -> None:
         self.scramble_moves = scramble_moves
-        self.state: Tuple[int, ...] = GOAL_STATE
+        self.table = None
+        if use_table:
+            from rl_8puzzle.transitions import load_transition_table
+
+            self.table = load_transition_table()
+            self._next = self.table.item
+        self.rank: int = GOAL_RANK
+        self.state = GOAL_STATE
+
+    @property
+    def state(self) -> Tuple[int, ...]:
+        # In table mode the tuple is only materialized when somebody asks.
+        if self._state is None:
+            self._state = unrank_state(self.rank)
+        return self._state
+
+    @state.setter
+    def state(self, value: Tuple[int, ...]) -> None:
+        self._state = value
+        if self.table is not None:
+            self.rank = rank_state(value)
 
     def _blank_pos(self, state: Tuple[int, ...]) -> Tuple[int, int]:
         idx = state.index(0)
@@ -61,6 +90,10 @@ class EightPuzzleEnv:
 
     def reset(self) -> Tuple[int, ...]:
         """Scramble from GOAL_STATE by random legal moves."""
+        if self.table is not None:
+            self.reset_rank()
+            return self.state
+
         self.state = GOAL_STATE
         for _ in range(self.scramble_moves):
             action = random.choice(ACTIONS)
@@ -74,6 +107,10 @@ class EightPuzzleEnv:
         Returns:
             next_state, reward, done, info
         """
+        if self.table is not None:
+            _, reward, done = self.step_rank(action)
+            return self.state, reward, done, {}
+
         next_state = self._move(self.state, action)
         done = next_state == GOAL_STATE
         reward = 20.0 if done else -1.0
@@ -81,6 +118,33 @@ class EightPuzzleEnv:
         info: Dict[str, Any] = {}
         return next_state, reward, done, info
 
+    # ---------- rank-domain API (use_table=True) ----------
+
+    def reset_rank(self) -> int:
+        """Like `reset`, but returns the rank of the scrambled state."""
+        rank = GOAL_RANK
+        for _ in range(self.scramble_moves):
+            rank = self._next(rank, random.choice(ACTIONS))
+        self.rank = rank
+        self._state = None
+        return rank
+
+    def step_rank(self, action: int):
+        """
+        Like `step`, but in the rank domain.
+
+        Returns:
+            next_rank, reward, done
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Invalid action: {action}")
+        rank = self._next(self.rank, action)
+        done = rank == GOAL_RANK
+        reward = 20.0 if done else -1.0
+        self.rank = rank
+        self._state = None
+        return rank, reward, done
+
     def render(self) -> None:
         """Pretty-print the board to stdout."""
         s = self.state
@@ -5,7 +5,8 @@ from pathlib import Path
 from typing import List, Tuple
 
 from rl_8puzzle.env import EightPuzzleEnv, ACTIONS
-from rl_8puzzle.animate_3d import load_or_train_q, greedy_trajectory
+from rl_8puzzle.animate_3d import load_or_train_q, cached_trajectory
+from rl_8puzzle.solution_cache import SolutionCache
 
 State = Tuple[int, ...]
 
@@ -14,7 +15,7 @@ def export_trajectory(path: str | Path = "rl_8puzzle/trajectory.json"):
     Q = load_or_train_q()
     env = EightPuzzleEnv(scramble_moves=20)
     env.reset()
-    states: List[State] = greedy_trajectory(env, Q)
+    states: List[State] = cached_trajectory(env, Q, SolutionCache.for_q(Q))
 
     data = {
         "size": 3,
@@ -0,0 +1,133 @@
+"""
+Incremental GIF encoding with one shared palette.
+
+    with StreamingGifWriter("out.gif", fps=10) as writer:
+        for rgb in frames:
+            writer.append_data(rgb)
+
+Frames are quantized to a palette computed once from the first frame and
+written to disk as they arrive, so memory does not grow with the number
+of frames. Runs of identical consecutive frames become a single GIF frame
+with a longer delay, and every later frame only stores the rectangle that
+changed since the previous one.
+"""
+from __future__ import annotations
+
+import io
+import struct
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Graphic Control Extension: disposal "leave in place", delay in 1/100 s
+_GCE = struct.Struct("<4BHBB")
+_DISPOSE_NONE = 1 << 2
+
+
+def _split_gif(data: bytes) -> tuple[bytes, bytes]:
+    """Split a single-frame GIF into (header + global palette, image block)."""
+    flags = data[10]
+    pos = 13 + (3 << ((flags & 0x07) + 1) if flags & 0x80 else 0)
+    header = data[:pos]
+    while data[pos] == 0x21:  # skip extensions
+        pos += 2
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+    if data[pos] != 0x2C:
+        raise ValueError("GIF has no image descriptor")
+    start = pos
+    pos += 10
+    if data[pos - 1] & 0x80:  # local color table
+        pos += 3 << ((data[pos - 1] & 0x07) + 1)
+    pos += 1  # LZW minimum code size
+    while data[pos]:
+        pos += data[pos] + 1
+    return header, data[start : pos + 1]
+
+
+class StreamingGifWriter:
+    """
+    GIF writer with the `append_data` / `close` interface of an imageio writer.
+
+    The palette (up to `colors` entries) comes from the first frame, which
+    for these animations already shows every tile color; later frames are
+    mapped onto it without dithering. Each frame (after the first, just
+    its changed bounding box) is LZW-encoded by Pillow on its own and the
+    image block is appended to the open file.
+    """
+
+    def __init__(self, path: str | Path, fps: float = 10, colors: int = 256, loop: int = 0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.frame_ms = 1000.0 / fps
+        self.colors = colors
+        self.loop = loop
+        self.frames_in = self.frames_out = 0
+
+        self._file = self.path.open("wb")
+        self._palette: Image.Image | None = None
+        self._previous: np.ndarray | None = None  # palette indices of the last frame
+        self._pending: bytes | None = None  # encoded image block
+        self._pending_frames = 0
+        self._elapsed_ms = 0.0
+        self._written_cs = 0
+
+    def __enter__(self) -> "StreamingGifWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _quantize(self, rgb: np.ndarray) -> Image.Image:
+        image = Image.fromarray(np.ascontiguousarray(rgb[..., :3]), "RGB")
+        if self._palette is None:
+            self._palette = image.quantize(self.colors, method=Image.Quantize.MEDIANCUT)
+        return image.quantize(palette=self._palette, dither=Image.Dither.NONE)
+
+    def append_data(self, rgb: np.ndarray) -> None:
+        self.frames_in += 1
+        indexed = self._quantize(rgb)
+        indices = np.asarray(indexed)
+        left = top = 0
+        if self._previous is not None:
+            changed = indices != self._previous
+            rows, cols = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if not len(rows):
+                self._pending_frames += 1
+                return
+            top, left = int(rows[0]), int(cols[0])
+            indexed = indexed.crop((left, top, int(cols[-1]) + 1, int(rows[-1]) + 1))
+
+        self._flush()
+        buf = io.BytesIO()
+        indexed.save(buf, format="GIF", optimize=False)
+        header, block = _split_gif(buf.getvalue())
+        if self._previous is None:
+            self._file.write(header)
+            # NETSCAPE2.0 application extension: loop count (0 = forever)
+            self._file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00")
+        self._pending = block[:1] + struct.pack("<HH", left, top) + block[5:]
+        self._pending_frames = 1
+        self._previous = indices
+
+    def _flush(self) -> None:
+        if self._pending is None:
+            return
+        # Round cumulative time so merged delays never drift from fps.
+        self._elapsed_ms += self._pending_frames * self.frame_ms
+        end_cs = round(self._elapsed_ms / 10)
+        delay = max(1, end_cs - self._written_cs)
+        self._written_cs += delay
+        self._file.write(_GCE.pack(0x21, 0xF9, 4, _DISPOSE_NONE, delay, 0, 0))
+        self._file.write(self._pending)
+        self.frames_out += 1
+        self._pending = None
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.write(b"\x3b")
+        self._file.close()
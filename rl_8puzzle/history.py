@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from rl_8puzzle.ranking import NUM_STATES, rank_state
+
+try:  # POSIX
+    import fcntl
+
+    def _lock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+State = Tuple[int, ...]
+
+BITMAP_PATH = Path(__file__).with_name("used_start_states.bits")
+LEGACY_JSON_PATH = Path(__file__).with_name("used_start_states.json")
+NUM_BYTES = (NUM_STATES + 7) // 8  # 22,680
+
+
+class UsedStartStore:
+    """
+    Set of already-used start states, as a 181,440-bit bitmap over state ranks.
+
+    The bitmap file is memory-mapped shared, so membership tests are one
+    bit lookup and see writes from other processes immediately. Writes set
+    a single bit under an exclusive file lock; nothing is ever rewritten
+    wholesale, so concurrent runners can record starts safely.
+    On first use, entries from the old used_start_states.json are imported.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = BITMAP_PATH,
+        legacy_json: str | Path | None = LEGACY_JSON_PATH,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = self.path.with_name(self.path.name + ".lock").open("a+b")
+
+        with self._locked():
+            if not self.path.exists() or self.path.stat().st_size != NUM_BYTES:
+                bits = np.zeros(NUM_BYTES, dtype=np.uint8)
+                if legacy_json is not None and Path(legacy_json).exists():
+                    with Path(legacy_json).open("r", encoding="utf-8") as f:
+                        for s in json.load(f):
+                            r = rank_state(tuple(s))
+                            bits[r >> 3] |= 1 << (r & 7)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_bytes(bits.tobytes())
+                tmp.replace(self.path)
+
+        self._bits = np.memmap(self.path, dtype=np.uint8, mode="r+", shape=(NUM_BYTES,))
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        _lock(self._lock_file)
+        try:
+            yield
+        finally:
+            _unlock(self._lock_file)
+
+    def contains_rank(self, rank: int) -> bool:
+        return bool(self._bits[rank >> 3] & (1 << (rank & 7)))
+
+    def contains_ranks(self, ranks: np.ndarray) -> np.ndarray:
+        """Vectorized `contains_rank`: bool mask over an array of ranks."""
+        ranks = np.asarray(ranks, dtype=np.int64)
+        return ((self._bits[ranks >> 3] >> (ranks & 7)) & 1).astype(bool)
+
+    def __contains__(self, state: State) -> bool:
+        return self.contains_rank(rank_state(state))
+
+    def claim_rank(self, rank: int) -> bool:
+        """Mark `rank` as used. Returns False if some process already had it."""
+        with self._locked():
+            if self.contains_rank(rank):
+                return False
+            self._bits[rank >> 3] |= 1 << (rank & 7)
+            self._bits.flush()
+        return True
+
+    def add(self, state: State) -> None:
+        self.claim_rank(rank_state(state))
+
+    def __len__(self) -> int:
+        return int(np.unpackbits(self._bits).sum())
+
+    def close(self) -> None:
+        self._bits.flush()
+        del self._bits
+        self._lock_file.close()
@@ -0,0 +1,281 @@
+"""
+Batched weighted A* with a DQNTiles value estimate as the heuristic.
+
+    python -m rl_8puzzle.learned_astar --boards 50 --scramble 60 --weight 1.5 --expand 64
+
+Each iteration pops the `expand` best frontier nodes, generates all their
+children with one vectorized move, and scores the new children in a
+single forward pass. With an inadmissible learned heuristic and several
+nodes expanded per iteration the solutions are not guaranteed optimal;
+the CLI reports the gap against IDA* alongside boards/sec.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import math
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from rl_8puzzle.bitboard import pack_boards
+from rl_8puzzle.solvers import IDAStarSolver, State, goal_state, is_solvable
+from rl_8puzzle.vec_env import VecNPuzzleEnv, move_boards, neighbor_table
+
+Heuristic = Callable[[np.ndarray], np.ndarray]
+
+# Action that undoes each action: up <-> down, left <-> right
+REVERSE = np.array([1, 0, 3, 2])
+
+
+def q_to_distance(q: np.ndarray, gamma: float = 0.99, goal_reward: float = 20.0) -> np.ndarray:
+    """
+    Invert the return of a d-move solution under the training rewards
+    (-1 per move, `goal_reward` on the last one):
+        Q = -(1 - gamma^(d-1)) / (1 - gamma) + goal_reward * gamma^(d-1)
+    and return d. Values above goal_reward clip to 1, very low values to a
+    large finite distance.
+    """
+    horizon = 1.0 / (1.0 - gamma)
+    frac = (np.asarray(q, dtype=np.float64) + horizon) / (horizon + goal_reward)
+    frac = np.clip(frac, 1e-12, 1.0)
+    return 1.0 + np.log(frac) / math.log(gamma)
+
+
+class DQNHeuristic:
+    """Distance-to-goal estimate from max_a Q(board, a); 0 on the goal itself."""
+
+    def __init__(self, engine, gamma: float = 0.99, goal_reward: float = 20.0) -> None:
+        self.engine = engine  # dqn_inference.InferenceEngine
+        self.gamma = gamma
+        self.goal_reward = goal_reward
+
+    def __call__(self, boards: np.ndarray) -> np.ndarray:
+        h = q_to_distance(self.engine.q_values(boards).max(axis=1), self.gamma, self.goal_reward)
+        h[(boards == self.engine.goal).all(axis=1)] = 0.0
+        return h
+
+
+def manhattan_boards(size: int) -> Heuristic:
+    """Vectorized Manhattan distance, an admissible baseline heuristic."""
+    n2 = size * size
+    goal_cell = np.empty(n2, dtype=np.intp)
+    goal_cell[np.array(goal_state(size))] = np.arange(n2)
+    cells = np.arange(n2)
+    table = np.abs(cells[None] // size - goal_cell[:, None] // size) + np.abs(
+        cells[None] % size - goal_cell[:, None] % size
+    )
+    table[0] = 0  # the blank does not count
+
+    def heuristic(boards: np.ndarray) -> np.ndarray:
+        return table[boards, cells].sum(axis=1).astype(np.float64)
+
+    return heuristic
+
+
+class LearnedAStar:
+    """
+    Weighted A* (f = g + weight * h) that expands `expand` nodes per step.
+
+    Nodes live in growable NumPy arrays; the frontier is a heap of
+    (f, h, node). Every generated board goes into a hash set of packed
+    uint64 keys and is never generated again, so there is no reopening;
+    moving the blank straight back is skipped as well. The search stops
+    as soon as the goal is generated. `heuristic` maps (N, n*n) uint8
+    boards to (N,) estimates.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        heuristic: Heuristic,
+        weight: float = 1.0,
+        expand: int = 64,
+        max_nodes: int | None = 2_000_000,
+    ) -> None:
+        if size * size > 16:
+            raise ValueError("Packed keys support boards up to 4x4")
+        self.size = size
+        self.heuristic = heuristic
+        self.weight = weight
+        self.expand = expand
+        self.max_nodes = max_nodes
+        self.neighbors = neighbor_table(size)
+        self.goal = np.array(goal_state(size), dtype=np.uint8)
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+
+    def solve(self, start: Sequence[int]) -> List[State]:
+        """Solution as a list of states [start, ..., goal], like IDAStarSolver.solve."""
+        n2 = self.size * self.size
+        start = tuple(start)
+        if len(start) != n2 or sorted(start) != list(range(n2)):
+            raise ValueError(f"Not a {self.size}x{self.size} board: {start}")
+        if not is_solvable(start, self.size):
+            raise ValueError(f"Unsolvable board: {start}")
+        self.nodes_expanded = 0
+        self.nodes_generated = 1
+        if start == tuple(self.goal):
+            return [start]
+
+        capacity = 1024
+        boards = np.empty((capacity, n2), dtype=np.uint8)
+        blanks = np.empty(capacity, dtype=np.intp)
+        g = np.empty(capacity, dtype=np.int32)
+        parent = np.empty(capacity, dtype=np.int64)
+        last = np.empty(capacity, dtype=np.int64)  # action that produced the node
+        boards[0], blanks[0], g[0], parent[0], last[0] = start, start.index(0), 0, -1, -1
+        count = 1
+
+        seen = {int(pack_boards(boards[0]))}
+        h0 = float(self.heuristic(boards[:1])[0])
+        frontier = [(self.weight * h0, h0, 0)]
+        actions = np.tile(np.arange(4), self.expand)
+
+        while frontier:
+            popped = [heapq.heappop(frontier)[2] for _ in range(min(self.expand, len(frontier)))]
+            popped = np.array(popped, dtype=np.int64)
+            self.nodes_expanded += len(popped)
+            if self.max_nodes is not None and self.nodes_expanded > self.max_nodes:
+                raise RuntimeError(f"Learned A* gave up after {self.max_nodes} expansions")
+
+            # All children of the popped nodes in one vectorized move.
+            kids = np.repeat(boards[popped], 4, axis=0)
+            kid_blanks = np.repeat(blanks[popped], 4)
+            from_blank = kid_blanks.copy()
+            kid_parent = np.repeat(popped, 4)
+            kid_actions = actions[: len(kids)]
+            move_boards(kids, kid_blanks, kid_actions, self.neighbors)
+            prev = last[kid_parent]
+            valid = (kid_blanks != from_blank) & ((prev < 0) | (REVERSE[np.maximum(prev, 0)] != kid_actions))
+
+            fresh = np.zeros(len(kids), dtype=bool)
+            for i, key in enumerate(pack_boards(kids).tolist()):
+                if valid[i] and key not in seen:
+                    seen.add(key)
+                    fresh[i] = True
+            if not fresh.any():
+                continue
+            kids, kid_blanks = kids[fresh], kid_blanks[fresh]
+            kid_parent, kid_actions = kid_parent[fresh], kid_actions[fresh]
+            kid_g = g[kid_parent] + 1
+
+            if count + len(kids) > capacity:
+                capacity = max(2 * capacity, count + len(kids))
+                boards, blanks, g, parent, last = (
+                    _grow(a, capacity) for a in (boards, blanks, g, parent, last)
+                )
+            ids = np.arange(count, count + len(kids))
+            boards[ids], blanks[ids], g[ids] = kids, kid_blanks, kid_g
+            parent[ids], last[ids] = kid_parent, kid_actions
+            count += len(kids)
+            self.nodes_generated += len(kids)
+
+            goal_hits = np.flatnonzero((kids == self.goal).all(axis=1))
+            if len(goal_hits):
+                return self._path(boards, parent, int(ids[goal_hits[np.argmin(kid_g[goal_hits])]]))
+
+            h = self.heuristic(kids)
+            f = kid_g + self.weight * h
+            for node, f_i, h_i in zip(ids.tolist(), f.tolist(), h.tolist()):
+                heapq.heappush(frontier, (f_i, h_i, node))
+
+        raise RuntimeError("Learned A* exhausted the frontier without reaching the goal")
+
+    @staticmethod
+    def _path(boards: np.ndarray, parent: np.ndarray, node: int) -> List[State]:
+        path = []
+        while node >= 0:
+            path.append(tuple(int(t) for t in boards[node]))
+            node = int(parent[node])
+        return path[::-1]
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def solve_boards(
+    solver: LearnedAStar, boards: np.ndarray, optimal: Sequence[int] | None = None
+) -> Dict[str, float]:
+    """
+    Solve each board; returns solve rate, boards/sec, nodes expanded per
+    board and, when optimal lengths are given, the mean and max relative
+    optimality gap over the solved boards.
+    """
+    lengths, expanded, gaps = [], 0, []
+    t0 = time.perf_counter()
+    for i, board in enumerate(boards):
+        try:
+            moves = len(solver.solve(board.tolist())) - 1
+        except RuntimeError:
+            continue
+        finally:
+            expanded += solver.nodes_expanded
+        lengths.append(moves)
+        if optimal is not None and optimal[i] > 0:
+            gaps.append(moves / optimal[i] - 1.0)
+    seconds = time.perf_counter() - t0
+    num = len(boards)
+    return {
+        "boards": num,
+        "solved": len(lengths) / num if num else 0.0,
+        "boards_per_sec": num / max(seconds, 1e-9),
+        "mean_moves": float(np.mean(lengths)) if lengths else float("nan"),
+        "nodes_per_board": expanded / num if num else 0.0,
+        "mean_gap": float(np.mean(gaps)) if gaps else float("nan"),
+        "max_gap": float(np.max(gaps)) if gaps else float("nan"),
+        "seconds": seconds,
+    }
+
+
+def main() -> None:
+    from rl_8puzzle.dqn_15_puzzle import DQN_PATH
+    from rl_8puzzle.dqn_inference import InferenceEngine
+
+    parser = argparse.ArgumentParser(description="Batched weighted A* with a learned DQN heuristic.")
+    parser.add_argument("--checkpoint", default=DQN_PATH)
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--scramble", type=int, default=60)
+    parser.add_argument("--weight", type=float, default=1.5)
+    parser.add_argument("--expand", type=int, default=64, help="frontier nodes expanded per step")
+    parser.add_argument("--max-nodes", type=int, default=2_000_000)
+    parser.add_argument("--gamma", type=float, default=0.99, help="discount the DQN was trained with")
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--no-optimal", action="store_true", help="skip the IDA* reference solutions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = InferenceEngine.from_checkpoint(args.checkpoint, quantize=args.quantize)
+    solver = LearnedAStar(
+        engine.size,
+        DQNHeuristic(engine, gamma=args.gamma),
+        weight=args.weight,
+        expand=args.expand,
+        max_nodes=args.max_nodes,
+    )
+    env = VecNPuzzleEnv(1, size=engine.size, scramble_moves=args.scramble, seed=args.seed)
+    boards, _ = env.scramble(args.boards)
+
+    optimal = None
+    if not args.no_optimal:
+        t0 = time.perf_counter()
+        ida = IDAStarSolver(engine.size)
+        optimal = [len(ida.solve(b.tolist())) - 1 for b in boards]
+        print(f"[astar] IDA* reference: {args.boards} boards in {time.perf_counter() - t0:.2f}s")
+
+    stats = solve_boards(solver, boards, optimal)
+    print(
+        f"[astar] weight {args.weight}, expand {args.expand}: solved {stats['solved']:.1%} "
+        f"({stats['mean_moves']:.1f} moves avg) in {stats['seconds']:.2f}s | "
+        f"{stats['boards_per_sec']:.1f} boards/s | {stats['nodes_per_board']:.0f} nodes/board"
+    )
+    if optimal is not None:
+        print(f"[astar] optimality gap: mean {stats['mean_gap']:.1%}, max {stats['max_gap']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Additive pattern databases for N x N sliding puzzles.
+
+Build (once, writes compact uint8 tables):
+    python -m rl_8puzzle.pattern_db --size 4 --out rl_8puzzle/pdb_4x4
+
+The tiles are split into disjoint patterns. For each pattern a 0-1 BFS from
+the goal over (pattern tile positions, blank position) counts only moves of
+the pattern's own tiles, so the per-pattern costs can be added up and still
+never overestimate. The stored value of a placement is its minimum over blank
+positions, indexed by the placement's k-permutation rank.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from math import perm
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from rl_8puzzle.solvers import ManhattanLinearConflict
+from rl_8puzzle.vec_env import neighbor_table
+
+PDB_DIR = Path(__file__).with_name("pdb_4x4")
+
+DEFAULT_PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+}
+
+UNSEEN = 255
+
+
+def rank_placements(positions: np.ndarray, num_cells: int) -> np.ndarray:
+    """
+    Dense rank of k distinct cells (a k-permutation of num_cells).
+
+    positions: (N, k) array; returns (N,) int64 in [0, num_cells! / (num_cells - k)!).
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    k = positions.shape[1]
+    rank = np.zeros(len(positions), dtype=np.int64)
+    for i in range(k):
+        smaller_before = (positions[:, :i] < positions[:, i : i + 1]).sum(axis=1)
+        rank = rank * (num_cells - i) + positions[:, i] - smaller_before
+    return rank
+
+
+def _rank_placement(positions: Sequence[int], num_cells: int) -> int:
+    """Scalar `rank_placements` for the search inner loop."""
+    rank = 0
+    for i, p in enumerate(positions):
+        smaller_before = 0
+        for j in range(i):
+            if positions[j] < p:
+                smaller_before += 1
+        rank = rank * (num_cells - i) + p - smaller_before
+    return rank
+
+
+def build_pattern_table(size: int, pattern: Sequence[int]) -> np.ndarray:
+    """0-1 BFS for one pattern; returns a uint8 table over placement ranks."""
+    m = size * size
+    k = len(pattern)
+    neighbors = neighbor_table(size)
+
+    table = np.full(perm(m, k), UNSEEN, dtype=np.uint8)
+    visited = np.zeros(perm(m, k) * m, dtype=bool)
+
+    def index(pos: np.ndarray, blank: np.ndarray) -> np.ndarray:
+        return rank_placements(pos, m) * m + blank
+
+    def keep_new(pos: np.ndarray, blank: np.ndarray):
+        idx = index(pos, blank)
+        idx, first = np.unique(idx, return_index=True)
+        new = ~visited[idx]
+        visited[idx[new]] = True
+        return pos[first[new]], blank[first[new]]
+
+    pos = np.array([[t - 1 for t in pattern]], dtype=np.uint8)
+    blank = np.array([m - 1], dtype=np.intp)
+    pos, blank = keep_new(pos, blank)
+
+    cost = 0
+    while len(blank):
+        # Zero-cost closure: the blank wanders through non-pattern cells.
+        layer_pos, layer_blank = [pos], [blank]
+        frontier_pos, frontier_blank = pos, blank
+        while len(frontier_blank):
+            cand_pos, cand_blank = [], []
+            for action in range(4):
+                nb = neighbors[frontier_blank, action]
+                free = (nb != frontier_blank) & ~(frontier_pos == nb[:, None]).any(axis=1)
+                cand_pos.append(frontier_pos[free])
+                cand_blank.append(nb[free])
+            frontier_pos, frontier_blank = keep_new(np.concatenate(cand_pos), np.concatenate(cand_blank))
+            layer_pos.append(frontier_pos)
+            layer_blank.append(frontier_blank)
+
+        pos, blank = np.concatenate(layer_pos), np.concatenate(layer_blank)
+        ranks = rank_placements(pos, m)
+        fresh = table[ranks] == UNSEEN
+        table[ranks[fresh]] = cost
+
+        # Cost-1 moves: the blank swaps with one of the pattern tiles.
+        cand_pos, cand_blank = [], []
+        for action in range(4):
+            nb = neighbors[blank, action]
+            hit = pos == nb[:, None]
+            occupied = (nb != blank) & hit.any(axis=1)
+            moved = pos[occupied].copy()
+            rows = np.arange(len(moved))
+            moved[rows, hit[occupied].argmax(axis=1)] = blank[occupied]
+            cand_pos.append(moved)
+            cand_blank.append(nb[occupied])
+        pos, blank = keep_new(np.concatenate(cand_pos), np.concatenate(cand_blank))
+        cost += 1
+
+    return table
+
+
+def build_pattern_db(
+    size: int = 4,
+    patterns: Sequence[Sequence[int]] | None = None,
+    out_dir: str | Path = PDB_DIR,
+) -> Path:
+    """Build and save every pattern table plus a meta.json describing them."""
+    patterns = patterns or DEFAULT_PATTERNS[size]
+    tiles = sorted(t for p in patterns for t in p)
+    if tiles != list(range(1, size * size)):
+        raise ValueError(f"Patterns must partition tiles 1..{size * size - 1}: {patterns}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for i, pattern in enumerate(patterns):
+        t0 = time.perf_counter()
+        table = build_pattern_table(size, pattern)
+        np.save(out_dir / f"pattern_{i}.npy", table)
+        print(
+            f"[pdb] pattern {tuple(pattern)}: {len(table)} entries, "
+            f"max {int(table.max())}, {time.perf_counter() - t0:.1f}s"
+        )
+
+    meta = {"size": size, "patterns": [list(p) for p in patterns]}
+    (out_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return out_dir
+
+
+class PatternDatabase:
+    """
+    Additive pattern-database heuristic for `IDAStarSolver`.
+
+    The tables are opened with np.load(mmap_mode="r"), so many solver
+    processes share one page-cached copy. Implements the solver's
+    reset / moved / move_delta interface; only the moved tile's pattern
+    is re-ranked after each move.
+    """
+
+    def __init__(self, db_dir: str | Path = PDB_DIR) -> None:
+        db_dir = Path(db_dir)
+        meta = json.loads((db_dir / "meta.json").read_text(encoding="utf-8"))
+        self.size: int = meta["size"]
+        self.patterns: List[Tuple[int, ...]] = [tuple(p) for p in meta["patterns"]]
+        self.tables = [
+            np.load(db_dir / f"pattern_{i}.npy", mmap_mode="r") for i in range(len(self.patterns))
+        ]
+        self._lookup = [table.item for table in self.tables]
+        self._num_cells = self.size * self.size
+
+        # tile -> (pattern index, slot within the pattern)
+        self.slot = {}
+        for p, pattern in enumerate(self.patterns):
+            for j, tile in enumerate(pattern):
+                self.slot[tile] = (p, j)
+
+        # Manhattan deltas are good enough for child ordering.
+        self._manhattan = ManhattanLinearConflict(self.size)
+        self.positions: List[List[int]] = []
+        self.values: List[int] = []
+        self.h = 0
+
+    def heuristic(self, state: Sequence[int]) -> int:
+        """One-off lookup for a whole board."""
+        return self.reset(list(state))
+
+    def reset(self, board: List[int]) -> int:
+        where = {tile: cell for cell, tile in enumerate(board)}
+        self.positions = [[where[t] for t in pattern] for pattern in self.patterns]
+        self.values = [
+            lookup(_rank_placement(pos, self._num_cells))
+            for lookup, pos in zip(self._lookup, self.positions)
+        ]
+        self.h = sum(self.values)
+        return self.h
+
+    def moved(self, tile: int, src: int, dst: int) -> int:
+        p, j = self.slot[tile]
+        pos = self.positions[p]
+        pos[j] = dst
+        value = self._lookup[p](_rank_placement(pos, self._num_cells))
+        self.h += value - self.values[p]
+        self.values[p] = value
+        return self.h
+
+    def move_delta(self, tile: int, src: int, dst: int) -> int:
+        return self._manhattan.move_delta(tile, src, dst)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an additive pattern database.")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--out", default=str(PDB_DIR))
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        help="comma-separated tiles of one pattern (repeat per pattern)",
+    )
+    args = parser.parse_args()
+
+    patterns = None
+    if args.pattern:
+        patterns = [tuple(int(t) for t in p.split(",")) for p in args.pattern]
+    out = build_pattern_db(args.size, patterns, args.out)
+    print(f"[pdb] Saved pattern database to {out}")
+
+
+if __name__ == "__main__":
+    main()
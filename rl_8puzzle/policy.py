@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from rl_8puzzle.env import GOAL_RANK
+from rl_8puzzle.q_table import RankedQTable
+from rl_8puzzle.ranking import NUM_STATES, rank_state, unrank_state
+from rl_8puzzle.transitions import load_transition_table
+
+State = Tuple[int, ...]
+
+# How a greedy walk ended
+SOLVED = "solved"
+LOOP = "loop"  # a state repeated, so the policy never reaches the goal
+MAX_STEPS = "max_steps"  # step budget ran out before the goal or a repeat
+
+
+class Solution(NamedTuple):
+    states: List[State]  # [start, ..., last state reached]
+    actions: List[int]
+    solved: bool
+    outcome: str  # SOLVED, LOOP or MAX_STEPS
+
+
+def compile_policy(Q) -> np.ndarray:
+    """
+    Greedy action for every reachable state, as a (181440,) uint8 array.
+
+    Accepts a dict Q-table (missing entries count as 0.0) or a RankedQTable.
+    Ties go to the lowest action index, like `greedy_trajectory`.
+    """
+    if not isinstance(Q, RankedQTable):
+        Q = RankedQTable.from_dict(Q)
+    return np.argmax(Q.values, axis=1).astype(np.uint8)
+
+
+class CompiledPolicy:
+    """
+    Greedy policy compiled to arrays: best action per state and the state
+    it leads to. Solving is a walk along `successor` that stops at the goal
+    or as soon as a state repeats (the greedy policy is deterministic, so a
+    repeat means it loops forever, including bumping into a wall).
+    """
+
+    def __init__(self, actions: np.ndarray, table: np.ndarray | None = None) -> None:
+        if actions.shape != (NUM_STATES,):
+            raise ValueError(f"Expected {NUM_STATES} actions, got shape {actions.shape}")
+        if table is None:
+            table = load_transition_table()
+        self.actions = actions
+        self.successor = table[np.arange(NUM_STATES), actions]
+
+    @classmethod
+    def from_q(cls, Q, table: np.ndarray | None = None) -> "CompiledPolicy":
+        return cls(compile_policy(Q), table)
+
+    def solve_rank(self, rank: int, max_steps: int = 100) -> Tuple[List[int], str]:
+        """Follow the policy from `rank`. Returns (visited ranks, outcome)."""
+        nxt = self.successor.item
+        ranks = [rank]
+        seen = {rank}
+        for _ in range(max_steps):
+            if rank == GOAL_RANK:
+                return ranks, SOLVED
+            rank = nxt(rank)
+            if rank in seen:
+                return ranks, LOOP
+            seen.add(rank)
+            ranks.append(rank)
+        return ranks, SOLVED if rank == GOAL_RANK else MAX_STEPS
+
+    def solve(self, start: State, max_steps: int = 100) -> Solution:
+        """Like `greedy_trajectory`, but fails fast on cycles."""
+        ranks, outcome = self.solve_rank(rank_state(start), max_steps)
+        actions = [self.actions.item(r) for r in ranks[:-1]]
+        return Solution([unrank_state(r) for r in ranks], actions, outcome == SOLVED, outcome)
+
+
+_compiled: Dict[str, Any] = {}  # the last Q object passed to policy_for and its policy
+
+
+def policy_for(Q) -> CompiledPolicy:
+    """
+    CompiledPolicy for `Q`, reused while the same table object is passed in
+    again, so step-by-step callers pay for compiling once. Q must not be
+    modified in place after it has been compiled.
+    """
+    if _compiled.get("q") is not Q:
+        _compiled["q"], _compiled["policy"] = Q, CompiledPolicy.from_q(Q)
+    return _compiled["policy"]
+
+
+def greedy_states(env, Q, max_steps: int = 100) -> List[State]:
+    """
+    States visited by the greedy policy from env.state, stopping at the
+    goal or as soon as the policy loops; env is left at the last state.
+    """
+    states = policy_for(Q).solve(env.state, max_steps).states
+    env.state = states[-1]
+    return states
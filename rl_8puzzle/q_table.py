@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, Union
+
+import numpy as np
+
+from rl_8puzzle.env import ACTIONS
+from rl_8puzzle.ranking import NUM_STATES, rank_state, rank_states, unrank_state
+
+State = Tuple[int, ...]
+QKey = Tuple[State, int]
+
+
+class RankedQTable:
+    """
+    Dense Q-table for the 8-puzzle.
+
+    Every reachable state is mapped to a row via `rank_state`, and Q-values
+    live in a (181440, 4) float32 array instead of a dict of boxed floats.
+
+    It supports the subset of the dict API the rest of the project uses
+    (`Q[(state, action)]`, `Q.get(...)`, `len(Q)`), so code written against
+    the dict-based QTable keeps working. Only reachable states may be used
+    as keys.
+    """
+
+    def __init__(self, values: np.ndarray | None = None) -> None:
+        if values is None:
+            values = np.zeros((NUM_STATES, len(ACTIONS)), dtype=np.float32)
+        if values.shape != (NUM_STATES, len(ACTIONS)):
+            raise ValueError(f"Expected shape {(NUM_STATES, len(ACTIONS))}, got {values.shape}")
+        self.values = values
+
+    # ---------- dict-compatible API ----------
+
+    def __getitem__(self, key: QKey) -> float:
+        state, action = key
+        return float(self.values[rank_state(state), action])
+
+    def __setitem__(self, key: QKey, value: float) -> None:
+        state, action = key
+        self.values[rank_state(state), action] = value
+
+    def get(self, key: QKey, default: float = 0.0) -> float:
+        # Every reachable (state, action) has a slot, so `default` is unused;
+        # it is accepted for drop-in compatibility with dict lookups.
+        return self[key]
+
+    def __len__(self) -> int:
+        """Number of non-zero entries (comparable to a dict's visited keys)."""
+        return int(np.count_nonzero(self.values))
+
+    def items(self) -> Iterator[Tuple[QKey, float]]:
+        ranks, actions = np.nonzero(self.values)
+        for r, a in zip(ranks.tolist(), actions.tolist()):
+            yield (unrank_state(r), a), float(self.values[r, a])
+
+    # ---------- array API ----------
+
+    def row(self, state: State) -> np.ndarray:
+        """Q-values of all actions for `state`."""
+        return self.values[rank_state(state)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def to_dict(self) -> Dict[QKey, float]:
+        """Sparse dict form (non-zero entries only), as `save_q` pickles it."""
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, Q: Dict[QKey, float]) -> "RankedQTable":
+        table = cls()
+        if not Q:
+            return table
+        keys = list(Q.keys())
+        states = np.array([state for state, _ in keys], dtype=np.uint8)
+        actions = np.array([action for _, action in keys], dtype=np.intp)
+        table.values[rank_states(states), actions] = list(Q.values())
+        return table
+
+
+# ---------- binary file format ----------
+#
+# A fixed 64-byte little-endian header followed by the raw rank-indexed
+# (num_states, num_actions) array:
+#
+#   magic        8s   b"RLQTABLE"
+#   version      u32  FORMAT_VERSION
+#   dtype code   u32  0 = float32, 1 = float16
+#   num_states   u64
+#   num_actions  u32
+#   data offset  u32  (= HEADER_SIZE)
+#
+# The array is opened with np.memmap, so loading is near-instant and every
+# process reading the same file shares one page-cached copy.
+
+MAGIC = b"RLQTABLE"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sIIQII")
+_DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f2")}
+_DTYPE_CODES = {"float32": 0, "float16": 1}
+
+
+def is_q_binary(path: str | Path) -> bool:
+    """True if `path` starts with the binary Q-table magic."""
+    with Path(path).open("rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_q_binary(
+    Q: Union[RankedQTable, Dict[QKey, float]],
+    path: str | Path,
+    dtype: str = "float32",
+) -> None:
+    """Write Q in the versioned binary format (dtype: "float32" or "float16")."""
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if not isinstance(Q, RankedQTable):
+        Q = RankedQTable.from_dict(Q)
+
+    code = _DTYPE_CODES[dtype]
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, code, NUM_STATES, len(ACTIONS), HEADER_SIZE)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(np.ascontiguousarray(Q.values, dtype=_DTYPES[code]).tobytes())
+
+
+def open_q_binary(path: str | Path) -> RankedQTable:
+    """Memory-map a binary Q-table read-only."""
+    path = Path(path)
+    with path.open("rb") as f:
+        header = f.read(HEADER_SIZE)
+
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated Q-table header")
+    magic, version, code, num_states, num_actions, offset = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a binary Q-table")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported Q-table version {version}")
+    if code not in _DTYPES or (num_states, num_actions) != (NUM_STATES, len(ACTIONS)):
+        raise ValueError(f"{path}: unexpected Q-table layout")
+
+    values = np.memmap(
+        path, dtype=_DTYPES[code], mode="r", offset=offset, shape=(num_states, num_actions)
+    )
+    return RankedQTable(values)
+
+
+def convert_pickle(
+    pkl_path: str | Path, out_path: str | Path, dtype: str = "float32"
+) -> None:
+    """Convert a pickled dict Q-table (old `save_q` output) to the binary format."""
+    with Path(pkl_path).open("rb") as f:
+        Q = pickle.load(f)
+    save_q_binary(Q, out_path, dtype=dtype)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a pickled Q-table to the binary format.")
+    parser.add_argument("pickle_path")
+    parser.add_argument("out_path")
+    parser.add_argument("--float16", action="store_true", help="store half-precision values")
+    args = parser.parse_args()
+
+    convert_pickle(args.pickle_path, args.out_path, dtype="float16" if args.float16 else "float32")
+    print(f"[q_table] Wrote {args.out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from math import factorial
+from typing import Tuple
+
+import numpy as np
+
+State = Tuple[int, ...]
+
+# Only half of the 9! boards are reachable from GOAL_STATE (the tile
+# permutation must have an even number of inversions), and the blank can sit
+# in any of the 9 cells, so: 9 * 8! / 2 = 181_440 reachable states.
+NUM_TILES = 8
+NUM_STATES = 9 * factorial(NUM_TILES) // 2
+_PER_BLANK = factorial(NUM_TILES) // 2  # 20_160
+
+_FACT = [factorial(NUM_TILES - 1 - i) for i in range(NUM_TILES)]
+
+
+def rank_state(state: State) -> int:
+    """
+    Map a reachable 8-puzzle state to a dense integer in [0, NUM_STATES).
+
+    rank = blank_pos * 20160 + lehmer(tiles) // 2
+
+    The Lehmer code of the 8 tiles (blank removed) is halved: the two
+    permutations 2k and 2k + 1 differ only by a swap of the last two tiles,
+    so exactly one of them has the even parity required for solvability.
+    Boards with odd parity are unreachable and raise ValueError instead of
+    silently ranking as their solvable twin.
+    """
+    blank = state.index(0)
+    tiles = [t for t in state if t != 0]
+    code = 0
+    inversions = 0
+    for i in range(NUM_TILES - 1):
+        t = tiles[i]
+        smaller = 0
+        for j in range(i + 1, NUM_TILES):
+            if tiles[j] < t:
+                smaller += 1
+        code += smaller * _FACT[i]
+        inversions += smaller
+    if inversions % 2:
+        raise ValueError(f"Unsolvable state (odd parity): {state}")
+    return blank * _PER_BLANK + code // 2
+
+
+def unrank_state(rank: int) -> State:
+    """Inverse of `rank_state`."""
+    if not 0 <= rank < NUM_STATES:
+        raise ValueError(f"Rank out of range: {rank}")
+
+    blank, half = divmod(rank, _PER_BLANK)
+    code = 2 * half
+
+    digits = []
+    for i in range(NUM_TILES):
+        d, code = divmod(code, _FACT[i])
+        digits.append(d)
+    # The second-to-last digit has weight 1! and picks the parity.
+    if sum(digits) % 2:
+        digits[NUM_TILES - 2] += 1
+
+    available = list(range(1, NUM_TILES + 1))
+    tiles = [available.pop(d) for d in digits]
+    tiles.insert(blank, 0)
+    return tuple(tiles)
+
+
+# ---------- vectorized variants ----------
+
+
+def rank_states(boards: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `rank_state`.
+
+    boards: (N, 9) integer array of reachable states.
+    returns: (N,) int64 ranks.
+    """
+    boards = np.asarray(boards)
+    blank = np.argmax(boards == 0, axis=1)
+    # Drop the blank from each row, keeping tile order.
+    tiles = boards[boards != 0].reshape(-1, NUM_TILES).astype(np.int64)
+
+    code = np.zeros(len(boards), dtype=np.int64)
+    for i in range(NUM_TILES - 1):
+        smaller = (tiles[:, i + 1 :] < tiles[:, i : i + 1]).sum(axis=1)
+        code += smaller * _FACT[i]
+    return blank.astype(np.int64) * _PER_BLANK + code // 2
+
+
+def unrank_states(ranks: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `unrank_state`.
+
+    ranks: (N,) integer array.
+    returns: (N, 9) uint8 boards.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    n = len(ranks)
+    blank, half = np.divmod(ranks, _PER_BLANK)
+    code = 2 * half
+
+    digits = np.empty((n, NUM_TILES), dtype=np.int64)
+    for i in range(NUM_TILES):
+        digits[:, i], code = np.divmod(code, _FACT[i])
+    digits[:, NUM_TILES - 2] += digits.sum(axis=1) % 2
+
+    # Decode the Lehmer digits: pick the d-th still-available tile.
+    available = np.ones((n, NUM_TILES), dtype=bool)
+    rows = np.arange(n)
+    tiles = np.empty((n, NUM_TILES), dtype=np.uint8)
+    for i in range(NUM_TILES):
+        pos = np.argmax(np.cumsum(available, axis=1) == digits[:, i : i + 1] + 1, axis=1)
+        tiles[:, i] = pos + 1
+        available[rows, pos] = False
+
+    boards = np.zeros((n, 9), dtype=np.uint8)
+    cols = np.arange(9)
+    tile_mask = cols[None, :] != blank[:, None]
+    boards[tile_mask] = tiles.ravel()
+    return boards
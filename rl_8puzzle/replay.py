@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+Batch = Dict[str, np.ndarray]
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity experience replay over preallocated NumPy ring arrays.
+
+    Boards are stored as uint8 rows (one byte per cell), actions as uint8,
+    rewards as float32 and done flags as bool, so a million 4x4
+    transitions take about 34 MB and adding a batch of transitions is a
+    few slice assignments. Once full, the oldest entries are overwritten.
+    Tabular learners can store state ranks instead (obs_dim=1, obs_dtype=np.int32).
+    """
+
+    def __init__(
+        self, capacity: int, obs_dim: int, seed: int | None = None, obs_dtype=np.uint8
+    ) -> None:
+        self.capacity = capacity
+        self.obs = np.zeros((capacity, obs_dim), dtype=obs_dtype)
+        self.next_obs = np.zeros((capacity, obs_dim), dtype=obs_dtype)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.obs, self.next_obs, self.actions, self.rewards, self.dones))
+
+    def add_batch(
+        self,
+        obs: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_obs: np.ndarray,
+        dones: np.ndarray,
+    ) -> np.ndarray:
+        """Append a batch of transitions; returns the slots they were written to."""
+        n = len(actions)
+        if n > self.capacity:
+            raise ValueError(f"Batch of {n} exceeds replay capacity {self.capacity}")
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.obs[idx] = obs
+        self.next_obs[idx] = next_obs
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.dones[idx] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def _gather(self, idx: np.ndarray) -> Batch:
+        return {
+            "obs": self.obs[idx],
+            "actions": self.actions[idx],
+            "rewards": self.rewards[idx],
+            "next_obs": self.next_obs[idx],
+            "dones": self.dones[idx],
+            "indices": idx,
+        }
+
+    def sample(self, batch_size: int) -> Batch:
+        """Uniformly sample `batch_size` stored transitions (with replacement)."""
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        return self._gather(self.rng.integers(0, self.size, size=batch_size))
+
+
+class SumTree:
+    """
+    Array-backed binary sum tree over `capacity` non-negative priorities.
+
+    tree[1] is the root and the leaves start at tree[leaves], so node i
+    has children 2i and 2i+1. Updates and prefix-sum lookups are O(log N)
+    and both are vectorized over a whole batch: a lookup walks every
+    query down one level at a time, an update recomputes only the
+    ancestors of the touched leaves.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.depth = max(0, (capacity - 1).bit_length())
+        self.leaves = 1 << self.depth
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def __getitem__(self, indices) -> np.ndarray:
+        return self.tree[np.asarray(indices) + self.leaves]
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray) -> None:
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaves
+        self.tree[nodes] = priorities
+        # Shared ancestors appear more than once per level; every copy
+        # writes the same sum, so duplicates are harmless and never removed.
+        tree = self.tree
+        for _ in range(self.depth):
+            nodes >>= 1
+            left = nodes << 1
+            tree[nodes] = tree[left] + tree[left + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Leaf index i for each value v with prefix(i) <= v < prefix(i + 1)."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        tree = self.tree
+        for _ in range(self.depth):
+            nodes <<= 1
+            left_sum = tree[nodes]
+            go_right = values >= left_sum
+            values -= left_sum * go_right
+            nodes += go_right
+        return nodes - self.leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Proportional prioritized replay (Schaul et al., 2016) on a SumTree.
+
+    Transition i is sampled with probability p_i^alpha / sum_j p_j^alpha,
+    where p_i = |TD error| + eps; new transitions get the largest priority
+    seen so far, so each is replayed at least once soon. Sampling is
+    stratified over `batch_size` equal slices of the total, and batches
+    carry importance weights (N * P(i))^-beta / max, to be multiplied into
+    the loss. Call update_priorities with the batch's new TD errors.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        obs_dim: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        eps: float = 1e-3,
+        seed: int | None = None,
+        obs_dtype=np.uint8,
+    ) -> None:
+        super().__init__(capacity, obs_dim, seed=seed, obs_dtype=obs_dtype)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def add_batch(self, obs, actions, rewards, next_obs, dones) -> np.ndarray:
+        idx = super().add_batch(obs, actions, rewards, next_obs, dones)
+        self.tree.update(idx, np.full(len(idx), self.max_priority))
+        return idx
+
+    def sample(self, batch_size: int) -> Batch:
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        idx = np.minimum(self.tree.find(np.minimum(values, np.nextafter(total, 0))), self.size - 1)
+
+        probs = self.tree[idx] / total
+        weights = (self.size * probs) ** -self.beta
+        batch = self._gather(idx)
+        batch["weights"] = (weights / weights.max()).astype(np.float32)
+        return batch
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
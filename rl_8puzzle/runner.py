@@ -1,35 +1,24 @@
 from __future__ import annotations
 
-import json
+import argparse
 from pathlib import Path
-from typing import Set, Tuple
+from typing import Tuple
 
+from rl_8puzzle.depth_index import load_depth_index
 from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.history import UsedStartStore
+from rl_8puzzle.ranking import rank_state, unrank_state
+from rl_8puzzle.solution_cache import SolutionCache
 from rl_8puzzle.animate_3d import (
     load_or_train_q,
-    greedy_trajectory,
-    build_interpolated_frames,
+    cached_trajectory,
+    count_interpolated_frames,
+    iter_interpolated_frames,
+    animate_frames_to_gif,
     animate_frames_to_mp4,
 )
 
 State = Tuple[int, ...]
-HISTORY_PATH = Path(__file__).with_name("used_start_states.json")
-
-
-def _load_history() -> Set[State]:
-    if not HISTORY_PATH.exists():
-        return set()
-    with HISTORY_PATH.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    # stored as list of lists -> convert back to tuples
-    return {tuple(s) for s in data}
-
-
-def _save_history(history: Set[State]) -> None:
-    # store as list of lists for JSON
-    data = [list(s) for s in history]
-    with HISTORY_PATH.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
 
 
 def main(
@@ -37,72 +26,122 @@ def main(
     min_moves: int = 10,
     substeps: int = 10,
     fps: int = 6,
-    video_path: str | Path = "rl_8puzzle/solution_3d.mp4",
+    video_path: str | Path | None = "rl_8puzzle/solution_3d.mp4",
+    workers: int = 1,
+    backend: str = "retained",
+    gif_path: str | Path | None = None,
 ) -> None:
     """
     One-shot runner:
 
     - Loads (or trains) the Q-table.
-    - Repeatedly scrambles until it finds:
-        * a start state that hasn't been used before, AND
-        * a greedy solution with at least `min_moves` moves.
-    - Saves that start state to history so it's not reused.
-    - Builds smooth interpolated frames.
-    - Renders a 3D MP4 animation.
+    - Samples a start state uniformly from the precomputed depth index
+      among states that
+        * haven't been used before, AND
+        * need at least `min_moves` moves (optimal solution length).
+      Falls back to a random `scramble_moves` scramble if every such
+      state has been used.
+    - Solves it greedily through the on-disk solution cache.
+    - Records that start state in the shared used-start bitmap so no
+      runner reuses it.
+    - Streams smooth interpolated frames into the renderer.
+    - Renders a 3D MP4 animation to `video_path` and/or a GIF to
+      `gif_path` (on `workers` processes, with the `backend` renderer from
+      animate_3d.RENDER_BACKENDS). The GIF is encoded straight from the
+      rendered frames, not decoded back from the MP4.
     """
     Q = load_or_train_q()
+    cache = SolutionCache.for_q(Q)
 
     env = EightPuzzleEnv(scramble_moves=scramble_moves)
-    used_starts = _load_history()
-
-    chosen_state: State | None = None
-    chosen_states_traj: list[State] | None = None
-
-    max_attempts = 200
-
-    for attempt in range(max_attempts):
-        start_state = env.reset()
-        if start_state in used_starts:
-            continue
-
-        states = greedy_trajectory(env, Q)
-        moves = len(states) - 1
-
-        if moves < min_moves:
-            # too trivial; try again
-            continue
-
-        chosen_state = start_state
-        chosen_states_traj = states
+    used_starts = UsedStartStore()
+    index = load_depth_index()
+
+    # Another runner may claim the same state between sampling and claiming;
+    # claim_rank is atomic, so just draw again.
+    rank = None
+    for _ in range(10):
+        rank = index.sample(min_moves, exclude=used_starts.contains_ranks)
+        if rank is None or used_starts.claim_rank(rank):
+            break
+        rank = None
+
+    if rank is None:
         print(
-            f"[runner] Selected start state on attempt {attempt + 1}: "
-            f"{start_state} (moves to solve: {moves})"
+            "[runner] No unused puzzle needs at least "
+            f"{min_moves} moves. Using a random scramble."
         )
-        break
-
-    if chosen_state is None or chosen_states_traj is None:
-        # fallback: just use the last sampled scramble
+        chosen_state = env.reset()
+        used_starts.claim_rank(rank_state(chosen_state))
+    else:
+        chosen_state = unrank_state(rank)
+        env.state = chosen_state
         print(
-            "[runner] Could not find a new + sufficiently long puzzle "
-            "within attempt limit. Using last scramble."
+            f"[runner] Selected start state {chosen_state} "
+            f"(optimal moves: {index.depth(rank)})"
         )
-        chosen_state = start_state
-        chosen_states_traj = states
+    used_starts.close()
 
-    used_starts.add(chosen_state)
-    _save_history(used_starts)
+    chosen_states_traj = cached_trajectory(env, Q, cache)
 
     print("[runner] Start state:", chosen_state)
     print("[runner] Goal state:", GOAL_STATE)
     print(f"[runner] Greedy trajectory length (moves): {len(chosen_states_traj) - 1}")
 
-    # Build smooth frames and render video
-    frames = build_interpolated_frames(chosen_states_traj, substeps=substeps)
-    print(f"[runner] Frames with interpolation: {len(frames)}")
-
-    animate_frames_to_mp4(
-        frames,
-        save_path=video_path,
-        fps=fps,
+    # Stream smooth frames straight into the video
+    total = count_interpolated_frames(len(chosen_states_traj), substeps)
+    print(f"[runner] Frames with interpolation: {total}")
+
+    if video_path is not None:
+        animate_frames_to_mp4(
+            iter_interpolated_frames(chosen_states_traj, substeps=substeps),
+            save_path=video_path,
+            fps=fps,
+            workers=workers,
+            backend=backend,
+            total=total,
+        )
+        print(f"[runner] Done. Video saved to {video_path}")
+    if gif_path is not None:
+        animate_frames_to_gif(
+            iter_interpolated_frames(chosen_states_traj, substeps=substeps),
+            save_path=gif_path,
+            fps=fps,
+            workers=workers,
+            backend=backend,
+            total=total,
+        )
+        print(f"[runner] Done. GIF saved to {gif_path}")
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Solve a fresh 8-puzzle and animate it in 3D.")
+    parser.add_argument("--scramble", type=int, default=40)
+    parser.add_argument("--min-moves", type=int, default=10)
+    parser.add_argument("--fps", type=int, default=6)
+    parser.add_argument("--substeps", type=int, default=10)
+    parser.add_argument("--output", default="rl_8puzzle/solution_3d.mp4", help="MP4 path")
+    parser.add_argument(
+        "--gif",
+        nargs="?",
+        const="",
+        help="also write a GIF (default path: --output with a .gif suffix)",
+    )
+    parser.add_argument("--no-mp4", action="store_true", help="skip the MP4 (e.g. with --gif)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--backend", default="retained")
+    args = parser.parse_args()
+
+    gif_path = None
+    if args.gif is not None:
+        gif_path = args.gif or Path(args.output).with_suffix(".gif")
+    main(
+        scramble_moves=args.scramble,
+        min_moves=args.min_moves,
+        substeps=args.substeps,
+        fps=args.fps,
+        video_path=None if args.no_mp4 else args.output,
+        workers=args.workers,
+        backend=args.backend,
+        gif_path=gif_path,
     )
-    print(f"[runner] Done. Video saved to {video_path}")
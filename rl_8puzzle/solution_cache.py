@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from rl_8puzzle.q_table import RankedQTable
+from rl_8puzzle.ranking import rank_state
+
+State = Tuple[int, ...]
+
+CACHE_PATH = Path(__file__).with_name("solution_cache.sqlite")
+
+# Blank index change per action: 0=up, 1=down, 2=left, 3=right
+_BLANK_DELTA = {-3: 0, 3: 1, -1: 2, 1: 3}
+
+
+def fingerprint_q(Q) -> str:
+    """Content hash of a Q-table; any change to Q changes the fingerprint."""
+    if not isinstance(Q, RankedQTable):
+        Q = RankedQTable.from_dict(Q)
+    digest = hashlib.sha256()
+    digest.update(str(Q.values.dtype).encode())
+    digest.update(memoryview(Q.values).cast("B"))
+    return digest.hexdigest()[:32]
+
+
+def actions_from_states(states: Sequence[State]) -> List[int]:
+    """Recover the action sequence of a 3x3 trajectory from its states."""
+    actions = []
+    for prev, nxt in zip(states, states[1:]):
+        blank = prev.index(0)
+        delta = nxt.index(0) - blank
+        if delta:
+            actions.append(_BLANK_DELTA[delta])
+            continue
+        # The policy bumped into a wall; any move off the board reproduces that.
+        row, col = divmod(blank, 3)
+        for action, off_board in enumerate((row == 0, row == 2, col == 0, col == 2)):
+            if off_board:
+                actions.append(action)
+                break
+    return actions
+
+
+class SolutionCache:
+    """
+    Start state -> greedy action sequence, for one Q-table.
+
+    An in-memory LRU sits in front of an SQLite file keyed by
+    (Q fingerprint, start rank). Lookups only ever match this Q-table's
+    fingerprint, so solutions from other tables are never served, yet
+    tools using different tables can share one file without wiping each
+    other's entries; `prune()` removes the other tables' rows explicitly.
+    Repeat requests skip solving, and fresh processes find earlier
+    solutions on disk.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        path: str | Path = CACHE_PATH,
+        maxsize: int = 4096,
+    ) -> None:
+        self.fingerprint = fingerprint
+        self.maxsize = maxsize
+        self._lru: OrderedDict[int, List[int]] = OrderedDict()
+        self.hits = self.misses = 0
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=30.0)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                " fingerprint TEXT NOT NULL,"
+                " start INTEGER NOT NULL,"
+                " moves BLOB NOT NULL,"
+                " PRIMARY KEY (fingerprint, start))"
+            )
+
+    @classmethod
+    def for_q(cls, Q, path: str | Path = CACHE_PATH, maxsize: int = 4096) -> "SolutionCache":
+        return cls(fingerprint_q(Q), path=path, maxsize=maxsize)
+
+    def _remember(self, key: int, moves: List[int]) -> None:
+        self._lru[key] = moves
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, start: State) -> List[int] | None:
+        key = rank_state(start)
+        moves = self._lru.get(key)
+        if moves is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return moves
+
+        row = self._db.execute(
+            "SELECT moves FROM solutions WHERE fingerprint = ? AND start = ?",
+            (self.fingerprint, key),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        moves = list(row[0])
+        self._remember(key, moves)
+        self.hits += 1
+        return moves
+
+    def put(self, start: State, moves: Sequence[int]) -> None:
+        key = rank_state(start)
+        moves = list(moves)
+        self._remember(key, moves)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO solutions (fingerprint, start, moves) VALUES (?, ?, ?)",
+                (self.fingerprint, key, bytes(moves)),
+            )
+
+    def warm(self, limit: int | None = None) -> int:
+        """Preload up to `limit` (default: maxsize) stored solutions into the LRU."""
+        limit = self.maxsize if limit is None else min(limit, self.maxsize)
+        rows = self._db.execute(
+            "SELECT start, moves FROM solutions WHERE fingerprint = ? LIMIT ?",
+            (self.fingerprint, limit),
+        )
+        count = 0
+        for key, moves in rows:
+            self._remember(key, list(moves))
+            count += 1
+        return count
+
+    def prune(self) -> int:
+        """Delete every row stored for other Q-tables; returns how many were removed."""
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM solutions WHERE fingerprint != ?", (self.fingerprint,)
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM solutions WHERE fingerprint = ?", (self.fingerprint,)
+        ).fetchone()
+        return count
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def prune_stale(Q, path: str | Path = CACHE_PATH) -> int:
+    """
+    Drop the cached solutions of every Q-table other than `Q`, e.g. after
+    Q_PATH was retrained, so the shared file does not grow with each new
+    table. Returns the number of rows removed.
+    """
+    if not Path(path).exists():
+        return 0
+    cache = SolutionCache.for_q(Q, path=path)
+    try:
+        return cache.prune()
+    finally:
+        cache.close()
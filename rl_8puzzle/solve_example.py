@@ -1,38 +1,17 @@
 from __future__ import annotations
 
-import pickle
-from pathlib import Path
-from typing import Dict, Tuple
+from typing import Tuple
 
-from rl_8puzzle.env import EightPuzzleEnv, ACTIONS
+from rl_8puzzle.env import EightPuzzleEnv
+from rl_8puzzle.policy import LOOP, SOLVED, greedy_states, policy_for
+from rl_8puzzle.train_q_learning import Q_PATH, QTable, load_q
 
 State = Tuple[int, ...]
-QKey = Tuple[State, int]
-QTable = Dict[QKey, float]
-
-
-def load_q(path: str | Path) -> QTable:
-    with Path(path).open("rb") as f:
-        return pickle.load(f)
 
 
 def greedy_solve(env: EightPuzzleEnv, Q: QTable, max_steps: int = 100):
-    """Follow the greedy policy from the current env.state."""
-    state = env.state
-    path = [state]
-
-    for _ in range(max_steps):
-        qs = [Q.get((state, a), 0.0) for a in ACTIONS]
-        best_idx = max(range(len(ACTIONS)), key=lambda i: qs[i])
-        best_action = ACTIONS[best_idx]
-
-        state, _, done, _ = env.step(best_action)
-        path.append(state)
-
-        if done:
-            break
-
-    return path
+    """Follow the greedy policy from the current env.state (stops early if it loops)."""
+    return greedy_states(env, Q, max_steps)
 
 
 def print_board(state: State) -> None:
@@ -43,18 +22,25 @@ def print_board(state: State) -> None:
 
 
 def main() -> None:
-    Q = load_q("rl_8puzzle/q_table.pkl")
+    Q = load_q(Q_PATH)
     env = EightPuzzleEnv(scramble_moves=20)
     start_state = env.reset()
 
     print("Start state:")
     print_board(start_state)
 
-    path = greedy_solve(env, Q)
+    max_steps = 100
+    solution = policy_for(Q).solve(start_state, max_steps)
+    moves = len(solution.actions)
 
-    print(f"Solved in {len(path) - 1} moves.")
+    if solution.outcome == SOLVED:
+        print(f"Solved in {moves} moves.")
+    elif solution.outcome == LOOP:
+        print(f"Greedy policy loops after {moves} moves.")
+    else:
+        print(f"Not solved within {max_steps} moves.")
     print("Trajectory:")
-    for s in path:
+    for s in solution.states:
         print_board(s)
 
 
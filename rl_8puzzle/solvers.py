@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+State = Tuple[int, ...]
+
+# (row, col) offsets of the blank for actions 0=up, 1=down, 2=left, 3=right
+_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def goal_state(size: int) -> State:
+    return tuple(list(range(1, size * size)) + [0])
+
+
+def is_solvable(state: State, size: int) -> bool:
+    """Inversion-parity test for an N x N board with the blank at bottom-right in the goal."""
+    tiles = [t for t in state if t != 0]
+    inversions = sum(
+        1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j]
+    )
+    if size % 2:
+        return inversions % 2 == 0
+    row_from_bottom = size - state.index(0) // size
+    return (inversions + row_from_bottom) % 2 == 1
+
+
+class ManhattanLinearConflict:
+    """
+    Manhattan distance plus linear conflict, updated incrementally.
+
+    The solver owns the board list; after every change it calls
+    `moved(tile, src, dst)`, and only the moved tile's distance and the two
+    lines it affects are recomputed. A vertical move changes which row the
+    tile is in (its column order is unchanged), a horizontal move which
+    column, so at most two lines need a new conflict count.
+
+    With linear_conflict=False this is plain Manhattan distance.
+    """
+
+    def __init__(self, size: int, linear_conflict: bool = True) -> None:
+        n = size
+        self.size = n
+        self.linear_conflict = linear_conflict
+        self.goal_row = [0] * (n * n)
+        self.goal_col = [0] * (n * n)
+        for idx, tile in enumerate(goal_state(n)):
+            self.goal_row[tile], self.goal_col[tile] = divmod(idx, n)
+        # manhattan[tile][cell]
+        self.manhattan = [
+            [
+                0 if tile == 0 else abs(cell // n - self.goal_row[tile]) + abs(cell % n - self.goal_col[tile])
+                for cell in range(n * n)
+            ]
+            for tile in range(n * n)
+        ]
+        self.row_cells = [list(range(r * n, (r + 1) * n)) for r in range(n)]
+        self.col_cells = [list(range(c, n * n, n)) for c in range(n)]
+        self._lc_cache: Dict[Tuple[int, ...], int] = {}
+        self.board: List[int] = []
+        self.h = 0
+
+    def _line_conflict(self, goal_positions: Tuple[int, ...]) -> int:
+        """2 * (tiles that must leave the line) = 2 * (len - longest increasing run)."""
+        lc = self._lc_cache.get(goal_positions)
+        if lc is None:
+            best: List[int] = []
+            for i, p in enumerate(goal_positions):
+                best.append(1 + max((best[j] for j in range(i) if goal_positions[j] < p), default=0))
+            lc = 2 * (len(goal_positions) - max(best, default=0))
+            self._lc_cache[goal_positions] = lc
+        return lc
+
+    def _row_lc(self, r: int) -> int:
+        board, goal_row, goal_col = self.board, self.goal_row, self.goal_col
+        return self._line_conflict(
+            tuple(goal_col[t] for t in (board[i] for i in self.row_cells[r]) if t and goal_row[t] == r)
+        )
+
+    def _col_lc(self, c: int) -> int:
+        board, goal_row, goal_col = self.board, self.goal_row, self.goal_col
+        return self._line_conflict(
+            tuple(goal_row[t] for t in (board[i] for i in self.col_cells[c]) if t and goal_col[t] == c)
+        )
+
+    def reset(self, board: List[int]) -> int:
+        self.board = board
+        self.md = sum(self.manhattan[t][i] for i, t in enumerate(board))
+        if not self.linear_conflict:
+            self.h = self.md
+            return self.h
+        self.row_lc = [self._row_lc(r) for r in range(self.size)]
+        self.col_lc = [self._col_lc(c) for c in range(self.size)]
+        self.h = self.md + sum(self.row_lc) + sum(self.col_lc)
+        return self.h
+
+    def moved(self, tile: int, src: int, dst: int) -> int:
+        n = self.size
+        md_tile = self.manhattan[tile]
+        self.md += md_tile[dst] - md_tile[src]
+        if not self.linear_conflict:
+            self.h = self.md
+            return self.h
+        r_src, c_src = divmod(src, n)
+        r_dst, c_dst = divmod(dst, n)
+        if r_src != r_dst:
+            lines, lc_fn = self.row_lc, self._row_lc
+            a, b = r_src, r_dst
+        else:
+            lines, lc_fn = self.col_lc, self._col_lc
+            a, b = c_src, c_dst
+        delta = -lines[a] - lines[b]
+        lines[a] = lc_fn(a)
+        lines[b] = lc_fn(b)
+        self.h += md_tile[dst] - md_tile[src] + delta + lines[a] + lines[b]
+        return self.h
+
+    def move_delta(self, tile: int, src: int, dst: int) -> int:
+        """Cheap move-ordering key: Manhattan change of the moved tile."""
+        md_tile = self.manhattan[tile]
+        return md_tile[dst] - md_tile[src]
+
+
+class IDAStarSolver:
+    """
+    IDA* for N x N sliding puzzles (NPuzzleEnv states).
+
+    The inner loop mutates one board list in place (no per-node tuples),
+    keeps the heuristic incremental, never moves the blank straight back
+    to where it came from, and tries children in order of how much they
+    reduce the moved tile's Manhattan distance.
+
+    `heuristic` must provide reset(board) -> h, moved(tile, src, dst) -> h
+    and move_delta(tile, src, dst); defaults to ManhattanLinearConflict.
+    """
+
+    def __init__(self, size: int, heuristic=None, max_nodes: int | None = None) -> None:
+        self.size = size
+        self.heuristic = heuristic if heuristic is not None else ManhattanLinearConflict(size)
+        self.max_nodes = max_nodes
+        self.nodes_expanded = 0
+
+        n = size
+        self.neighbors: List[List[int]] = []
+        for idx in range(n * n):
+            r, c = divmod(idx, n)
+            self.neighbors.append(
+                [
+                    (r + dr) * n + (c + dc)
+                    for dr, dc in _DELTAS
+                    if 0 <= r + dr < n and 0 <= c + dc < n
+                ]
+            )
+
+    def solve(self, start: Sequence[int]) -> List[State]:
+        """
+        Optimal solution as a list of states [start, ..., goal], the format
+        `build_interpolated_frames` consumes.
+        """
+        n = self.size
+        start = tuple(start)
+        if len(start) != n * n or sorted(start) != list(range(n * n)):
+            raise ValueError(f"Not a {n}x{n} board: {start}")
+        if not is_solvable(start, n):
+            raise ValueError(f"Unsolvable board: {start}")
+
+        board = list(start)
+        heur = self.heuristic
+        neighbors = self.neighbors
+        moved, move_delta = heur.moved, heur.move_delta
+        max_nodes = self.max_nodes
+        blanks: List[int] = [board.index(0)]
+        self.nodes_expanded = 0
+        found = False
+
+        def search(blank: int, g: int, h: int, bound: int, prev: int) -> int:
+            nonlocal found
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                found = True
+                return f
+
+            self.nodes_expanded += 1
+            if max_nodes is not None and self.nodes_expanded > max_nodes:
+                raise RuntimeError(f"IDA* gave up after {max_nodes} expansions")
+
+            children = [t for t in neighbors[blank] if t != prev]
+            if len(children) > 1:
+                children.sort(key=lambda t: move_delta(board[t], t, blank))
+
+            minimum = math.inf
+            for target in children:
+                tile = board[target]
+                board[blank], board[target] = tile, 0
+                blanks.append(target)
+                t = search(target, g + 1, moved(tile, target, blank), bound, blank)
+                if found:
+                    return t
+                blanks.pop()
+                board[blank], board[target] = 0, tile
+                moved(tile, blank, target)
+                if t < minimum:
+                    minimum = t
+            return minimum
+
+        h0 = heur.reset(board)
+        bound = h0
+        while True:
+            t = search(blanks[0], 0, h0, bound, -1)
+            if found:
+                break
+            bound = t
+
+        # Replay the blank positions from the start to rebuild the states.
+        states = [start]
+        cur = list(start)
+        for src, dst in zip(blanks, blanks[1:]):
+            cur[src], cur[dst] = cur[dst], 0
+            states.append(tuple(cur))
+        return states
+
+
+def ida_star(start: Sequence[int], size: int | None = None) -> List[State]:
+    """Solve one board optimally with Manhattan + linear-conflict IDA*."""
+    if size is None:
+        size = math.isqrt(len(start))
+    return IDAStarSolver(size).solve(start)
@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+import argparse
+import heapq
+import os
 import random
 import pickle
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Lock, shared_memory
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Tuple, Union
 
-from rl_8puzzle.env import EightPuzzleEnv, ACTIONS
+import numpy as np
+
+from rl_8puzzle.curriculum import CurriculumScheduler
+from rl_8puzzle.env import EightPuzzleEnv, ACTIONS, GOAL_RANK
+from rl_8puzzle.q_table import RankedQTable, is_q_binary, open_q_binary, save_q_binary
+from rl_8puzzle.ranking import NUM_STATES, unrank_states
+from rl_8puzzle.solution_cache import prune_stale
+from rl_8puzzle.replay import PrioritizedReplayBuffer, ReplayBuffer
+from rl_8puzzle.transitions import bfs_distances, load_transition_table
 
 State = Tuple[int, ...]
 QKey = Tuple[State, int]
-QTable = Dict[QKey, float]
+QTable = Union[Dict[QKey, float], RankedQTable]
+
+Q_PATH = "rl_8puzzle/q_table.bin"
+LEGACY_Q_PATH = "rl_8puzzle/q_table.pkl"
 
 
 def epsilon_greedy(Q: QTable, state: State, epsilon: float) -> int:
@@ -18,7 +35,10 @@ def epsilon_greedy(Q: QTable, state: State, epsilon: float) -> int:
     if random.random() < epsilon:
         return random.choice(ACTIONS)
 
-    qs = [Q[(state, a)] for a in ACTIONS]
+    if isinstance(Q, RankedQTable):
+        qs = Q.row(state).tolist()
+    else:
+        qs = [Q[(state, a)] for a in ACTIONS]
     max_q = max(qs)
     best_actions = [a for a, q in zip(ACTIONS, qs) if q == max_q]
     return random.choice(best_actions)
@@ -32,63 +52,666 @@ def train(
     epsilon_start: float = 0.3,
     epsilon_end: float = 0.01,
     scramble_moves: int = 30,
+    backend: str = "dict",
+    replay: str | None = None,
+    replay_size: int = 100_000,
+    replay_batch: int = 32,
+    curriculum: CurriculumScheduler | None = None,
+    eval_ranks: np.ndarray | None = None,
+    stats: Dict[str, Any] | None = None,
 ) -> QTable:
-    """Tabular Q-learning for the 8-puzzle."""
-    env = EightPuzzleEnv(scramble_moves=scramble_moves)
-    Q: QTable = defaultdict(float)
+    """
+    Tabular Q-learning for the 8-puzzle.
 
-    for episode in range(num_episodes):
-        state = env.reset()
+    backend: "dict" keeps Q in a defaultdict keyed by (state, action);
+             "ranked" uses a dense RankedQTable (rank-indexed float32 array).
+    replay:  None, "uniform" or "prioritized" (ranked backend only). Every
+             real transition is also stored in a replay buffer of
+             `replay_size` rank transitions, and each episode is followed
+             by `replay_batch` replayed updates per real step. "uniform"
+             is the recommended mode: on the 8-puzzle "prioritized"
+             (sampling by TD error) reaches a given success rate in about
+             as many episodes but several times the wall-clock time
+             (see `benchmark replay`).
+    curriculum: optional CurriculumScheduler that picks each episode's
+             scramble depth (replacing `scramble_moves`) from the
+             episode outcomes.
+    eval_ranks: optional start ranks (ranked backend only); every curve
+             point then also carries "eval_success", the greedy policy's
+             solve rate from these starts within `max_steps`.
+    stats:   optional dict that receives episodes / updates / seconds /
+             solved, plus "curve": rolling success rate every 500 episodes
+             (and the curriculum depth, if any).
+    """
+    env = EightPuzzleEnv(
+        scramble_moves=scramble_moves, use_table=backend == "ranked"
+    )
+    if backend == "ranked":
+        Q: QTable = RankedQTable()
+    elif backend == "dict":
+        Q = defaultdict(float)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
 
-        # Linear ε decay
-        frac = episode / max(num_episodes - 1, 1)
-        epsilon = epsilon_start * (1.0 - frac) + epsilon_end * frac
+    buffer = _make_replay(replay, replay_size) if replay is not None else None
+    if buffer is not None and backend != "ranked":
+        raise ValueError("Experience replay needs backend='ranked'")
+    if eval_ranks is not None and backend != "ranked":
+        raise ValueError("eval_ranks needs backend='ranked'")
 
-        for _ in range(max_steps):
-            action = epsilon_greedy(Q, state, epsilon)
-            next_state, reward, done, _ = env.step(action)
-
-            # Q-learning update
-            max_next = max(Q[(next_state, a)] for a in ACTIONS)
-            old_value = Q[(state, action)]
-            Q[(state, action)] = old_value + alpha * (
-                reward + gamma * max_next - old_value
-            )
+    updates = total_solved = window_solved = 0
+    curve = []
+    t0 = time.perf_counter()
 
-            state = next_state
-            if done:
-                break
+    for episode in range(num_episodes):
+        epsilon = _linear_epsilon(episode, num_episodes, epsilon_start, epsilon_end)
+        if curriculum is not None:
+            env.scramble_moves = curriculum.sample()
+
+        if backend == "ranked":
+            n, solved = _ranked_episode(
+                Q, env, epsilon, max_steps, gamma, alpha, buffer, replay_batch
+            )
+        else:
+            n, solved = _dict_episode(Q, env, epsilon, max_steps, gamma, alpha)
+        updates += n
+        total_solved += solved
+        window_solved += solved
+        if curriculum is not None:
+            curriculum.record(env.scramble_moves, solved)
 
+        if (episode + 1) % 500 == 0:
+            point = {
+                "episodes": episode + 1,
+                "seconds": time.perf_counter() - t0,
+                "success_rate": window_solved / 500,
+            }
+            if curriculum is not None:
+                point["scramble"] = curriculum.depth
+            if eval_ranks is not None:
+                point["eval_success"] = greedy_success_rate(Q, eval_ranks, max_steps)
+            curve.append(point)
+            window_solved = 0
         if (episode + 1) % 5000 == 0:
             print(
                 f"[train] Episode {episode + 1}/{num_episodes}, epsilon={epsilon:.4f}"
             )
 
+    if stats is not None:
+        stats.update(
+            episodes=num_episodes,
+            updates=updates,
+            seconds=time.perf_counter() - t0,
+            solved=total_solved,
+            curve=curve,
+        )
+    return Q
+
+
+def greedy_success_rate(Q: RankedQTable, start_ranks: np.ndarray, max_steps: int = 100) -> float:
+    """Fraction of `start_ranks` the greedy policy solves within `max_steps`, all stepped at once."""
+    table = load_transition_table()
+    ranks = np.array(start_ranks, dtype=np.int64)
+    for _ in range(max_steps):
+        active = ranks != GOAL_RANK
+        if not active.any():
+            break
+        ranks[active] = table[ranks[active], Q.values[ranks[active]].argmax(axis=1)]
+    return float((ranks == GOAL_RANK).mean())
+
+
+def _make_replay(kind: str, capacity: int) -> ReplayBuffer:
+    """Replay buffer of rank transitions for the tabular learner."""
+    if kind == "uniform":
+        return ReplayBuffer(capacity, 1, obs_dtype=np.int32)
+    if kind == "prioritized":
+        return PrioritizedReplayBuffer(capacity, 1, obs_dtype=np.int32)
+    raise ValueError(f"Unknown replay mode: {kind}")
+
+
+def _linear_epsilon(
+    episode: int, num_episodes: int, epsilon_start: float, epsilon_end: float
+) -> float:
+    """Linear ε decay over the whole run."""
+    frac = episode / max(num_episodes - 1, 1)
+    return epsilon_start * (1.0 - frac) + epsilon_end * frac
+
+
+def _dict_episode(
+    Q: QTable,
+    env: EightPuzzleEnv,
+    epsilon: float,
+    max_steps: int,
+    gamma: float,
+    alpha: float,
+) -> Tuple[int, bool]:
+    """One Q-learning episode on the dict backend. Returns (#updates, solved)."""
+    state = env.reset()
+
+    for step in range(max_steps):
+        action = epsilon_greedy(Q, state, epsilon)
+        next_state, reward, done, _ = env.step(action)
+
+        # Q-learning update
+        max_next = max(Q[(next_state, a)] for a in ACTIONS)
+        old_value = Q[(state, action)]
+        Q[(state, action)] = old_value + alpha * (
+            reward + gamma * max_next - old_value
+        )
+
+        state = next_state
+        if done:
+            return step + 1, True
+
+    return max_steps, False
+
+
+def _ranked_episode(
+    Q: RankedQTable,
+    env: EightPuzzleEnv,
+    epsilon: float,
+    max_steps: int,
+    gamma: float,
+    alpha: float,
+    replay: ReplayBuffer | None = None,
+    replay_batch: int = 32,
+) -> Tuple[int, bool]:
+    """
+    One Q-learning episode on the array backend, stepping the env in the
+    rank domain (env must be built with use_table=True).
+    With a replay buffer, the episode's transitions are stored when it
+    ends and `replay_batch` replayed updates per real step follow (see
+    `_replay_episode`). Returns (#updates, solved).
+    """
+    values = Q.values
+    s = env.reset_rank()
+    updates = 0
+    done = False
+    seen: List[Tuple[int, int, float, int, bool]] = []
+
+    for step in range(max_steps):
+        if random.random() < epsilon:
+            action = random.choice(ACTIONS)
+        else:
+            qs = values[s].tolist()
+            max_q = max(qs)
+            action = random.choice([a for a, q in zip(ACTIONS, qs) if q == max_q])
+
+        s_next, reward, done = env.step_rank(action)
+
+        old_value = float(values[s, action])
+        values[s, action] = old_value + alpha * (
+            reward + gamma * max(values[s_next].tolist()) - old_value
+        )
+        updates += 1
+        if replay is not None:
+            seen.append((s, action, reward, s_next, done))
+
+        s = s_next
+        if done:
+            break
+
+    if replay is not None:
+        updates += _replay_episode(values, replay, seen, replay_batch, gamma, alpha)
+    return updates, done
+
+
+def _replay_episode(
+    values: np.ndarray,
+    replay: ReplayBuffer,
+    transitions: List[Tuple[int, int, float, int, bool]],
+    replay_batch: int,
+    gamma: float,
+    alpha: float,
+    chunk: int = 256,
+) -> int:
+    """
+    Store an episode's transitions with one add_batch, then replay
+    replay_batch * len(transitions) of them in vectorized chunks, so the
+    per-call NumPy and sum-tree overhead is paid per chunk, not per sample.
+    """
+    if not transitions:
+        return 0
+    s, a, r, s_next, done = (np.array(col) for col in zip(*transitions))
+    replay.add_batch(s[:, None], a, r, s_next[:, None], done)
+
+    remaining = replay_batch * len(transitions)
+    updates = 0
+    while remaining > 0:
+        updates += _replay_update(values, replay, min(chunk, remaining), gamma, alpha)
+        remaining -= chunk
+    return updates
+
+
+def _replay_update(
+    values: np.ndarray, replay: ReplayBuffer, batch_size: int, gamma: float, alpha: float
+) -> int:
+    """
+    One vectorized Q-learning update over a replayed batch. Returns #updates.
+    Every copy of a pair drawn k times in the batch sees the same old
+    value, so its k steps are combined into what k sequential updates
+    towards that target would give, 1 - (1 - alpha)^k of the (mean,
+    importance-weighted) TD error, rather than summed into a step of
+    k * alpha, which overshoots and diverges once hot transitions
+    dominate a batch (as under prioritized replay).
+    """
+    batch = replay.sample(batch_size)
+    s, s_next = batch["obs"][:, 0], batch["next_obs"][:, 0]
+    a = batch["actions"]
+    td = batch["rewards"] + gamma * ~batch["dones"] * values[s_next].max(axis=1) - values[s, a]
+    weighted = td * batch["weights"] if "weights" in batch else td
+    keys, inverse, counts = np.unique(
+        s.astype(np.int64) * values.shape[1] + a, return_inverse=True, return_counts=True
+    )
+    mean_td = np.bincount(inverse, weights=weighted) / counts
+    values[np.divmod(keys, values.shape[1])] += (1.0 - (1.0 - alpha) ** counts) * mean_td
+    if isinstance(replay, PrioritizedReplayBuffer):
+        replay.update_priorities(batch["indices"], td)
+    return batch_size
+
+
+# ---------- model-based planning ----------
+
+
+def train_dyna(
+    num_episodes: int = 5_000,
+    max_steps: int = 100,
+    gamma: float = 0.99,
+    alpha: float = 0.5,
+    epsilon_start: float = 0.3,
+    epsilon_end: float = 0.01,
+    scramble_moves: int = 30,
+    planning_steps: int = 10,
+    sweeping: bool = True,
+    theta: float = 1e-3,
+    eval_ranks: np.ndarray | None = None,
+    eval_interval: int = 50,
+    target: float | None = None,
+    stats: Dict[str, Any] | None = None,
+) -> RankedQTable:
+    """
+    Dyna-Q on the ranked backend.
+
+    The puzzle is deterministic, so the model is simply the observed
+    next state and reward of each (state, action). Every real step gets
+    its ordinary Q-learning update, followed by `planning_steps` backups
+    on modelled transitions:
+      sweeping=False  (s, a) drawn uniformly from everything observed;
+      sweeping=True   prioritized sweeping: a queue ordered by |TD error|,
+                      where each backup of (s, a) re-queues the known
+                      predecessors of s whose error exceeds `theta`, so the
+                      goal reward flows backwards along observed paths.
+    planning_steps=0 is plain one-update-per-step Q-learning.
+
+    eval_ranks: start ranks for a greedy evaluation every `eval_interval`
+             episodes; with `target` set, training stops as soon as the
+             greedy solve rate reaches it.
+    stats:   optional dict that receives episodes / real_steps / backups /
+             seconds / cpu_seconds, plus "curve" (one point per
+             `eval_interval` episodes). Timings leave out the evaluations.
+    """
+    env = EightPuzzleEnv(scramble_moves=scramble_moves, use_table=True)
+    Q = RankedQTable()
+    values = Q.values
+    model_next = np.full((NUM_STATES, len(ACTIONS)), -1, dtype=np.int32)
+    model_reward = np.zeros((NUM_STATES, len(ACTIONS)), dtype=np.float32)
+    observed: List[Tuple[int, int]] = []
+    predecessors: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+    queue: List[Tuple[float, int, int]] = []  # (-priority, state, action)
+    queued: Dict[Tuple[int, int], float] = {}  # live priority of each queued pair
+
+    def td_error(s: int, a: int) -> float:
+        s_next = int(model_next[s, a])
+        future = 0.0 if s_next == GOAL_RANK else gamma * max(values[s_next].tolist())
+        return float(model_reward[s, a]) + future - float(values[s, a])
+
+    def enqueue(s: int, a: int) -> None:
+        priority = abs(td_error(s, a))
+        if priority > theta and priority > queued.get((s, a), 0.0):
+            queued[(s, a)] = priority
+            heapq.heappush(queue, (-priority, s, a))
+
+    real_steps = backups = window_solved = 0
+    curve: List[Dict[str, float]] = []
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    eval_wall = eval_cpu = 0.0
+
+    episode = 0
+    while episode < num_episodes:
+        epsilon = _linear_epsilon(episode, num_episodes, epsilon_start, epsilon_end)
+        s = env.reset_rank()
+        done = False
+        for _ in range(max_steps):
+            if random.random() < epsilon:
+                action = random.choice(ACTIONS)
+            else:
+                qs = values[s].tolist()
+                max_q = max(qs)
+                action = random.choice([a for a, q in zip(ACTIONS, qs) if q == max_q])
+
+            s_next, reward, done = env.step_rank(action)
+            real_steps += 1
+            if model_next[s, action] < 0:
+                model_next[s, action] = s_next
+                model_reward[s, action] = reward
+                observed.append((s, action))
+                predecessors[s_next].append((s, action))
+            values[s, action] += alpha * td_error(s, action)
+
+            if sweeping:
+                for pred in predecessors[s]:
+                    enqueue(*pred)
+                for _ in range(planning_steps):
+                    while queue:
+                        neg_priority, ps, pa = heapq.heappop(queue)
+                        if queued.get((ps, pa)) == -neg_priority:
+                            break  # otherwise a stale, superseded entry
+                    else:
+                        break
+                    del queued[(ps, pa)]
+                    values[ps, pa] += alpha * td_error(ps, pa)
+                    backups += 1
+                    for pred in predecessors[ps]:
+                        enqueue(*pred)
+            else:
+                for _ in range(planning_steps):
+                    ps, pa = observed[random.randrange(len(observed))]
+                    values[ps, pa] += alpha * td_error(ps, pa)
+                backups += planning_steps
+
+            s = s_next
+            if done:
+                break
+
+        episode += 1
+        window_solved += done
+        if episode % eval_interval == 0 or episode == num_episodes:
+            point: Dict[str, float] = {
+                "episodes": episode,
+                "real_steps": real_steps,
+                "backups": backups,
+                "seconds": time.perf_counter() - t0 - eval_wall,
+                "cpu_seconds": time.process_time() - cpu0 - eval_cpu,
+                "success_rate": window_solved / (episode - (len(curve) and curve[-1]["episodes"])),
+            }
+            window_solved = 0
+            if eval_ranks is not None:
+                wall, cpu = time.perf_counter(), time.process_time()
+                point["eval_success"] = greedy_success_rate(Q, eval_ranks, max_steps)
+                eval_wall += time.perf_counter() - wall
+                eval_cpu += time.process_time() - cpu
+            curve.append(point)
+            if target is not None and point.get("eval_success", 0.0) >= target:
+                break
+
+    if stats is not None:
+        stats.update(
+            episodes=episode,
+            real_steps=real_steps,
+            backups=backups,
+            seconds=time.perf_counter() - t0 - eval_wall,
+            cpu_seconds=time.process_time() - cpu0 - eval_cpu,
+            curve=curve,
+        )
     return Q
 
 
-def save_q(Q: QTable, path: str | Path) -> None:
+# ---------- multi-process Q-learning ----------
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_parallel_worker(shm_name: str, lock, scramble_moves: int) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm  # keep the mapping alive
+    # [0] Q-table, [1] sum of this round's deltas, [2] blocks that changed each entry
+    _worker["shared"] = np.ndarray(
+        (3, NUM_STATES, len(ACTIONS)), dtype=np.float32, buffer=shm.buf
+    )
+    _worker["lock"] = lock
+    _worker["env"] = EightPuzzleEnv(scramble_moves=scramble_moves, use_table=True)
+    # Forked workers inherit the parent's RNG state; reseed from the OS.
+    random.seed()
+
+
+def _run_parallel_block(
+    start: int,
+    stop: int,
+    num_episodes: int,
+    max_steps: int,
+    gamma: float,
+    alpha: float,
+    epsilon_start: float,
+    epsilon_end: float,
+) -> Tuple[int, int]:
+    """
+    Run episodes [start, stop) on a private copy of the shared table, then
+    add this block's Q-value changes to the round's delta sum and count
+    which entries it changed. The table itself is only written by the
+    parent between rounds.
+    """
+    shared, lock, env = _worker["shared"], _worker["lock"], _worker["env"]
+
+    snapshot = shared[0].copy()
+    local = RankedQTable(snapshot.copy())
+
+    updates = 0
+    for episode in range(start, stop):
+        epsilon = _linear_epsilon(episode, num_episodes, epsilon_start, epsilon_end)
+        updates += _ranked_episode(local, env, epsilon, max_steps, gamma, alpha)[0]
+
+    local.values -= snapshot
+    with lock:
+        shared[1] += local.values
+        shared[2] += local.values != 0
+    return stop - start, updates
+
+
+def train_parallel(
+    num_episodes: int = 50_000,
+    num_workers: int | None = None,
+    sync_interval: int = 500,
+    max_steps: int = 100,
+    gamma: float = 0.99,
+    alpha: float = 0.1,
+    epsilon_start: float = 0.3,
+    epsilon_end: float = 0.01,
+    scramble_moves: int = 30,
+    stats: Dict[str, Any] | None = None,
+) -> RankedQTable:
+    """
+    Multi-process tabular Q-learning on the ranked backend.
+
+    The episodes are cut into blocks of `sync_interval` episodes, run in
+    rounds of `num_workers` blocks on a process pool. Every block learns on
+    a private copy of the shared table (a SharedMemory float32 array) and
+    reports its Q-value changes; after the round each (s, a) moves by the
+    mean change of the blocks that updated it. Blocks that start from the
+    same table chase the same targets, so summing their changes would
+    multiply the step size by the number of workers and diverge, while an
+    entry only one block visited still gets that block's full update.
+    Smaller `sync_interval` means fresher tables but more merging.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    load_transition_table()  # build the cache once, not once per worker
+
+    shape = (3, NUM_STATES, len(ACTIONS))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 4)
+    try:
+        shared = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        shared[:] = 0.0
+        table, delta_sum, counts = shared
+
+        t0 = time.perf_counter()
+        done_episodes = updates = 0
+        next_report = 5000
+        starts = list(range(0, num_episodes, sync_interval))
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_parallel_worker,
+            initargs=(shm.name, Lock(), scramble_moves),
+        ) as pool:
+            for first in range(0, len(starts), num_workers):
+                futures = [
+                    pool.submit(
+                        _run_parallel_block,
+                        start,
+                        min(start + sync_interval, num_episodes),
+                        num_episodes,
+                        max_steps,
+                        gamma,
+                        alpha,
+                        epsilon_start,
+                        epsilon_end,
+                    )
+                    for start in starts[first : first + num_workers]
+                ]
+                for future in futures:
+                    episodes, block_updates = future.result()
+                    done_episodes += episodes
+                    updates += block_updates
+
+                touched = counts > 0
+                table[touched] += delta_sum[touched] / counts[touched]
+                delta_sum[:] = 0.0
+                counts[:] = 0.0
+                if done_episodes >= next_report:
+                    print(f"[train] Episode {done_episodes}/{num_episodes} ({num_workers} workers)")
+                    next_report += 5000
+
+        seconds = time.perf_counter() - t0
+        print(
+            f"[train] {num_episodes} episodes on {num_workers} workers in "
+            f"{seconds:.2f}s ({num_episodes / seconds:.0f} episodes/s)"
+        )
+        if stats is not None:
+            stats.update(episodes=num_episodes, updates=updates, seconds=seconds)
+        Q = RankedQTable(table.copy())
+    finally:
+        shared = table = delta_sum = counts = touched = None  # release the buffer exports
+        shm.close()
+        shm.unlink()
+
+    return Q
+
+
+def plan(gamma: float = 0.99, backend: str = "dict") -> QTable:
+    """
+    Exact optimal Q-table by retrograde BFS from GOAL_STATE.
+
+    The BFS over the transition table gives every state's optimal distance d
+    to the goal, which fixes its value under the -1 / +20 reward scheme:
+
+        V(0) = 0 (terminal), V(1) = 20, V(d) = -1 + gamma * V(d - 1)
+
+    and Q(s, a) = r(s, a) + gamma * V(s') for every (s, a). Covers all
+    181,440 states in a couple of seconds; returns the same format as
+    `train(backend=...)`, so `save_q` / `load_q` work unchanged.
+    """
+    table = load_transition_table()
+    dist = bfs_distances(table)
+
+    v_by_depth = np.zeros(int(dist.max()) + 1)
+    for d in range(1, len(v_by_depth)):
+        v_by_depth[d] = 20.0 if d == 1 else -1.0 + gamma * v_by_depth[d - 1]
+    V = v_by_depth[dist]
+
+    reached_goal = table == GOAL_RANK
+    values = np.where(reached_goal, 20.0, -1.0 + gamma * V[table]).astype(np.float32)
+
+    if backend == "ranked":
+        return RankedQTable(values)
+    if backend != "dict":
+        raise ValueError(f"Unknown backend: {backend}")
+
+    Q: QTable = {}
+    states = map(tuple, unrank_states(np.arange(NUM_STATES)).tolist())
+    for state, row in zip(states, values.tolist()):
+        for a in ACTIONS:
+            Q[(state, a)] = row[a]
+    return Q
+
+
+def save_q(Q: QTable, path: str | Path, dtype: str = "float32") -> None:
+    """
+    Save a Q-table. Paths ending in ".bin" use the memory-mappable binary
+    format (see `q_table.py`, dtype "float32" or "float16"); anything else
+    is pickled as a dict.
+    """
     path = Path(path)
+    if path.suffix == ".bin":
+        save_q_binary(Q, path, dtype=dtype)
+        return
+
     path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(Q, RankedQTable):
+        Q = Q.to_dict()
     with path.open("wb") as f:
         # dict() to remove defaultdict behaviour
         pickle.dump(dict(Q), f)
 
 
-def load_q(path: str | Path = "rl_8puzzle/q_table.pkl") -> QTable:
-    import pickle
+def load_q(path: str | Path = Q_PATH) -> QTable:
+    """
+    Load a Q-table written by `save_q`.
 
+    Binary tables are memory-mapped (a RankedQTable over np.memmap);
+    pickled dicts are unpickled as before.
+    """
     path = Path(path)
+    if is_q_binary(path):
+        return open_q_binary(path)
+
     with path.open("rb") as f:
         data = pickle.load(f)
     return data
 
 
 def main() -> None:
-    print("[train] Starting Q-learning for 8-puzzle…")
-    Q = train()
-    save_q(Q, "rl_8puzzle/q_table.pkl")
-    print("[train] Done. Saved Q-table → rl_8puzzle/q_table.pkl")
+    parser = argparse.ArgumentParser(description="Build the 8-puzzle Q-table.")
+    parser.add_argument(
+        "--mode",
+        choices=("qlearning", "dyna", "plan"),
+        default="qlearning",
+        help="epsilon-greedy Q-learning, Dyna-Q with prioritized sweeping, "
+        "or exact retrograde planning",
+    )
+    parser.add_argument(
+        "--planning-steps", type=int, default=10, help="model backups per real step (dyna)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Q-learning worker processes (>1 uses train_parallel)",
+    )
+    parser.add_argument(
+        "--curriculum",
+        action="store_true",
+        help="adapt the scramble depth (up to 30) to the success rate",
+    )
+    args = parser.parse_args()
+
+    if args.mode == "plan":
+        print("[train] Planning optimal Q-table for 8-puzzle…")
+        Q = plan(backend="ranked")
+    elif args.mode == "dyna":
+        print(f"[train] Starting Dyna-Q ({args.planning_steps} planning steps per move)…")
+        stats: Dict[str, Any] = {}
+        Q = train_dyna(planning_steps=args.planning_steps, stats=stats)
+        print(
+            f"[train] {stats['episodes']} episodes, {stats['real_steps']} real steps, "
+            f"{stats['backups']} planning backups in {stats['cpu_seconds']:.1f}s CPU"
+        )
+    elif args.workers > 1:
+        print(f"[train] Starting parallel Q-learning on {args.workers} workers…")
+        Q = train_parallel(num_workers=args.workers)
+    else:
+        print("[train] Starting Q-learning for 8-puzzle…")
+        Q = train(curriculum=CurriculumScheduler() if args.curriculum else None)
+    save_q(Q, Q_PATH)
+    print(f"[train] Done. Saved Q-table → {Q_PATH}")
+    print(f"[train] Pruned {prune_stale(Q)} cached solutions of older Q-tables")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from rl_8puzzle.env import ACTIONS, GOAL_RANK
+from rl_8puzzle.ranking import NUM_STATES, rank_states, unrank_states
+
+TABLE_PATH = Path(__file__).with_name("transition_table.npy")
+
+# (row, col) offsets of the blank for actions 0=up, 1=down, 2=left, 3=right
+_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def build_transition_table() -> np.ndarray:
+    """
+    Build next_state[rank, action] for every reachable 8-puzzle state.
+
+    Invalid moves map a state to itself, exactly like `EightPuzzleEnv._move`.
+    Returns a (181440, 4) int32 array.
+    """
+    ranks = np.arange(NUM_STATES)
+    boards = unrank_states(ranks)
+    blank = np.argmax(boards == 0, axis=1)
+    row, col = np.divmod(blank, 3)
+    idx = np.arange(NUM_STATES)
+
+    table = np.empty((NUM_STATES, len(ACTIONS)), dtype=np.int32)
+    for action, (dr, dc) in zip(ACTIONS, _DELTAS):
+        r_new, c_new = row + dr, col + dc
+        valid = (r_new >= 0) & (r_new < 3) & (c_new >= 0) & (c_new < 3)
+        target = np.where(valid, r_new * 3 + c_new, blank)
+
+        moved = boards.copy()
+        moved[idx, blank] = boards[idx, target]
+        moved[idx, target] = 0
+        table[:, action] = np.where(valid, rank_states(moved), ranks)
+
+    return table
+
+
+def load_transition_table(path: str | Path = TABLE_PATH) -> np.ndarray:
+    """
+    Load the cached transition table, building and saving it on first use.
+
+    The table is written to a per-process temp file and renamed into place,
+    so pool workers starting together never read a half-written file.
+    """
+    path = Path(path)
+    if path.exists():
+        return np.load(path)
+
+    table = build_transition_table()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.save(f, table)
+    os.replace(tmp, path)
+    return table
+
+
+def bfs_distances(table: np.ndarray, source: int | None = None) -> np.ndarray:
+    """
+    Exact number of moves from every state to `source` (default: the goal).
+
+    Moves are reversible, so a BFS from the goal over the transition table
+    gives optimal solution lengths. Returns a (181440,) int16 array.
+    """
+    if source is None:
+        source = GOAL_RANK
+
+    dist = np.full(len(table), -1, dtype=np.int16)
+    dist[source] = 0
+    frontier = np.array([source])
+    depth = 0
+    while len(frontier):
+        depth += 1
+        nbrs = np.unique(table[frontier].ravel())
+        frontier = nbrs[dist[nbrs] < 0]
+        dist[frontier] = depth
+    return dist
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from rl_8puzzle.ranking import rank_states
+
+
+def neighbor_table(size: int) -> np.ndarray:
+    """
+    (size*size, 4) table of the blank's target cell for each action
+    (0=up, 1=down, 2=left, 3=right). Invalid moves point back at the
+    blank's own cell, i.e. they are no-ops.
+    """
+    n2 = size * size
+    table = np.empty((n2, 4), dtype=np.intp)
+    for idx in range(n2):
+        r, c = divmod(idx, size)
+        for action, (dr, dc) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+            r_new, c_new = r + dr, c + dc
+            if 0 <= r_new < size and 0 <= c_new < size:
+                table[idx, action] = r_new * size + c_new
+            else:
+                table[idx, action] = idx
+    return table
+
+
+def move_boards(
+    boards: np.ndarray,
+    blanks: np.ndarray,
+    actions: np.ndarray,
+    neighbors: np.ndarray,
+) -> None:
+    """Apply one action per board, in place. Invalid moves are no-ops."""
+    rows = np.arange(len(boards))
+    target = neighbors[blanks, actions]
+    boards[rows, blanks] = boards[rows, target]
+    boards[rows, target] = 0
+    blanks[:] = target
+
+
+class VecNPuzzleEnv:
+    """
+    B independent N x N sliding-tile puzzles stepped together.
+
+    Boards: (B, n*n) uint8 array, 0 = blank, goal (1, 2, ..., n*n - 1, 0).
+    step(actions) takes a (B,) action vector and returns
+    (next_boards, rewards, dones, info) as arrays, with the same reward
+    scheme as NPuzzleEnv: -1 per move, +20 when reaching the goal.
+
+    Boards that reach the goal are reset automatically; the returned
+    `next_boards` then hold the new start state, and the terminal boards
+    are reported in info["final_boards"] (rows listed by info["final_index"]).
+    """
+
+    ACTIONS = (0, 1, 2, 3)
+
+    def __init__(
+        self,
+        num_envs: int,
+        size: int = 3,
+        scramble_moves: int = 30,
+        seed: int | None = None,
+    ) -> None:
+        assert num_envs >= 1 and size >= 2
+        self.num_envs = num_envs
+        self.size = size
+        self.scramble_moves = scramble_moves
+        self.rng = np.random.default_rng(seed)
+
+        n2 = size * size
+        self.goal_state = np.array(list(range(1, n2)) + [0], dtype=np.uint8)
+        self.neighbors = neighbor_table(size)
+
+        self.boards = np.tile(self.goal_state, (num_envs, 1))
+        self.blanks = np.full(num_envs, n2 - 1, dtype=np.intp)
+
+        # Pre-scrambled start states handed out on auto-reset, so finished
+        # boards don't each pay for `scramble_moves` vectorized passes.
+        self._pool_boards = np.empty((0, n2), dtype=np.uint8)
+        self._pool_blanks = np.empty(0, dtype=np.intp)
+
+    # ---------- helpers ----------
+
+    def scramble(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return `count` fresh (boards, blanks) scrambled from the goal."""
+        boards = np.tile(self.goal_state, (count, 1))
+        blanks = np.full(count, self.size * self.size - 1, dtype=np.intp)
+        for _ in range(self.scramble_moves):
+            actions = self.rng.integers(0, 4, size=count)
+            move_boards(boards, blanks, actions, self.neighbors)
+        return boards, blanks
+
+    def _take_starts(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self._pool_blanks) < count:
+            boards, blanks = self.scramble(max(4 * self.num_envs, count))
+            self._pool_boards = np.concatenate([self._pool_boards, boards])
+            self._pool_blanks = np.concatenate([self._pool_blanks, blanks])
+        boards, blanks = self._pool_boards[:count], self._pool_blanks[:count]
+        self._pool_boards = self._pool_boards[count:]
+        self._pool_blanks = self._pool_blanks[count:]
+        return boards, blanks
+
+    # ---------- RL API ----------
+
+    def reset(self) -> np.ndarray:
+        """Scramble every board. Returns a copy of the (B, n*n) boards."""
+        self.boards, self.blanks = self.scramble(self.num_envs)
+        return self.boards.copy()
+
+    def reset_boards(self, index: np.ndarray) -> None:
+        """Give the boards at `index` fresh start states (e.g. on a time limit)."""
+        boards, blanks = self._take_starts(len(index))
+        self.boards[index] = boards
+        self.blanks[index] = blanks
+
+    def set_scramble_moves(self, moves: int) -> None:
+        """Change the start-state depth; pre-scrambled starts of the old depth are dropped."""
+        if moves != self.scramble_moves:
+            self.scramble_moves = moves
+            self._pool_boards = self._pool_boards[:0]
+            self._pool_blanks = self._pool_blanks[:0]
+
+    def step(self, actions: np.ndarray):
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got shape {actions.shape}")
+        if actions.min() < 0 or actions.max() > 3:
+            raise ValueError(f"Invalid action in {actions}")
+
+        move_boards(self.boards, self.blanks, actions, self.neighbors)
+
+        dones = (self.boards == self.goal_state).all(axis=1)
+        rewards = np.where(dones, 20.0, -1.0).astype(np.float32)
+        info: Dict[str, Any] = {}
+
+        if dones.any():
+            done_idx = np.flatnonzero(dones)
+            info["final_index"] = done_idx
+            info["final_boards"] = self.boards[done_idx].copy()
+            boards, blanks = self._take_starts(len(done_idx))
+            self.boards[done_idx] = boards
+            self.blanks[done_idx] = blanks
+
+        return self.boards.copy(), rewards, dones, info
+
+
+class VecEightPuzzleEnv(VecNPuzzleEnv):
+    """Batched 3x3 puzzle, with rank-domain observations for tabular learners."""
+
+    def __init__(
+        self, num_envs: int, scramble_moves: int = 30, seed: int | None = None
+    ) -> None:
+        super().__init__(num_envs, size=3, scramble_moves=scramble_moves, seed=seed)
+
+    def ranks(self) -> np.ndarray:
+        """(B,) ranks of the current boards (see `ranking.rank_states`)."""
+        return rank_states(self.boards)
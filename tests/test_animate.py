@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("imageio")
+
+from rl_8puzzle.animate_3d import (  # noqa: E402
+    FrameRenderer,
+    RetainedFrameRenderer,
+    SpriteFrameRenderer,
+    _render_parallel,
+    animate_frames_to_gif,
+    build_interpolated_frames,
+    count_interpolated_frames,
+    iter_interpolated_frames,
+    state_to_xy_dict,
+)
+
+STATES = [
+    (1, 2, 3, 4, 5, 6, 0, 7, 8),
+    (1, 2, 3, 4, 5, 6, 7, 0, 8),
+    (1, 2, 3, 4, 5, 6, 7, 8, 0),
+]
+
+
+def test_parallel_render_matches_serial_order():
+    frames = build_interpolated_frames(STATES, substeps=2)
+    renderer = FrameRenderer()
+    try:
+        serial = [renderer.render(f, i, len(frames)) for i, f in enumerate(frames)]
+    finally:
+        renderer.close()
+
+    parallel = list(_render_parallel(frames, len(frames), workers=2, chunk_size=2))
+    assert len(parallel) == len(serial)
+    for a, b in zip(serial, parallel):
+        assert a.shape == b.shape and a.shape[-1] == 3
+        assert np.array_equal(a, b)
+
+
+def test_retained_renderer_matches_redraw():
+    frames = build_interpolated_frames(STATES, substeps=3)
+    redraw, retained = FrameRenderer(), RetainedFrameRenderer()
+    try:
+        for i, frame in enumerate(frames):
+            a = redraw.render(frame, i, len(frames))
+            b = retained.render(frame, i, len(frames))
+            assert np.array_equal(a, b)
+    finally:
+        redraw.close()
+        retained.close()
+
+
+def test_iter_interpolated_frames_moves_one_tile():
+    frames = iter_interpolated_frames(iter(STATES), substeps=4)
+    assert not isinstance(frames, list)
+    frames = list(frames)
+    assert len(frames) == count_interpolated_frames(len(STATES), 4) == 9
+    assert all(f.shape == (8, 2) for f in frames)
+
+    for k, state in ((0, STATES[0]), (4, STATES[1]), (8, STATES[2])):
+        expected = state_to_xy_dict(state)
+        assert [tuple(p) for p in frames[k]] == [expected[t] for t in range(1, 9)]
+
+    # Tile 7 slides left in quarter steps while everything else stays put.
+    assert [f[6, 0] for f in frames[:5]] == [1.0, 0.75, 0.5, 0.25, 0.0]
+    assert all(np.array_equal(f[:6], frames[0][:6]) for f in frames[:5])
+
+
+def test_sprite_renderer_approximates_3d_render():
+    frames = build_interpolated_frames(STATES, substeps=2)
+    retained, sprite = RetainedFrameRenderer(), SpriteFrameRenderer()
+    try:
+        for i, frame in enumerate(frames):
+            a = retained.render(frame, i, len(frames))
+            b = sprite.render(frame, i, len(frames))
+            assert a.shape == b.shape and b.dtype == np.uint8
+            assert np.abs(a.astype(int) - b).mean() < 5
+    finally:
+        retained.close()
+        sprite.close()
+
+
+def test_gif_frames_have_no_counter_so_repeats_merge(tmp_path):
+    frames = build_interpolated_frames(STATES, substeps=2)
+    frames = frames[:1] * 3 + frames  # hold the start board for two extra frames
+    renderer = RetainedFrameRenderer(counter=False)
+    try:
+        assert np.array_equal(renderer.render(frames[0], 0, 9), renderer.render(frames[0], 1, 9))
+    finally:
+        renderer.close()
+
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "out.gif"
+    animate_frames_to_gif(iter(frames), save_path=path, fps=10)
+    with Image.open(path) as gif:
+        assert gif.n_frames == len(frames) - 3
@@ -0,0 +1,58 @@
+import json
+
+from rl_8puzzle.batch import _read_starts, solve_many
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.train_q_learning import plan, save_q
+
+
+def _starts(n):
+    env = EightPuzzleEnv(scramble_moves=30)
+    return [env.reset() for _ in range(n)]
+
+
+def test_solve_many_in_process(tmp_path):
+    q_path = tmp_path / "q.bin"
+    save_q(plan(backend="ranked"), q_path)
+    starts = _starts(50)
+
+    results = list(solve_many(iter(starts), workers=1, q_path=q_path, chunk_size=7))
+    assert [tuple(r["start"]) for r in results] == starts
+    for r in results:
+        assert r["success"]
+        assert tuple(r["trajectory"][-1]) == GOAL_STATE
+        assert len(r["moves"]) == len(r["trajectory"]) - 1
+        json.dumps(r)
+
+
+def test_solve_many_process_pool_keeps_order(tmp_path):
+    q_path = tmp_path / "q.bin"
+    save_q(plan(backend="ranked"), q_path)
+    starts = _starts(40)
+
+    results = list(solve_many(starts, workers=2, q_path=q_path, chunk_size=5))
+    assert [tuple(r["start"]) for r in results] == starts
+    assert all(r["success"] for r in results)
+
+
+def test_read_starts_reports_bad_boards(tmp_path):
+    q_path = tmp_path / "q.bin"
+    save_q(plan(backend="ranked"), q_path)
+    starts = tmp_path / "starts.jsonl"
+    starts.write_text(
+        "\n".join(
+            [
+                json.dumps({"start": [2, 1, 3, 4, 5, 6, 7, 8, 0]}),  # odd parity
+                json.dumps([1, 2, 3]),
+                json.dumps([1, 1, 3, 4, 5, 6, 7, 8, 0]),
+                "not json",
+                json.dumps(list(GOAL_STATE)),
+            ]
+        )
+        + "\n"
+    )
+
+    results = list(solve_many(_read_starts(starts), workers=2, q_path=q_path, chunk_size=2))
+    assert [r["success"] for r in results] == [False, False, False, False, True]
+    assert all("error" in r for r in results[:4])
+    assert results[0]["start"] == [2, 1, 3, 4, 5, 6, 7, 8, 0]
+    assert "trajectory" not in results[0]
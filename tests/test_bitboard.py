@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+import pytest
+
+from rl_8puzzle.bitboard import (
+    PackedNPuzzleEnv,
+    blank_of,
+    pack_boards,
+    pack_state,
+    unpack_state,
+)
+from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+
+
+@pytest.mark.parametrize("size", [2, 3, 4])
+def test_pack_roundtrip(size):
+    env = NPuzzleEnv(size=size, scramble_moves=40)
+    for _ in range(50):
+        state = env.reset()
+        packed = pack_state(state)
+        assert unpack_state(packed, size) == state
+        assert blank_of(packed, size) == state.index(0)
+    if size == 4:
+        assert pack_state(env.goal_state) < 2**64
+
+
+@pytest.mark.parametrize("size", [3, 4])
+def test_packed_env_matches_tuple_env(size):
+    ref = NPuzzleEnv(size=size, scramble_moves=0)
+    packed = PackedNPuzzleEnv(size=size, scramble_moves=0)
+    start = ref.reset()
+    packed.set_state(start)
+
+    rng = random.Random(0)
+    for _ in range(300):
+        action = rng.choice(NPuzzleEnv.ACTIONS)
+        state, reward, done, _ = ref.step(action)
+        p, p_reward, p_done, _ = packed.step(action)
+        assert unpack_state(p, size) == state
+        assert (p_reward, p_done) == (reward, done)
+
+
+def test_packed_env_rejects_large_boards():
+    with pytest.raises(ValueError):
+        PackedNPuzzleEnv(size=5)
+
+
+def test_pack_boards_matches_pack_state():
+    env = NPuzzleEnv(size=4, scramble_moves=40)
+    states = [env.reset() for _ in range(20)]
+    packed = pack_boards(np.array(states, dtype=np.uint8))
+    assert packed.tolist() == [pack_state(s) for s in states]
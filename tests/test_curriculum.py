@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+
+from rl_8puzzle.curriculum import CurriculumScheduler
+from rl_8puzzle.train_q_learning import train
+
+
+def test_scheduler_promotes_and_demotes_after_full_windows():
+    cur = CurriculumScheduler(min_depth=1, max_depth=3, window=10, promote=0.8, demote=0.3, review=0.0)
+    assert not cur.record(np.ones(9, dtype=int), np.ones(9, dtype=bool))
+    assert cur.record(1, True) and cur.depth == 2
+    # Results at other depths do not count towards the current window.
+    cur.record(np.ones(20, dtype=int), np.zeros(20, dtype=bool))
+    assert cur.depth == 2
+    cur.record(np.full(10, 2), np.ones(10, dtype=bool))
+    cur.record(np.full(10, 3), np.ones(10, dtype=bool))
+    assert cur.depth == 3  # capped at max_depth
+    cur.record(np.full(10, 3), np.zeros(10, dtype=bool))
+    assert cur.depth == 2 and cur.changes == [(10, 2), (40, 3), (60, 2)]
+    assert cur.success_rate(1) == 0.0
+
+
+def test_scheduler_reviews_easier_depths():
+    cur = CurriculumScheduler(min_depth=2, max_depth=10, start_depth=8, review=0.5, seed=0)
+    depths = [cur.sample() for _ in range(1000)]
+    assert set(depths) <= set(range(2, 9)) and 400 < depths.count(8) < 600
+
+
+def test_train_with_curriculum_raises_depth():
+    random.seed(0)
+    cur = CurriculumScheduler(max_depth=20, window=50)
+    stats = {}
+    train(
+        num_episodes=2000,
+        backend="ranked",
+        curriculum=cur,
+        eval_ranks=np.arange(0, 181_440, 1_000),
+        stats=stats,
+    )
+    assert cur.depth > 5 and cur.changes
+    assert [p["scramble"] for p in stats["curve"]][-1] == cur.depth
+    assert all(0.0 <= p["eval_success"] <= 1.0 for p in stats["curve"])
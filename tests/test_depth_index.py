@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+
+from rl_8puzzle.depth_index import DepthIndex, load_depth_index
+from rl_8puzzle.env import GOAL_RANK
+from rl_8puzzle.ranking import NUM_STATES
+
+
+def test_depth_index_groups_all_states(tmp_path):
+    index = DepthIndex.build()
+    assert index.max_depth == 31
+    assert index.count(0) == NUM_STATES
+    assert index.count(31) == 2  # the two hardest 8-puzzle states
+    assert index.depth(GOAL_RANK) == 0
+
+    path = tmp_path / "depth.npz"
+    index.save(path)
+    loaded = load_depth_index(path)
+    assert (loaded.order == index.order).all()
+    assert [p.name for p in tmp_path.iterdir()] == ["depth.npz"]  # no temp file left behind
+
+
+def test_sample_respects_min_depth_and_exclusions():
+    index = DepthIndex.build()
+    rng = random.Random(0)
+    for _ in range(100):
+        assert index.depth(index.sample(20, rng=rng)) >= 20
+
+    hardest = set(index.order[index.offsets[31]:].tolist())
+    first = index.sample(31, rng=rng)
+    second = index.sample(31, exclude=lambda r: r == first, rng=rng)
+    assert {first, second} == hardest
+    assert index.sample(31, exclude=lambda r: np.isin(r, list(hardest)), rng=rng) is None
+    assert index.sample(40, rng=rng) is None
+
+
+def test_sample_finds_last_unused_states_of_a_nearly_exhausted_bucket():
+    index = DepthIndex.build()
+    deep = index.order[index.offsets[28]:]
+    free = set(deep[[0, 7, 42, 99, len(deep) - 1]].tolist())
+    used = np.ones(NUM_STATES, dtype=bool)
+    used[list(free)] = False
+    rng = random.Random(0)
+    picks = [index.sample(28, exclude=lambda r: used[r], rng=rng) for _ in range(1000)]
+    assert set(picks) == free  # never None while a free state is left, and uniform enough to hit all
+    used[list(free)] = True
+    assert index.sample(28, exclude=lambda r: used[r], rng=rng) is None
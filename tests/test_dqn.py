@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from rl_8puzzle.dqn_15_puzzle import load_dqn, train_dqn  # noqa: E402
+
+
+def test_train_dqn_checkpoints_and_resumes(tmp_path):
+    path = tmp_path / "dqn.pt"
+    kwargs = dict(
+        size=3,
+        num_envs=16,
+        scramble_moves=4,
+        buffer_size=2_000,
+        batch_size=32,
+        learning_starts=64,
+        log_interval=256,
+        checkpoint_path=path,
+        seed=0,
+    )
+    stats = {}
+    threads = torch.get_num_threads()
+    model = train_dqn(total_steps=512, stats=stats, **kwargs)
+    assert torch.get_num_threads() == threads  # no num_threads: process setting untouched
+    assert stats["steps"] == 512 and stats["curve"]
+    assert 0.0 <= stats["curve"][-1]["success_rate"] <= 1.0
+
+    boards = torch.from_numpy(np.array([[1, 2, 3, 4, 5, 6, 7, 0, 8]], dtype=np.uint8))
+    restored = load_dqn(path)
+    with torch.no_grad():
+        assert torch.allclose(model(boards), restored(boards))
+
+    stats = {}
+    train_dqn(total_steps=768, resume=True, stats=stats, **kwargs)
+    assert stats["steps"] == 768
+
+
+def test_train_dqn_with_prioritized_replay():
+    stats = {}
+    train_dqn(
+        size=3,
+        total_steps=256,
+        num_envs=16,
+        scramble_moves=4,
+        buffer_size=1_000,
+        batch_size=32,
+        learning_starts=64,
+        prioritized=True,
+        checkpoint_path=None,
+        seed=0,
+        stats=stats,
+    )
+    assert stats["steps"] == 256 and stats["samples_per_sec"] > 0
+
+
+def test_train_dqn_records_curriculum_outcomes():
+    from rl_8puzzle.curriculum import CurriculumScheduler
+
+    cur = CurriculumScheduler(max_depth=6, window=16)
+    stats = {}
+    train_dqn(
+        size=3,
+        total_steps=512,
+        num_envs=16,
+        max_episode_steps=8,
+        buffer_size=1_000,
+        batch_size=32,
+        learning_starts=64,
+        curriculum=cur,
+        checkpoint_path=None,
+        seed=0,
+        stats=stats,
+    )
+    assert cur.episodes == stats["episodes"] > 0
+    assert stats["curve"][-1]["scramble"] == cur.depth
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from rl_8puzzle.dqn_15_puzzle import DQNTiles  # noqa: E402
+from rl_8puzzle.dqn_inference import InferenceEngine, report  # noqa: E402
+from rl_8puzzle.vec_env import VecNPuzzleEnv, move_boards  # noqa: E402
+
+
+def _engine(**kwargs):
+    torch.manual_seed(0)
+    return InferenceEngine(DQNTiles(board_size=3, embed_dim=8, hidden_dim=32), num_threads=1, **kwargs)
+
+
+def _replay(engine, board, actions):
+    board = board.copy()[None]
+    blank = np.array([int(np.argmin(board))])
+    for action in actions:
+        move_boards(board, blank, np.array([action]), engine.neighbors)
+    return (board[0] == engine.goal).all()
+
+
+def test_rollout_actions_reach_goal():
+    engine = _engine()
+    boards, _ = VecNPuzzleEnv(1, size=3, scramble_moves=6, seed=0).scramble(64)
+    boards[0] = engine.goal
+    for rollout in (engine.greedy(boards, max_steps=30), engine.beam(boards, beam_width=4, max_steps=30)):
+        assert rollout.solved[0] and rollout.actions[0] == [] and rollout.lengths[0] == 0
+        for board, actions, solved in zip(boards, rollout.actions, rollout.solved):
+            if solved:
+                assert _replay(engine, board, actions)
+        assert report(rollout)["boards"] == 64
+
+
+def test_beam_finds_one_move_solutions():
+    engine = _engine()
+    boards, _ = VecNPuzzleEnv(1, size=3, scramble_moves=1, seed=1).scramble(32)
+    boards = boards[(boards != engine.goal).any(axis=1)]
+    rollout = engine.beam(boards, beam_width=4, max_steps=5)
+    assert rollout.solved.all() and (rollout.lengths == 1).all()
+
+
+def test_quantized_torchscript_engine_matches_float(tmp_path):
+    boards, _ = VecNPuzzleEnv(1, size=3, scramble_moves=20, seed=2).scramble(256)
+    plain = _engine()
+    fast = _engine(quantize=True, torchscript=True)
+    assert np.abs(plain.q_values(boards) - fast.q_values(boards)).max() < 0.1
+
+    fast.save_torchscript(tmp_path / "dqn.ts")
+    loaded = torch.jit.load(str(tmp_path / "dqn.ts"))
+    with torch.inference_mode():
+        assert loaded(torch.from_numpy(boards)).shape == (256, 4)
+
+
+def test_engine_leaves_process_settings_alone():
+    import warnings
+
+    threads = torch.get_num_threads()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        InferenceEngine(DQNTiles(board_size=3, embed_dim=8, hidden_dim=32), quantize=True, torchscript=True)
+        warnings.warn("unrelated", RuntimeWarning)
+    assert torch.get_num_threads() == threads
+    assert [str(w.message) for w in caught] == ["unrelated"]
@@ -17,3 +17,44 @@ def test_step_invalid_move_stays_put():
     # Reward should not be positive (either step cost or goal reward).
     # Since we are already at goal, it's fine if done is True.
     assert reward <= 20.0
+
+
+def test_table_env_matches_tuple_env():
+    import random
+
+    from rl_8puzzle.env import ACTIONS, GOAL_RANK
+    from rl_8puzzle.ranking import rank_state
+
+    ref = EightPuzzleEnv(scramble_moves=0)
+    fast = EightPuzzleEnv(scramble_moves=0, use_table=True)
+    assert fast.rank == GOAL_RANK
+
+    rng = random.Random(0)
+    for _ in range(500):
+        action = rng.choice(ACTIONS)
+        assert fast.step(action) == ref.step(action)
+        assert fast.rank == rank_state(ref.state)
+
+
+def test_table_env_state_setter_syncs_rank():
+    from rl_8puzzle.ranking import rank_state
+
+    env = EightPuzzleEnv(scramble_moves=0, use_table=True)
+    start = (1, 2, 3, 4, 5, 6, 7, 0, 8)
+    env.state = start
+    assert env.rank == rank_state(start)
+
+    next_rank, reward, done = env.step_rank(3)  # blank right -> goal
+    assert done and reward == 20.0
+    assert env.state == GOAL_STATE
+
+
+def test_transition_table_cache_is_written_atomically(tmp_path):
+    import numpy as np
+
+    from rl_8puzzle.transitions import load_transition_table
+
+    path = tmp_path / "table.npy"
+    table = load_transition_table(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["table.npy"]
+    assert np.array_equal(load_transition_table(path), table)
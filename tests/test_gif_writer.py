@@ -0,0 +1,34 @@
+import numpy as np
+from PIL import Image
+
+from rl_8puzzle.gif_writer import StreamingGifWriter
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+
+
+def _frame(offset):
+    """Three colored squares on black; the blue one starts `offset` px right."""
+    rgb = np.zeros((16, 40, 3), dtype=np.uint8)
+    rgb[2:8, 2:8] = RED
+    rgb[2:8, 10:16] = GREEN
+    rgb[8:14, 18 + offset : 24 + offset] = BLUE
+    return rgb
+
+
+def test_streaming_gif_merges_repeats_and_keeps_pixels(tmp_path):
+    offsets = [0, 0, 0, 4, 8, 8]
+    path = tmp_path / "out.gif"
+    with StreamingGifWriter(path, fps=10) as writer:
+        for offset in offsets:
+            writer.append_data(_frame(offset))
+    assert (writer.frames_in, writer.frames_out) == (6, 3)
+
+    im = Image.open(path)
+    assert im.n_frames == 3
+    assert im.info.get("loop") == 0
+    durations = []
+    for i, offset in enumerate((0, 4, 8)):
+        im.seek(i)
+        durations.append(im.info["duration"])
+        assert np.array_equal(np.asarray(im.convert("RGB")), _frame(offset))
+    assert durations == [300, 100, 200]
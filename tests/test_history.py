@@ -0,0 +1,50 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.history import UsedStartStore
+from rl_8puzzle.ranking import rank_state
+
+
+def test_store_records_and_persists(tmp_path):
+    path = tmp_path / "used.bits"
+    store = UsedStartStore(path, legacy_json=None)
+    state = (1, 2, 3, 4, 5, 6, 7, 0, 8)
+    assert state not in store
+    store.add(state)
+    assert state in store
+    assert not store.claim_rank(rank_state(state))
+    store.close()
+
+    reopened = UsedStartStore(path, legacy_json=None)
+    assert state in reopened
+    assert len(reopened) == 1
+    assert reopened.contains_ranks([rank_state(state), 0, 181_439]).tolist() == [True, False, False]
+
+
+def test_legacy_json_is_imported(tmp_path):
+    legacy = tmp_path / "used_start_states.json"
+    legacy.write_text(json.dumps([list(GOAL_STATE)]), encoding="utf-8")
+    store = UsedStartStore(tmp_path / "used.bits", legacy_json=legacy)
+    assert GOAL_STATE in store
+
+
+def _claim_all(path, ranks):
+    store = UsedStartStore(path, legacy_json=None)
+    won = [r for r in ranks if store.claim_rank(r)]
+    store.close()
+    return won
+
+
+def test_concurrent_claims_never_overlap(tmp_path):
+    path = tmp_path / "used.bits"
+    UsedStartStore(path, legacy_json=None).close()
+    env = EightPuzzleEnv(scramble_moves=30)
+    ranks = sorted({rank_state(env.reset()) for _ in range(300)})
+
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(_claim_all, [path] * 3, [ranks] * 3))
+
+    won = [r for res in results for r in res]
+    assert sorted(won) == ranks  # every rank claimed exactly once
+    assert len(UsedStartStore(path, legacy_json=None)) == len(ranks)
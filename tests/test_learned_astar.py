@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from rl_8puzzle.learned_astar import LearnedAStar, manhattan_boards, q_to_distance, solve_boards
+from rl_8puzzle.solvers import IDAStarSolver, goal_state
+from rl_8puzzle.vec_env import VecNPuzzleEnv
+
+
+def _is_path(path, size):
+    for a, b in zip(path, path[1:]):
+        diff = [i for i in range(size * size) if a[i] != b[i]]
+        if len(diff) != 2 or 0 not in (a[diff[0]], a[diff[1]]):
+            return False
+        (r0, c0), (r1, c1) = divmod(diff[0], size), divmod(diff[1], size)
+        if abs(r0 - r1) + abs(c0 - c1) != 1:
+            return False
+    return path[-1] == goal_state(size)
+
+
+@pytest.mark.parametrize("size,expand", [(3, 1), (3, 16), (4, 32)])
+def test_learned_astar_paths_are_valid_and_near_optimal(size, expand):
+    boards, _ = VecNPuzzleEnv(1, size=size, scramble_moves=30, seed=size).scramble(10)
+    ida = IDAStarSolver(size)
+    solver = LearnedAStar(size, manhattan_boards(size), weight=1.0, expand=expand)
+    for board in boards:
+        path = solver.solve(board.tolist())
+        optimal = len(ida.solve(board.tolist())) - 1
+        assert path[0] == tuple(board.tolist()) and _is_path(path, size)
+        assert optimal <= len(path) - 1 <= 1.5 * optimal
+
+
+def test_solve_boards_reports_gap():
+    boards, _ = VecNPuzzleEnv(1, size=3, scramble_moves=20, seed=0).scramble(8)
+    boards[0] = goal_state(3)
+    ida = IDAStarSolver(3)
+    optimal = [len(ida.solve(board.tolist())) - 1 for board in boards]
+    stats = solve_boards(LearnedAStar(3, manhattan_boards(3), weight=2.0, expand=8), boards, optimal)
+    assert stats["solved"] == 1.0 and stats["boards"] == 8
+    assert np.isfinite(stats["mean_gap"]) and np.isfinite(stats["max_gap"])
+    assert 0.0 <= stats["mean_gap"] <= stats["max_gap"]
+
+
+def test_dqn_heuristic_drives_a_valid_search():
+    torch = pytest.importorskip("torch")
+    from rl_8puzzle.dqn_15_puzzle import DQNTiles
+    from rl_8puzzle.dqn_inference import InferenceEngine
+    from rl_8puzzle.learned_astar import DQNHeuristic
+
+    torch.manual_seed(0)
+    engine = InferenceEngine(DQNTiles(board_size=3, embed_dim=8, hidden_dim=32))
+    heuristic = DQNHeuristic(engine)
+    boards, _ = VecNPuzzleEnv(1, size=3, scramble_moves=12, seed=4).scramble(3)
+    h = heuristic(np.vstack([boards, engine.goal]))
+    assert h[-1] == 0.0 and (h[:-1] >= 1.0).all() and np.isfinite(h).all()
+
+    solver = LearnedAStar(3, heuristic, weight=1.5, expand=16)
+    for board in boards:
+        path = solver.solve(board.tolist())
+        assert path[0] == tuple(board.tolist()) and _is_path(path, 3)
+
+
+def test_q_to_distance_inverts_discounted_return():
+    gamma, d = 0.99, np.arange(1, 40)
+    q = -(1 - gamma ** (d - 1)) / (1 - gamma) + 20.0 * gamma ** (d - 1)
+    assert np.allclose(q_to_distance(q, gamma), d)
+    assert q_to_distance(np.array([25.0]), gamma)[0] == pytest.approx(1.0)
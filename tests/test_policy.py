@@ -0,0 +1,69 @@
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.policy import (
+    LOOP,
+    MAX_STEPS,
+    SOLVED,
+    CompiledPolicy,
+    compile_policy,
+    greedy_states,
+    policy_for,
+)
+from rl_8puzzle.solve_example import greedy_solve
+from rl_8puzzle.train_q_learning import plan
+
+
+def test_compiled_optimal_policy_solves_and_replays():
+    policy = CompiledPolicy.from_q(plan(backend="ranked"))
+    env = EightPuzzleEnv(scramble_moves=40)
+
+    for _ in range(20):
+        start = env.reset()
+        solution = policy.solve(start)
+        assert solution.solved
+        assert solution.states[0] == start
+        assert solution.states[-1] == GOAL_STATE
+
+        # replaying the actions reproduces the trajectory
+        env.state = start
+        for action, expected in zip(solution.actions, solution.states[1:]):
+            state, _, _, _ = env.step(action)
+            assert state == expected
+
+
+def test_empty_policy_fails_fast():
+    # All-zero Q: argmax is always "up", which hits the wall within 2 moves.
+    policy = CompiledPolicy.from_q({})
+    start = (1, 2, 3, 4, 5, 6, 7, 0, 8)
+    solution = policy.solve(start, max_steps=100)
+    assert not solution.solved and solution.outcome == LOOP
+    assert len(solution.states) <= 3
+
+
+def test_step_budget_is_not_reported_as_a_loop():
+    policy = CompiledPolicy.from_q(plan(backend="ranked"))
+    start = (1, 2, 3, 4, 5, 6, 0, 7, 8)  # two moves from the goal
+    assert policy.solve(start, max_steps=1).outcome == MAX_STEPS
+    assert policy.solve(start, max_steps=2).outcome == SOLVED
+
+
+def test_compile_policy_matches_dict_greedy_choice():
+    Q = {((1, 2, 3, 4, 5, 6, 7, 0, 8), 3): 20.0, ((1, 2, 3, 4, 5, 6, 7, 0, 8), 0): 5.0}
+    actions = compile_policy(Q)
+    assert actions.dtype.name == "uint8"
+    assert CompiledPolicy(actions).solve((1, 2, 3, 4, 5, 6, 7, 0, 8)).actions == [3]
+
+
+def test_greedy_loops_use_the_cached_policy_and_stop_on_cycles():
+    Q = plan(backend="ranked")
+    assert policy_for(Q) is policy_for(Q)
+
+    env = EightPuzzleEnv(scramble_moves=30)
+    start = env.reset()
+    states = greedy_solve(env, Q)
+    assert states == policy_for(Q).solve(start).states
+    assert env.state == states[-1] == GOAL_STATE
+
+    # A looping dict policy gives up within a few moves instead of max_steps.
+    env.state = (1, 2, 3, 4, 5, 6, 7, 0, 8)
+    looping = greedy_states(env, {}, max_steps=100)
+    assert len(looping) <= 3 and env.state == looping[-1] != GOAL_STATE
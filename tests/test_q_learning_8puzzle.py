@@ -1,7 +1,7 @@
 from collections import defaultdict
 
 from rl_8puzzle.env import EightPuzzleEnv, ACTIONS
-from rl_8puzzle.train_q_learning import train
+from rl_8puzzle.train_q_learning import train, train_dyna
 
 
 def greedy_action(Q, state):
@@ -50,3 +50,147 @@ def test_trained_policy_solves_simple_states():
 
     # We don't demand perfection, just that it solves *something*
     assert successes >= 1
+
+
+def test_plan_gives_optimal_greedy_policy():
+    from rl_8puzzle.env import GOAL_STATE
+    from rl_8puzzle.train_q_learning import plan
+
+    Q = plan(backend="ranked")
+    env = EightPuzzleEnv(scramble_moves=0)
+
+    # one move away from goal: blank must move right
+    env.state = (1, 2, 3, 4, 5, 6, 7, 0, 8)
+    assert greedy_action(Q, env.state) == 3
+
+    env = EightPuzzleEnv(scramble_moves=40)
+    for _ in range(20):
+        state = env.reset()
+        for _ in range(31):  # the hardest 8-puzzle needs 31 moves
+            if state == GOAL_STATE:
+                break
+            state, _, _, _ = env.step(greedy_action(Q, state))
+        assert state == GOAL_STATE
+
+
+def test_plan_dict_matches_ranked():
+    from rl_8puzzle.env import GOAL_STATE
+    from rl_8puzzle.train_q_learning import plan
+
+    Q = plan()
+    assert isinstance(Q, dict)
+    assert len(Q) == 181_440 * len(ACTIONS)
+    ranked = plan(backend="ranked")
+    state = (1, 2, 3, 4, 0, 6, 7, 5, 8)
+    for a in ACTIONS:
+        assert Q[(state, a)] == ranked[(state, a)]
+    assert Q[(GOAL_STATE, 3)] == 20.0
+
+
+def test_train_parallel_merges_worker_updates():
+    from rl_8puzzle.q_table import RankedQTable
+    from rl_8puzzle.train_q_learning import train_parallel
+
+    stats = {}
+    Q = train_parallel(
+        num_episodes=400,
+        num_workers=2,
+        sync_interval=100,
+        max_steps=80,
+        scramble_moves=10,
+        stats=stats,
+    )
+    assert isinstance(Q, RankedQTable)
+    assert len(Q) > 0
+    assert stats["episodes"] == 400
+    assert stats["updates"] > 0
+
+
+def test_train_with_replay_records_success_curve():
+    import random
+
+    import pytest
+
+    from rl_8puzzle.q_table import RankedQTable
+
+    for replay in ("uniform", "prioritized"):
+        random.seed(0)
+        stats = {}
+        Q = train(
+            num_episodes=500,
+            max_steps=40,
+            scramble_moves=6,
+            backend="ranked",
+            replay=replay,
+            replay_batch=8,
+            stats=stats,
+        )
+        assert isinstance(Q, RankedQTable)
+        # Replayed updates come on top of one update per real step.
+        assert stats["updates"] > 8 * stats["episodes"]
+        assert len(stats["curve"]) == 1
+        assert stats["curve"][0]["success_rate"] == stats["solved"] / 500 > 0.5
+
+    with pytest.raises(ValueError):
+        train(num_episodes=1, backend="dict", replay="uniform")
+
+
+def test_train_dyna_plans_from_the_model():
+    import random
+
+    import numpy as np
+
+    random.seed(0)
+    env = EightPuzzleEnv(scramble_moves=8, use_table=True)
+    eval_ranks = np.array([env.reset_rank() for _ in range(200)])
+    for sweeping in (False, True):
+        random.seed(1)
+        stats = {}
+        train_dyna(
+            num_episodes=2000,
+            scramble_moves=8,
+            planning_steps=10,
+            sweeping=sweeping,
+            eval_ranks=eval_ranks,
+            eval_interval=20,
+            target=0.95,
+            stats=stats,
+        )
+        # Stops early at the target, having replayed 10 model backups per real step.
+        assert stats["curve"][-1]["eval_success"] >= 0.95 and stats["episodes"] < 2000
+        assert stats["backups"] >= 5 * stats["real_steps"] and stats["cpu_seconds"] > 0
+
+
+def test_train_parallel_with_many_workers_matches_serial_quality():
+    import random
+
+    import numpy as np
+
+    from rl_8puzzle.train_q_learning import greedy_success_rate, train_parallel
+
+    random.seed(0)
+    env = EightPuzzleEnv(scramble_moves=30, use_table=True)
+    eval_ranks = np.array([env.reset_rank() for _ in range(500)])
+
+    random.seed(1)
+    serial = greedy_success_rate(train(num_episodes=10_000, backend="ranked"), eval_ranks)
+    parallel = train_parallel(num_episodes=10_000, num_workers=4, sync_interval=100)
+    # Summed worker deltas used to blow the table up to |Q| in the thousands.
+    assert np.abs(parallel.values).max() < 1_000
+    assert greedy_success_rate(parallel, eval_ranks) > serial - 0.1
+
+
+def test_replay_update_merges_duplicate_samples():
+    import numpy as np
+    import pytest
+
+    from rl_8puzzle.replay import ReplayBuffer
+    from rl_8puzzle.train_q_learning import _replay_update
+
+    values = np.zeros((10, 4), dtype=np.float32)
+    replay = ReplayBuffer(4, 1, seed=0, obs_dtype=np.int32)
+    replay.add_batch(np.array([[1]]), np.array([2]), np.array([20.0]), np.array([[0]]), np.array([True]))
+    # 64 copies of one transition act like 64 sequential steps, never beyond the target.
+    _replay_update(values, replay, 64, gamma=0.99, alpha=0.1)
+    assert values[1, 2] == pytest.approx(20.0 * (1 - 0.9**64), rel=1e-4)
+    assert values.sum() == values[1, 2]
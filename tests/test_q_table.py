@@ -0,0 +1,58 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from rl_8puzzle.env import GOAL_STATE
+from rl_8puzzle.q_table import (
+    RankedQTable,
+    convert_pickle,
+    is_q_binary,
+    open_q_binary,
+    save_q_binary,
+)
+from rl_8puzzle.train_q_learning import load_q, plan, save_q
+
+
+def test_binary_roundtrip_is_memory_mapped(tmp_path):
+    Q = plan(backend="ranked")
+    path = tmp_path / "q.bin"
+    save_q(Q, path)
+
+    assert is_q_binary(path)
+    loaded = load_q(path)
+    assert isinstance(loaded, RankedQTable)
+    assert isinstance(loaded.values, np.memmap)
+    assert np.array_equal(loaded.values, Q.values)
+
+
+def test_float16_variant(tmp_path):
+    Q = plan(backend="ranked")
+    path = tmp_path / "q16.bin"
+    save_q_binary(Q, path, dtype="float16")
+
+    loaded = open_q_binary(path)
+    assert loaded.values.dtype == np.float16
+    assert path.stat().st_size < Q.nbytes
+    # greedy actions survive the precision loss
+    assert np.array_equal(loaded.values.argmax(axis=1), Q.values.argmax(axis=1))
+
+
+def test_convert_legacy_pickle(tmp_path):
+    Q = {(GOAL_STATE, 0): -1.5, ((1, 2, 3, 4, 5, 6, 7, 0, 8), 3): 20.0}
+    pkl = tmp_path / "q_table.pkl"
+    with pkl.open("wb") as f:
+        pickle.dump(Q, f)
+    assert not is_q_binary(pkl)
+    assert load_q(pkl) == Q
+
+    out = tmp_path / "q_table.bin"
+    convert_pickle(pkl, out)
+    assert load_q(out).to_dict() == Q
+
+
+def test_open_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"x" * 100)
+    with pytest.raises(ValueError):
+        open_q_binary(path)
@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE, ACTIONS
+from rl_8puzzle.q_table import RankedQTable
+from rl_8puzzle.ranking import (
+    NUM_STATES,
+    rank_state,
+    unrank_state,
+    rank_states,
+    unrank_states,
+)
+from rl_8puzzle.train_q_learning import train, epsilon_greedy
+
+
+def test_rank_roundtrip_random_states():
+    env = EightPuzzleEnv(scramble_moves=50)
+    for _ in range(200):
+        state = env.reset()
+        r = rank_state(state)
+        assert 0 <= r < NUM_STATES
+        assert unrank_state(r) == state
+
+
+def test_rank_is_a_bijection():
+    ranks = np.arange(NUM_STATES)
+    boards = unrank_states(ranks)
+    assert np.array_equal(rank_states(boards), ranks)
+    # all boards distinct
+    assert len(np.unique(boards, axis=0)) == NUM_STATES
+
+
+def test_vectorized_matches_scalar():
+    rng = random.Random(0)
+    sample = [rng.randrange(NUM_STATES) for _ in range(100)]
+    boards = unrank_states(np.array(sample))
+    for r, board in zip(sample, boards):
+        assert tuple(board.tolist()) == unrank_state(r)
+    assert rank_state(GOAL_STATE) == rank_states(np.array([GOAL_STATE]))[0]
+
+
+def test_ranked_q_table_dict_api():
+    Q = RankedQTable()
+    assert Q.get((GOAL_STATE, 0), 0.0) == 0.0
+    Q[(GOAL_STATE, 2)] = 1.5
+    assert Q[(GOAL_STATE, 2)] == 1.5
+    assert len(Q) == 1
+    assert epsilon_greedy(Q, GOAL_STATE, epsilon=0.0) == 2
+    assert RankedQTable.from_dict(Q.to_dict()).to_dict() == Q.to_dict()
+
+
+def test_train_ranked_backend():
+    Q = train(num_episodes=300, max_steps=80, scramble_moves=10, backend="ranked")
+    assert isinstance(Q, RankedQTable)
+    assert len(Q) > 0
+    assert Q.values.dtype == np.float32
+    assert Q.values.shape == (NUM_STATES, len(ACTIONS))
+
+
+def test_rank_rejects_odd_parity():
+    with pytest.raises(ValueError):
+        rank_state((2, 1, 3, 4, 5, 6, 7, 8, 0))
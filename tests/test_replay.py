@@ -0,0 +1,50 @@
+import numpy as np
+
+from rl_8puzzle.replay import PrioritizedReplayBuffer, ReplayBuffer, SumTree
+
+
+def test_replay_buffer_wraps_around():
+    buffer = ReplayBuffer(capacity=5, obs_dim=4, seed=0)
+    for start in (0, 3):
+        n = 3
+        obs = np.full((n, 4), start, dtype=np.uint8) + np.arange(n, dtype=np.uint8)[:, None]
+        buffer.add_batch(obs, np.arange(n), np.full(n, -1.0), obs, np.zeros(n, dtype=bool))
+
+    assert len(buffer) == 5 and buffer.pos == 1
+    # Slot 0 was overwritten by the 6th transition (obs value 5).
+    assert buffer.obs[:, 0].tolist() == [5, 1, 2, 3, 4]
+
+    batch = buffer.sample(16)
+    assert batch["obs"].shape == (16, 4) and batch["obs"].dtype == np.uint8
+    assert batch["rewards"].dtype == np.float32
+    assert set(batch["indices"].tolist()) <= set(range(5))
+
+
+def test_sum_tree_matches_cumulative_search():
+    rng = np.random.default_rng(0)
+    priorities = rng.random(1000)
+    priorities[::7] = 0.0
+    tree = SumTree(1000)
+    tree.update(np.arange(1000), priorities)
+    tree.update(np.array([3, 3, 500]), np.array([0.5, 2.0, 4.0]))  # batched, last write wins
+    priorities[[3, 500]] = [2.0, 4.0]
+
+    assert np.isclose(tree.total, priorities.sum())
+    values = rng.random(512) * tree.total
+    expected = np.searchsorted(np.cumsum(priorities), values, side="right")
+    assert np.array_equal(tree.find(values), expected)
+    assert (priorities[tree.find(values)] > 0).all()
+
+
+def test_prioritized_replay_favors_large_td_errors():
+    n = 1000
+    buffer = PrioritizedReplayBuffer(n, 1, seed=0, obs_dtype=np.int32)
+    ranks = np.arange(n)[:, None]
+    buffer.add_batch(ranks, np.zeros(n), np.full(n, -1.0), ranks, np.zeros(n, dtype=bool))
+    buffer.update_priorities(np.arange(n), np.where(np.arange(n) < 10, 100.0, 0.0))
+
+    batch = buffer.sample(256)
+    assert (batch["indices"] < 10).mean() > 0.8
+    assert batch["weights"].max() == 1.0
+    # Rarely sampled transitions carry the largest importance weights.
+    assert batch["weights"][batch["indices"] >= 10].min() > batch["weights"][batch["indices"] < 10].max()
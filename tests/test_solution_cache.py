@@ -0,0 +1,87 @@
+import pytest
+
+from rl_8puzzle.env import EightPuzzleEnv, GOAL_STATE
+from rl_8puzzle.policy import CompiledPolicy
+from rl_8puzzle.q_table import RankedQTable
+from rl_8puzzle.solution_cache import SolutionCache, actions_from_states, fingerprint_q, prune_stale
+from rl_8puzzle.train_q_learning import plan
+
+
+def test_actions_from_states_handles_wall_bumps():
+    env = EightPuzzleEnv(scramble_moves=0)
+    states = [env.state]
+    for action in (3, 0, 2, 2, 2, 1):  # right is a wall bump at the goal
+        states.append(env.step(action)[0])
+    actions = actions_from_states(states)
+
+    env.state = states[0]
+    assert [env.step(a)[0] for a in actions] == states[1:]
+
+
+def test_cache_roundtrip_and_invalidation(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    Q = plan(backend="ranked")
+    start = EightPuzzleEnv(scramble_moves=30).reset()
+    moves = CompiledPolicy.from_q(Q).solve(start).actions
+
+    cache = SolutionCache.for_q(Q, path=path)
+    assert cache.get(start) is None
+    cache.put(start, moves)
+    assert cache.get(start) == moves
+    cache.close()
+
+    # a fresh process finds it on disk
+    cold = SolutionCache.for_q(Q, path=path)
+    assert cold.get(start) == moves
+    assert cold.warm() == 1
+    cold.close()
+
+    # a different Q-table never sees those rows, but opening it keeps them
+    other = RankedQTable(Q.values.copy())
+    other.values[0, 0] += 1.0
+    assert fingerprint_q(other) != fingerprint_q(Q)
+    stale = SolutionCache.for_q(other, path=path)
+    assert stale.get(start) is None
+    assert len(stale) == 0
+    again = SolutionCache.for_q(Q, path=path)
+    assert again.get(start) == moves
+
+    # until the other table prunes them explicitly
+    assert stale.prune() == 1
+    assert len(again) == 0
+    stale.close()
+    again.close()
+
+
+def test_prune_stale_keeps_only_the_current_table(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    assert prune_stale({}, path=path) == 0 and not path.exists()
+
+    old, new = RankedQTable(), plan(backend="ranked")
+    for Q in (old, new):
+        cache = SolutionCache.for_q(Q, path=path)
+        cache.put(GOAL_STATE, [])
+        cache.close()
+
+    assert prune_stale(new, path=path) == 1
+    cache = SolutionCache.for_q(new, path=path)
+    assert cache.get(GOAL_STATE) == []
+    cache.close()
+
+
+def test_cached_trajectory_replays_hits(tmp_path):
+    pytest.importorskip("matplotlib")
+    from rl_8puzzle.animate_3d import cached_trajectory, greedy_trajectory
+
+    Q = plan(backend="ranked")
+    cache = SolutionCache.for_q(Q, path=tmp_path / "cache.sqlite")
+    env = EightPuzzleEnv(scramble_moves=25)
+    start = env.reset()
+
+    first = cached_trajectory(env, Q, cache)
+    env.state = start
+    second = cached_trajectory(env, Q, cache)
+    env.state = start
+    assert first == second == greedy_trajectory(env, Q)
+    assert second[-1] == GOAL_STATE
+    assert cache.hits == 1
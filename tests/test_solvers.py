@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from rl_8puzzle.env import EightPuzzleEnv
+from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+from rl_8puzzle.ranking import rank_state
+from rl_8puzzle.solvers import IDAStarSolver, ida_star, is_solvable
+from rl_8puzzle.transitions import bfs_distances, load_transition_table
+
+
+def _assert_valid_path(states, size):
+    env = NPuzzleEnv(size=size, scramble_moves=0)
+    assert states[-1] == env.goal_state
+    for a, b in zip(states, states[1:]):
+        env.state = a
+        assert b in {env._move(a, action) for action in env.ACTIONS}
+
+
+def test_ida_star_is_optimal_on_8_puzzle():
+    dist = bfs_distances(load_transition_table())
+    env = EightPuzzleEnv(scramble_moves=60)
+    solver = IDAStarSolver(3)
+    for _ in range(20):
+        start = env.reset()
+        states = solver.solve(start)
+        _assert_valid_path(states, 3)
+        assert len(states) - 1 == dist[rank_state(start)]
+
+
+def test_ida_star_solves_15_puzzle():
+    random.seed(0)
+    env = NPuzzleEnv(size=4, scramble_moves=40)
+    for _ in range(3):
+        start = env.reset()
+        _assert_valid_path(ida_star(start), 4)
+
+
+def test_unsolvable_board_is_rejected():
+    start = (2, 1, 3, 4, 5, 6, 7, 8, 0)
+    assert not is_solvable(start, 3)
+    with pytest.raises(ValueError):
+        ida_star(start)
+
+
+def test_pattern_db_is_admissible_and_optimal(tmp_path):
+    from rl_8puzzle.pattern_db import PatternDatabase, build_pattern_db
+
+    build_pattern_db(3, out_dir=tmp_path)
+    db = PatternDatabase(tmp_path)
+
+    dist = bfs_distances(load_transition_table())
+    env = EightPuzzleEnv(scramble_moves=60)
+    solver = IDAStarSolver(3, heuristic=db)
+    for _ in range(20):
+        start = env.reset()
+        optimal = dist[rank_state(start)]
+        assert db.heuristic(start) <= optimal
+        assert len(solver.solve(start)) - 1 == optimal
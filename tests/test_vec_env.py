@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from rl_8puzzle.n_puzzle_env import NPuzzleEnv
+from rl_8puzzle.vec_env import VecNPuzzleEnv, VecEightPuzzleEnv
+
+
+@pytest.mark.parametrize("size", [3, 4])
+def test_vec_env_matches_scalar_env(size):
+    vec = VecNPuzzleEnv(num_envs=8, size=size, scramble_moves=20, seed=0)
+    boards = vec.reset()
+    refs = []
+    for b in boards:
+        env = NPuzzleEnv(size=size, scramble_moves=0)
+        env.state = tuple(b.tolist())
+        refs.append(env)
+
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        actions = rng.integers(0, 4, size=8)
+        next_boards, rewards, dones, info = vec.step(actions)
+        for i, env in enumerate(refs):
+            state, reward, done, _ = env.step(int(actions[i]))
+            assert rewards[i] == reward
+            assert dones[i] == done
+            if done:
+                row = list(info["final_index"]).index(i)
+                assert tuple(info["final_boards"][row].tolist()) == state
+                env.state = tuple(next_boards[i].tolist())
+            else:
+                assert tuple(next_boards[i].tolist()) == state
+
+
+def test_vec_env_auto_resets_solved_boards():
+    vec = VecNPuzzleEnv(num_envs=2, size=3, scramble_moves=0, seed=0)
+    vec.reset()
+    # blank is bottom-right: "up" then "down" returns to goal
+    vec.step(np.array([0, 0]))
+    _, rewards, dones, info = vec.step(np.array([1, 1]))
+    assert dones.all()
+    assert (rewards == 20.0).all()
+    assert (info["final_boards"] == vec.goal_state).all()
+
+
+def test_vec_eight_puzzle_ranks():
+    from rl_8puzzle.ranking import rank_state
+
+    vec = VecEightPuzzleEnv(num_envs=4, scramble_moves=15, seed=3)
+    boards = vec.reset()
+    assert vec.ranks().tolist() == [rank_state(tuple(b.tolist())) for b in boards]